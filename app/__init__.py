@@ -14,10 +14,20 @@ Flask Mega-Tutorial, which can be found online.
 Frontend modules:
     routes.py -- Flask view functions
     forms.py -- Flask-WTF web form classes
+    viewcache.py -- A small, bounded, thread-safe cache for derived game views
+    timing.py -- Break down where the time goes in each request
+    loadtest.py -- Load test the web app with many simulated tables at once
+    tracing.py -- Record the form submissions people make, to replay later
+    replay.py -- Replay a trace of real form submissions against the app
 
-Backend modules:
+Backend modules (in the separate cluesolver package):
     cluegame.py -- Tools to record and solve a Clue game
     objectfilter.py -- General tools to query custom Python objects
+    probability.py -- Fast approximate card location probabilities
+    exact.py -- Exact card location probabilities, by counting deals
+    suggestions.py -- Rank the possible suggestions by what they may reveal
+    analysis.py -- Anytime analysis of a Game, within a time budget
+    store.py -- Keep many Games on disk, and the busy ones in memory
 """
 
 from flask import Flask
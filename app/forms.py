@@ -1,6 +1,7 @@
 from flask_wtf import FlaskForm
 from wtforms import (StringField, SubmitField, FieldList, FormField,
                      SelectField, SelectMultipleField, BooleanField)
+from wtforms.validators import ValidationError
 
 
 class CreatePlayerForm(FlaskForm):
@@ -39,6 +40,28 @@ class InputShowForm(FlaskForm):
     # TODO: Validate logically possible
 
 
+class InputSuggestionForm(FlaskForm):
+    suggester = SelectField('Suggested by')
+    cards = FieldList(SelectField('Cards'), min_entries=3, max_entries=3)
+    shower = SelectField('Shown by')
+    shown = SelectField('Card shown')
+    submit_suggestion = SubmitField('Record suggestion')
+    # TODO: Validate person, weapon, room
+    # TODO: Validate logically possible
+
+    def validate_shower(self, field):
+        if field.data and field.data == self.suggester.data:
+            raise ValidationError("A player cannot show to themself!")
+
+    def validate_shown(self, field):
+        if field.data:
+            if not self.shower.data:
+                raise ValidationError("A card cannot be shown by nobody!")
+            if field.data not in self.cards.data:
+                raise ValidationError(
+                    "The card shown must be one of the cards suggested")
+
+
 class InputRevealForm(FlaskForm):
     player = SelectField('Player')
     card = SelectField('Card')
@@ -46,6 +69,11 @@ class InputRevealForm(FlaskForm):
     # TODO: Validate logically possible
 
 
+class RetractEventForm(FlaskForm):
+    event = SelectField('Event', coerce=int)
+    submit_retract = SubmitField('Remove event')
+
+
 class DeleteGameForm(FlaskForm):
     confirm = BooleanField('Are you sure you want to delete the saved game?')
     submit = SubmitField('Delete game')
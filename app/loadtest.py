@@ -0,0 +1,228 @@
+"""loadtest.py -- Load test the web app with many simulated tables at once
+
+Starts the app on a local, threaded WSGI server (on a free localhost port,
+with a throwaway games directory), then simulates many tables playing at
+once.  Each table is a thread with its own session cookie, which:
+    - creates a game (create_game),
+    - enters a hand of cards (input_hand), and
+    - records a sequence of realistic events (gameplay_view): truthful
+      suggestions, passes, shows and reveals for a random deal of the cards,
+      reloading the page now and then as an idle player would.
+
+At the end it reports, for each route, the number of requests, throughput,
+and p50/p95/p99 latency; and from the app's Server-Timing headers (see
+timing.py), how the server's time was split between storage (pickle
+load/save), inference, template rendering and the rest.
+
+Nothing outside localhost is used.  CSRF protection is turned off for the
+run, as the simulated players do not parse the forms (see isolated).
+
+Usage:
+    python -m app.loadtest [--tables N] [--events N] [--think SECONDS]
+                           [--seed SEED]
+
+Functions:
+    percentile -- the nearest-rank percentile of some sorted values
+    isolated   -- a context manager, setting the app up to be tested
+    run        -- run a load test, returning the raw measurements
+    report     -- summarize the measurements of a run
+    main       -- command line entry point
+"""
+
+from app import app, routes
+from cluesolver import fuzz
+from cluesolver.store import GameStore
+from werkzeug.serving import make_server
+import argparse
+import collections
+import contextlib
+import http.cookiejar
+import logging
+import math
+import random
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+PLAYERS = [["Adam", 5], ["Cynthia", 5], ["Greg", 4], ["David", 4]]
+
+Sample = collections.namedtuple('Sample', 'route seconds server_timing')
+
+
+def percentile(values, p):
+    """Return the nearest-rank p-th percentile of a sorted list of values."""
+    if not values:
+        return float("nan")
+    rank = max(math.ceil(p / 100 * len(values)), 1)
+    return values[min(rank, len(values)) - 1]
+
+
+def _parse_server_timing(header):
+    timings = {}
+    for part in (header or "").split(","):
+        name, _, duration = part.strip().partition(";dur=")
+        if name and duration:
+            timings[name] = float(duration) / 1000
+    return timings
+
+
+def _event_form(event):
+    """Return the gameplay_view form fields to record a ClueEvent."""
+    cards = (list(event.cards) * 3)[:3]
+    fields = {"cards-{}".format(i): c for i, c in enumerate(cards)}
+    if event.kind == "suggest":
+        fields.update(suggester=event.player, shower=event.shower or "",
+                      shown=event.shown or "", submit_suggestion="y")
+    elif event.kind == "have":
+        fields = {"player": event.player, "card": event.cards[0],
+                  "submit_reveal": "y"}
+    else:
+        fields.update(player=event.player)
+        fields["submit_" + event.kind] = "y"
+    return fields
+
+
+def _play_table(base_url, n_events, think, seed, samples):
+    rng = random.Random(seed)
+    opener = urllib.request.build_opener(
+        urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+    def request(route, fields=None):
+        data = None
+        if fields:
+            data = urllib.parse.urlencode(fields, doseq=True).encode()
+        start = time.perf_counter()
+        with opener.open(base_url + route, data) as response:
+            response.read()
+            timing = response.headers.get("Server-Timing")
+        method = "POST" if data else "GET"
+        samples.append(Sample("{} {}".format(method, route),
+                              time.perf_counter() - start,
+                              _parse_server_timing(timing)))
+
+    setup = {"persons": app.config['CLUE_CARDS_PERSONS'],
+             "weapons": app.config['CLUE_CARDS_WEAPONS'],
+             "rooms": app.config['CLUE_CARDS_ROOMS'],
+             "players": PLAYERS}
+    deal = fuzz.random_deal(setup, rng)
+
+    request("/create_game")
+    fields = {}
+    for i, (name, hand_size) in enumerate(PLAYERS):
+        fields["player-{}-name".format(i)] = name
+        fields["player-{}-hand_size".format(i)] = str(hand_size)
+    request("/create_game", fields)
+    request("/input_hand", {"myself": "Adam",
+                            "cards": sorted(deal["Adam"]), "submit": "y"})
+
+    events = [e for e in fuzz.random_events(setup, deal, rng, 4 * n_events)
+              if e.kind != "show" or len(e.cards) == 3][:n_events]
+    for e in events:
+        time.sleep(think * rng.random())
+        request("/gameplay_view", _event_form(e))
+        if rng.random() < 0.5:
+            request("/gameplay_view")
+
+
+@contextlib.contextmanager
+def isolated(directory=None):
+    """Set the app up to be tested, for the duration of a with block.
+
+    Games are stored in directory (default: a throwaway one), CSRF
+    protection and tracing are turned off, and the werkzeug request log is
+    quietened.  Everything is put back as it was afterwards.
+    """
+    saved = (app.config.get('WTF_CSRF_ENABLED', True), routes.game_store,
+             routes.trace_recorder)
+    app.config['WTF_CSRF_ENABLED'] = False
+    routes.trace_recorder = None
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    try:
+        with contextlib.ExitStack() as stack:
+            if directory is None:
+                directory = stack.enter_context(tempfile.TemporaryDirectory())
+            routes.game_store = GameStore(directory)
+            yield
+            routes.game_store.flush()
+    finally:
+        (app.config['WTF_CSRF_ENABLED'], routes.game_store,
+         routes.trace_recorder) = saved
+
+
+def run(tables=20, events=30, think=0.0, seed=0):
+    """Run a load test against a local server.
+
+    Arguments:
+        tables -- the number of tables (games) to play at once
+        events -- the number of events to record at each table
+        think  -- the most time to wait between events, in seconds
+        seed   -- the random seed for the deals and events
+
+    Returns:
+        a list of Samples, and the wall-clock seconds the run took
+    """
+    with isolated():
+        server = make_server("127.0.0.1", 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = "http://127.0.0.1:{}".format(server.server_port)
+
+        samples = []
+        players = [threading.Thread(
+            target=_play_table,
+            args=(base_url, events, think, seed + i, samples))
+            for i in range(tables)]
+        start = time.perf_counter()
+        for p in players:
+            p.start()
+        for p in players:
+            p.join()
+        elapsed = time.perf_counter() - start
+        server.shutdown()
+    return samples, elapsed
+
+
+def report(samples, elapsed, out):
+    """Write a summary of the samples from a run to out."""
+    by_route = collections.defaultdict(list)
+    for s in samples:
+        by_route[s.route].append(s.seconds)
+    out.write("{} requests in {:.2f}s: {:.1f} requests/s\n\n".format(
+        len(samples), elapsed, len(samples) / elapsed))
+    out.write("{:<20}{:>8}{:>10}{:>10}{:>10}{:>10}\n".format(
+        "route", "count", "req/s", "p50 ms", "p95 ms", "p99 ms"))
+    for route, seconds in sorted(by_route.items()):
+        seconds.sort()
+        out.write("{:<20}{:>8}{:>10.1f}{:>10.1f}{:>10.1f}{:>10.1f}\n".format(
+            route, len(seconds), len(seconds) / elapsed,
+            *(1000 * percentile(seconds, p) for p in (50, 95, 99))))
+
+    totals = collections.Counter()
+    for s in samples:
+        totals.update(s.server_timing)
+    server_total = sum(totals.values())
+    if server_total:
+        out.write("\nserver time by category:\n")
+        for name, seconds in totals.most_common():
+            out.write("    {:<12}{:>10.1f} ms {:>6.1%}\n".format(
+                name, 1000 * seconds, seconds / server_total))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Load test the web app with simulated tables.")
+    parser.add_argument("--tables", type=int, default=20)
+    parser.add_argument("--events", type=int, default=30)
+    parser.add_argument("--think", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    samples, elapsed = run(args.tables, args.events, args.think, args.seed)
+    report(samples, elapsed, sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""replay.py -- Replay a trace of real form submissions against the app
+
+Plays back the form submissions in a trace file (see tracing.py) against the
+app as it is now -- with whatever inference engine and game storage it has --
+and compares how long each request takes now with how long it took when it
+was recorded.
+
+Each game in the trace is replayed in order, by its own client (with its own
+session), and the games are replayed at the same time, each in a thread.  The
+submissions can be sent either as fast as possible, or at their original
+timing (or a multiple of it, with --speed).
+
+Only games whose creation is in the trace can be replayed faithfully: for the
+others, the app has no game to play, and the submissions are redirected.
+Such differences are counted as status mismatches in the report.
+
+Usage:
+    python -m app.replay TRACE_FILE [--speed SPEED]
+                                    [--games-directory DIRECTORY]
+
+Functions:
+    replay -- replay recorded submissions, returning the measurements
+    report -- compare the recorded and replayed latencies
+    main   -- command line entry point
+"""
+
+from app import app
+from app.loadtest import isolated, percentile
+from app.tracing import read_trace
+import argparse
+import collections
+import sys
+import threading
+import time
+
+Result = collections.namedtuple(
+    'Result', 'route recorded_seconds seconds recorded_status status')
+
+
+def _replay_game(records, speed, origin, start, results):
+    client = app.test_client()
+    for r in records:
+        if speed:
+            delay = (r["time"] - origin) / speed - \
+                (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+        begin = time.perf_counter()
+        response = client.post(r["route"], data=r["fields"])
+        results.append(Result(r["route"], r["seconds"],
+                              time.perf_counter() - begin,
+                              r["status"], response.status_code))
+
+
+def replay(records, speed=None, directory=None):
+    """Replay recorded form submissions against the app.
+
+    Arguments:
+        records   -- a list of submissions, as returned by read_trace
+        speed     -- None to replay as fast as possible; or else how many
+                     times faster than the original timing to replay
+        directory -- the directory to store games in (default: a throwaway
+                     one)
+
+    Returns:
+        a list of Results, and the wall-clock seconds the replay took
+    """
+    games = collections.OrderedDict()
+    for r in records:
+        games.setdefault(r["game_id"], []).append(r)
+    origin = records[0]["time"] if records else 0.0
+
+    results = []
+    with isolated(directory):
+        start = time.perf_counter()
+        threads = [threading.Thread(
+            target=_replay_game, args=(rs, speed, origin, start, results))
+            for rs in games.values()]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+    return results, elapsed
+
+
+def report(results, elapsed, out):
+    """Write a comparison of recorded and replayed latencies to out."""
+    out.write("{} requests replayed in {:.2f}s\n\n".format(
+        len(results), elapsed))
+    out.write("{:<20}{:>7}{:>11}{:>11}{:>9}{:>11}{:>11}{:>9}\n".format(
+        "route", "count", "was p50", "now p50", "change",
+        "was p95", "now p95", "change"))
+    by_route = collections.defaultdict(list)
+    for r in results:
+        by_route[r.route].append(r)
+    for route, rs in sorted(by_route.items()):
+        row = [route, len(rs)]
+        for p in (50, 95):
+            was = percentile(sorted(r.recorded_seconds for r in rs), p)
+            now = percentile(sorted(r.seconds for r in rs), p)
+            row += [1000 * was, 1000 * now,
+                    (now - was) / was if was else float("nan")]
+        out.write("{:<20}{:>7}{:>8.1f} ms{:>8.1f} ms{:>+9.0%}"
+                  "{:>8.1f} ms{:>8.1f} ms{:>+9.0%}\n".format(*row))
+
+    mismatches = [r for r in results if r.status != r.recorded_status]
+    out.write("\n{} status mismatches\n".format(len(mismatches)))
+    for r in mismatches[:10]:
+        out.write("    {}: was {}, now {}\n".format(
+            r.route, r.recorded_status, r.status))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Replay a trace of form submissions against the app.")
+    parser.add_argument("trace", help="trace file (see app/tracing.py)")
+    parser.add_argument("--speed", type=float, default=None,
+                        help="replay at this multiple of the original "
+                             "timing (default: as fast as possible)")
+    parser.add_argument("--games-directory", default=None,
+                        help="directory to store the replayed games in "
+                             "(default: a temporary directory)")
+    args = parser.parse_args(argv)
+
+    results, elapsed = replay(read_trace(args.trace), args.speed,
+                              args.games_directory)
+    report(results, elapsed, sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,21 +1,150 @@
 from app import app
 from app.forms import (CreateGameForm, InputHandForm, InputPassForm,
-                       InputShowForm, InputRevealForm, DeleteGameForm)
-from app.cluegame import Game
-from flask import render_template, redirect, url_for
-import os
+                       InputShowForm, InputSuggestionForm, InputRevealForm,
+                       RetractEventForm, DeleteGameForm)
+from app.timing import timed
+from app.tracing import TraceRecorder
+from app.viewcache import ViewCache
+from cluesolver.analysis import AnalysisRunner
+from cluesolver.cluegame import ClueContradiction, Game
+from cluesolver.store import GameStore
+from cluesolver.viewmodel import GameGrid, describe_event
+from flask import (render_template, redirect, url_for, request,
+                   make_response, flash, session, g)
+import atexit
+import concurrent.futures
+import functools
+import time
+
+
+game_store = GameStore(app.config['GAMES_DIRECTORY'],
+                       app.config['GAME_POOL_SIZE'],
+                       app.config['GAME_IDLE_SECONDS'],
+                       app.config['GAME_POOL_MAX_BYTES'])
+atexit.register(game_store.flush)
+legacy_game_id = game_store.import_file(app.config['PICKLE_FILEPATH'])
+if legacy_game_id:
+    app.logger.warning(
+        "Imported the game saved at %s; play it at /gameplay_view?game=%s",
+        app.config['PICKLE_FILEPATH'], legacy_game_id)
+view_cache = ViewCache(app.config['VIEW_CACHE_SIZE'])
+analysis_runner = AnalysisRunner(
+    view_cache,
+    concurrent.futures.ProcessPoolExecutor(app.config['ANALYSIS_WORKERS']),
+    app.config['ANALYSIS_BACKGROUND_SECONDS'],
+    speculative_workers=app.config['ANALYSIS_WORKERS'])
+trace_recorder = None
+if app.config['TRACE_FILE']:
+    trace_recorder = TraceRecorder(app.config['TRACE_FILE'],
+                                   app.config['TRACE_MAX_BYTES'],
+                                   app.config['TRACE_BACKUP_COUNT'])
+    atexit.register(trace_recorder.close)
+
+
+def current_game_id():
+    """Return the game_id of this session's game (or None).
+
+    A "game" query parameter joins the session to that game instead, so that
+    several people can follow the same table.
+    """
+    if 'game' in request.args:
+        session['game_id'] = request.args['game']
+    return session.get('game_id')
+
+
+def with_game(view):
+    """Decorate a view to be passed the session's Game, checked out.
+
+    If the session has no game, redirect to the index page instead.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with timed('storage'), \
+                game_store.checkout(current_game_id()) as game:
+            if not game:
+                return redirect(url_for('index'))  # TODO: Flash warning
+            with timed('view'):
+                return view(game, *args, **kwargs)
+    return wrapper
+
+
+def render(template, **context):
+    """Render a template, timing it."""
+    with timed('render'):
+        return render_template(template, **context)
+
+
+def game_etag(game):
+    """An ETag identifying the current state of game, and of its analysis.
+
+    The analysis of a given game state improves as it is refined in the
+    background, and the ETag changes with it.
+    """
+    analysis = analysis_runner.cached(game)
+    return "{}-{}-{}".format(game.game_id, game.version,
+                             analysis.level if analysis else "")
+
+
+def game_view(game):
+    """Return the best Analysis of game to be had within the time budget."""
+    return analysis_runner.analyze(game, app.config['ANALYSIS_SECONDS'])
+
+
+def flash_contradiction(game, error):
+    """Flash a message explaining which events a ClueContradiction involves."""
+    message = "Not recorded: {}".format(error)
+    if error.event is not None:
+        culprits = game.conflicting_events(error.event) or []
+        message += " ({} conflicts with: {})".format(
+            describe_event(error.event),
+            "; ".join(describe_event(e) for e in culprits))
+    flash(message)
+
+
+def flash_form_errors(form):
+    """Flash a message for each validation error of a submitted form."""
+    for errors in form.errors.values():
+        for error in errors:
+            flash("Not recorded: {}".format(error))
+
+
+@app.before_request
+def start_trace():
+    """Note when a form submission came in, if tracing is turned on."""
+    if trace_recorder and request.method == 'POST':
+        g.trace_start = (time.time(), time.perf_counter(),
+                         session.get('game_id'))
+
+
+@app.after_request
+def record_trace(response):
+    """Write a form submission to the trace file, if tracing is turned on.
+
+    The game is the session's game after the request (so that for
+    create_game it is the new game), or else before it (for delete_game).
+    """
+    if trace_recorder and 'trace_start' in g:
+        started, start, game_id = g.trace_start
+        fields = request.form.to_dict(flat=False)
+        fields.pop('csrf_token', None)
+        trace_recorder.record(started, request.path,
+                              session.get('game_id') or game_id, fields,
+                              response.status_code,
+                              time.perf_counter() - start)
+    return response
 
 
 @app.route('/')
 @app.route('/index')
 def index():
-    return render_template('index.html')
+    return render('index.html')
 
 
 @app.route('/create_game', methods=['GET', 'POST'])
 def create_game():
-    if os.path.isfile(app.config['PICKLE_FILEPATH']):
-        return redirect(url_for('delete_game'))
+    with timed('storage'):
+        if current_game_id() in game_store:
+            return redirect(url_for('delete_game'))
 
     form = CreateGameForm()
 
@@ -28,80 +157,135 @@ def create_game():
                     app.config['CLUE_CARDS_WEAPONS'],
                     app.config['CLUE_CARDS_ROOMS'],
                     players)
-        game.save(app.config['PICKLE_FILEPATH'])
+        with timed('storage'):
+            game_store.add(game)
+        session['game_id'] = game.game_id
         return redirect(url_for('input_hand'))
-    return render_template('create_game.html', form=form)
+    return render('create_game.html', form=form)
 
 
 @app.route('/input_hand', methods=['GET', 'POST'])
-def input_hand():
-    game = Game.load(app.config['PICKLE_FILEPATH'])
-    if not game:
-        return redirect(url_for('index'))  # TODO: Flash warning
-
+@with_game
+def input_hand(game):
     form = InputHandForm()
-    form.myself.choices = [(p.name, p.name) for p in game.players]
+    form.myself.choices = [(name, name) for name in game.seating]
     form.cards.choices = [(c.name, c.name) for c in game.cards]
     if form.validate_on_submit():
-        for c in form.cards.data:
-            game.record_have(form.myself.data, c)
-        game.save(app.config['PICKLE_FILEPATH'])
-        return redirect(url_for('gameplay_view'))
+        try:
+            with timed('inference'), game.batch():
+                for c in form.cards.data:
+                    game.record_have(form.myself.data, c)
+        except ClueContradiction as e:
+            flash_contradiction(game, e)
+        else:
+            analysis_runner.precompute(game.fork(game.game_id))
+            return redirect(url_for('gameplay_view'))
 
-    return render_template('input_hand.html', form=form)
+    return render('input_hand.html', form=form)
 
 
 @app.route('/gameplay_view', methods=['GET', 'POST'])
-def gameplay_view():
-    game = Game.load(app.config['PICKLE_FILEPATH'])
-    if not game:
-        return redirect(url_for('index'))  # TODO: Flash warning
-
+@with_game
+def gameplay_view(game):
     # TODO: Check if game is over, do something if so.
 
-    player_choices = [(p.name, p.name) for p in game.players]
+    if request.method == 'GET' and game_etag(game) in request.if_none_match:
+        response = app.response_class(status=304)
+        response.set_etag(game_etag(game))
+        return response
+
+    player_choices = [(name, name) for name in game.seating]
     card_choices = [(c.name, c.name) for c in game.cards]
 
     form_pass = InputPassForm()
     form_show = InputShowForm()
+    form_suggestion = InputSuggestionForm()
     form_reveal = InputRevealForm()
+    form_retract = RetractEventForm()
     for form in [form_pass, form_show, form_reveal]:
         form.player.choices = player_choices
-    for form in [form_pass, form_show]:
+    for form in [form_pass, form_show, form_suggestion]:
         for field in form.cards:
             field.choices = card_choices
+    form_suggestion.suggester.choices = player_choices
+    form_suggestion.shower.choices = [('', 'Nobody')] + player_choices
+    form_suggestion.shown.choices = [('', 'Not seen')] + card_choices
     form_reveal.card.choices = card_choices
+    form_retract.event.choices = list(enumerate(
+        describe_event(e) for e in game.events))
 
     # work around validate_on_submit bug with multiple forms in one page.
     # ref: https://stackoverflow.com/a/39766205/11686201
-    if form_pass.submit_pass.data and form_pass.validate():
-        for c in form_pass.cards.data:
-            game.record_pass(form_pass.player.data, c)
-    elif form_show.submit_show.data and form_show.validate():
-        game.record_show(
-            form_show.player.data,
-            form_show.cards.data)
-    elif form_reveal.submit_reveal.data and form_reveal.validate():
-        game.record_have(form_reveal.player.data, form_reveal.card.data)
+    version = game.version
+    try:
+        with timed('inference'):
+            if form_pass.submit_pass.data and form_pass.validate():
+                with game.batch():
+                    for c in form_pass.cards.data:
+                        game.record_pass(form_pass.player.data, c)
+            elif form_show.submit_show.data and form_show.validate():
+                game.record_show(
+                    form_show.player.data,
+                    form_show.cards.data)
+            elif form_suggestion.submit_suggestion.data:
+                if form_suggestion.validate():
+                    game.record_suggestion(
+                        form_suggestion.suggester.data,
+                        form_suggestion.cards.data,
+                        form_suggestion.shower.data or None,
+                        form_suggestion.shown.data or None)
+                else:
+                    flash_form_errors(form_suggestion)
+            elif form_reveal.submit_reveal.data and form_reveal.validate():
+                game.record_have(form_reveal.player.data,
+                                 form_reveal.card.data)
+            elif form_retract.submit_retract.data and form_retract.validate():
+                game.retract_event(form_retract.event.data)
+                form_retract.event.choices = list(enumerate(
+                    describe_event(e) for e in game.events))
+    except ClueContradiction as e:
+        flash_contradiction(game, e)
+    except ValueError as e:
+        flash("Not recorded: {}".format(e))
+
+    if game.version != version:
+        analysis_runner.precompute(game.fork(game.game_id))
+
+    with timed('inference'):
+        analysis = game_view(game)
+    response = make_response(render(
+        'gameplay_view.html', form_pass=form_pass, form_show=form_show,
+        form_suggestion=form_suggestion, form_reveal=form_reveal,
+        form_retract=form_retract, grid=analysis.grid,
+        probabilities=analysis.probabilities, analysis_level=analysis.level,
+        suggestions=analysis.suggestions,
+        share_url=url_for('gameplay_view', game=game.game_id,
+                          _external=True)))
+    response.set_etag(game_etag(game))
+    response.cache_control.no_cache = True
+    return response
 
-    game.save(app.config['PICKLE_FILEPATH'])
 
-    return render_template('gameplay_view.html', form_pass=form_pass,
-                           form_show=form_show, form_reveal=form_reveal,
-                           players=game.players, cards=game.cards,
-                           relations=game.relations,
-                           cards_in_the_file=game.cards_in_the_file)
+@app.route('/timeline')
+@with_game
+def timeline(game):
+    k = request.args.get('k', len(game.events), type=int)
+    k = min(max(k, 0), len(game.events))
+    return render(
+        'timeline.html', k=k, grid=GameGrid(game.state_at(k)),
+        events=[describe_event(e) for e in game.events])
 
 
 @app.route('/delete_game', methods=['GET', 'POST'])
 def delete_game():
-    game = Game.load(app.config['PICKLE_FILEPATH'])
-    if not game:
+    game_id = current_game_id()
+    if game_id not in game_store:
         return redirect(url_for('index'))  # TODO: Flash warning
 
     form = DeleteGameForm()
     if form.validate_on_submit():
         if form.confirm.data:
-            Game.delete(app.config['PICKLE_FILEPATH'])
+            game_store.delete(game_id)
+            session.pop('game_id', None)
         return redirect(url_for('index'))
-    return render_template('delete_game.html', form=form)
+    return render('delete_game.html', form=form)
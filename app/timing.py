@@ -0,0 +1,56 @@
+"""timing.py -- Break down where the time goes in each request
+
+Request handlers wrap their work in timed(category) blocks.  Blocks can be
+nested, and each category is only charged for its own time (the time spent
+in blocks nested inside it goes to their categories instead).  At the end of
+the request, the totals are sent back in a Server-Timing header, e.g.:
+
+    Server-Timing: storage;dur=1.20, inference;dur=8.31, render;dur=2.05
+
+so that browsers' developer tools, and the load tester (see loadtest.py), can
+see them.
+
+The categories used are:
+    storage   -- loading, saving and pooling Games (pickling, mostly)
+    inference -- recording events and analyzing the Game
+    render    -- rendering templates
+    view      -- everything else the view function does (form handling)
+
+Functions:
+    timed -- a context manager charging the time spent in it to a category
+"""
+
+from app import app
+from flask import g
+import contextlib
+import time
+
+
+@contextlib.contextmanager
+def timed(category):
+    """Charge the time spent in the with block to category."""
+    stack = g.setdefault('timing_stack', [])
+    totals = g.setdefault('timings', {})
+    now = time.perf_counter()
+    if stack:
+        outer, since = stack[-1]
+        totals[outer] = totals.get(outer, 0.0) + now - since
+    stack.append((category, now))
+    try:
+        yield
+    finally:
+        now = time.perf_counter()
+        category, since = stack.pop()
+        totals[category] = totals.get(category, 0.0) + now - since
+        if stack:
+            stack[-1] = (stack[-1][0], now)
+
+
+@app.after_request
+def add_server_timing(response):
+    timings = g.get('timings')
+    if timings:
+        response.headers['Server-Timing'] = ", ".join(
+            "{};dur={:.2f}".format(name, 1000 * seconds)
+            for name, seconds in timings.items())
+    return response
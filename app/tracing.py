@@ -0,0 +1,91 @@
+"""tracing.py -- Record the form submissions people make, to replay later
+
+Synthetic load (see loadtest.py) is tidier than real use: people enter events
+out of order, twice, or wrongly, and take them back.  When tracing is turned
+on (see TRACE_FILE in config.py), every form submission that can change a
+game is written to a trace file, which replay.py can play back against the
+app later.
+
+A trace file is in JSON Lines format, one submission per line:
+
+    {"time": 1700000000.25, "route": "/gameplay_view",
+     "game_id": "0f3a...", "fields": {"player": ["Adam"], "card": ["Rope"],
+     "submit_reveal": ["y"]}, "status": 200, "seconds": 0.0123}
+
+time is when the request came in, as a Unix timestamp; game_id is the game
+the request was about (for create_game, the new game); fields are the
+submitted form fields (less the CSRF token), each with its list of values;
+and seconds is how long the request took to handle.
+
+The file is rotated when it grows larger than TRACE_MAX_BYTES, keeping
+TRACE_BACKUP_COUNT old files (as TRACE_FILE.1, TRACE_FILE.2, ...).
+
+Classes:
+    TraceRecorder -- writes form submissions to a rotating trace file
+
+Functions:
+    read_trace -- read the submissions from a trace file and its backups
+"""
+
+import json
+import logging
+import logging.handlers
+import os
+
+
+class TraceRecorder:
+    """Writes form submissions to a rotating trace file.
+
+    Public methods:
+        record -- write a form submission to the trace file
+        close  -- close the trace file
+
+    Instance variables:
+        path -- the path of the trace file
+    """
+
+    def __init__(self, path, max_bytes, backup_count):
+        self.path = path
+        self._handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count,
+            encoding="utf-8")
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+        self._logger = logging.getLogger("{}.{}".format(__name__, id(self)))
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+        self._logger.addHandler(self._handler)
+
+    def record(self, time, route, game_id, fields, status, seconds):
+        """Write a form submission to the trace file (see module docstring).
+
+        This is thread-safe.
+        """
+        self._logger.info(json.dumps({
+            "time": time, "route": route, "game_id": game_id,
+            "fields": fields, "status": status, "seconds": seconds}))
+
+    def close(self):
+        """Close the trace file."""
+        self._logger.removeHandler(self._handler)
+        self._handler.close()
+
+
+def read_trace(path):
+    """Read the submissions from a trace file and its rotated backups.
+
+    Returns:
+        a list of dicts (see module docstring), oldest first
+    """
+    paths = []
+    n = 1
+    while os.path.exists("{}.{}".format(path, n)):
+        paths.insert(0, "{}.{}".format(path, n))
+        n += 1
+    if os.path.exists(path):
+        paths.append(path)
+    records = []
+    for p in paths:
+        with open(p, encoding="utf-8") as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    records.sort(key=lambda r: r["time"])
+    return records
@@ -0,0 +1,65 @@
+"""viewcache.py -- A small, bounded, thread-safe cache for derived game views
+
+Anything derived purely from a Game's state (see cluesolver.viewmodel) can be
+cached under the key (game.game_id, game.version): when the game changes, its
+version changes, so stale entries are simply never looked up again, and are
+eventually evicted as least recently used.
+
+Classes:
+    ViewCache -- a bounded least-recently-used cache
+"""
+
+import collections
+import threading
+
+
+class ViewCache:
+    """A bounded least-recently-used mapping, safe to share between threads.
+
+    Public methods:
+        get            -- look up a key, returning a default if missing
+        put            -- store a value under a key
+        get_or_compute -- look up a key, computing and storing it if missing
+    """
+
+    def __init__(self, max_size=64):
+        self.max_size = max_size
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """Return the value stored under key (marking it recently used)."""
+        with self._lock:
+            try:
+                self._entries.move_to_end(key)
+            except KeyError:
+                return default
+            return self._entries[key]
+
+    def put(self, key, value):
+        """Store value under key, evicting the least recently used entry."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        """Return the value under key, calling compute() to fill it if missing.
+
+        compute is called outside the lock, so two threads may occasionally
+        both compute the same value; the views cached here are deterministic,
+        so that is harmless.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
@@ -0,0 +1,30 @@
+"""Clue Solver engine -- Record a Clue game so your computer can solve it!
+
+The board game of Clue is also known as Cluedo.
+
+This package contains the game recording and inference engine, with no
+dependency on the web frontend (see the "app" package), so that it can be
+imported cheaply from scripts and from the command line interface:
+
+    python -m cluesolver {replay,solve,status,batch,archive,import} ...
+
+Modules:
+    cluegame.py -- Tools to record and solve a Clue game
+    objectfilter.py -- General tools to query custom Python objects
+    probability.py -- Fast approximate card location probabilities
+    exact.py -- Exact card location probabilities, by counting deals
+    suggestions.py -- Rank the possible suggestions by what they may reveal
+    whatif.py -- Work out what hypothetical events would let us deduce
+    analysis.py -- Anytime analysis of a Game, within a time budget
+    gamelog.py -- Read, write and replay Clue game event logs
+    store.py -- Keep many Games on disk, and the busy ones in memory
+    batch.py -- Replay a directory of archived games through the Game engine
+    transcript.py -- Import games written down as plain text transcripts
+    archive.py -- A compact, columnar archive of many Clue game event logs
+    knowledge.py -- Games' knowledge matrices as NumPy arrays, for analytics
+    viewmodel.py -- A compact, display-ready summary of a Game's knowledge
+    perspective.py -- Track what each player in a Clue game can deduce
+    membench.py -- Measure how much memory Games take up
+    fuzz.py -- Differential fuzz testing of the Game engine against brute force
+    cli.py -- Command line interface
+"""
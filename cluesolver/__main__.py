@@ -0,0 +1,4 @@
+import sys
+from cluesolver.cli import main
+
+sys.exit(main())
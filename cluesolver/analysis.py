@@ -0,0 +1,252 @@
+"""analysis.py -- Anytime analysis of a Game, within a time budget
+
+There are several levels of analysis of a Game, each slower than the last,
+but better:
+    FACTS       -- the rule-based deductions, as a GameGrid (see viewmodel.py)
+    APPROXIMATE -- plus approximate probabilities (see probability.py), and
+                   suggestion rankings based on them (see suggestions.py)
+    EXACT       -- plus exact probabilities, by counting deals (see exact.py),
+                   and suggestion rankings based on those
+The first two take milliseconds, but exact deal counting can take much longer.
+
+analyze() works through the levels in order until its deadline passes, and
+returns the best level it reached.  An AnalysisRunner does the same for a web
+request, but then keeps refining the analysis in a background worker pool,
+and caches the best result for each game state, so that later requests for
+the same state pick up the improvement.
+
+An AnalysisRunner can also be asked to precompute the analysis of a new game
+state speculatively, as soon as it is recorded, so that it is ready by the
+time it is viewed.  Precomputation for a state that has since been superseded
+by a newer version of the same game is cancelled.  Precomputation for other
+games is not, but runs in a pool of threads, so that one game's long exact
+count holds up the others only if all the threads are busy.
+
+Classes:
+    Analysis       -- the result of analyzing a Game
+    AnalysisRunner -- time-budgeted analysis, refined in the background
+
+Functions:
+    analyze -- analyze a Game as far as possible before a deadline
+
+Constants:
+    FACTS, APPROXIMATE, EXACT -- the levels of analysis, in order
+"""
+
+from cluesolver.exact import exact_probabilities
+from cluesolver.probability import marginal_probabilities
+from cluesolver.suggestions import rank_suggestions
+from cluesolver.viewmodel import GameGrid
+import collections
+import concurrent.futures
+import threading
+import time
+
+FACTS = "facts"
+APPROXIMATE = "approximate"
+EXACT = "exact"
+LEVELS = [FACTS, APPROXIMATE, EXACT]
+
+Analysis = collections.namedtuple(
+    'Analysis', 'game_id version level grid probabilities suggestions')
+Analysis.__doc__ += ': The result of analyzing a Game'
+Analysis.game_id.__doc__ = 'The game_id of the Game analyzed'
+Analysis.version.__doc__ = 'The version of the Game analyzed'
+Analysis.level.__doc__ = 'How far the analysis got: FACTS, APPROXIMATE, EXACT'
+Analysis.grid.__doc__ = 'A GameGrid of the rule-based deductions'
+Analysis.probabilities.__doc__ = \
+    'A MarginalProbabilities (exact or not, according to level), or None'
+Analysis.suggestions.__doc__ = \
+    'The top suggestions to make (see suggestions.py), or None'
+
+
+def analyze(game, deadline=None, previous=None, cancel=None, until=EXACT):
+    """Analyze game, going as far as possible before deadline.
+
+    Arguments:
+        game     -- the Game to analyze
+        deadline -- an optional time.monotonic() value to stop at
+        previous -- an optional earlier Analysis of the same game state, to
+                    build upon rather than repeat
+        cancel   -- an optional threading.Event, to stop at once it is set
+        until    -- the level to stop at, if time allows
+
+    Returns:
+        an Analysis, of at least the FACTS level
+    """
+    def go_on(level):
+        return (result.level == level and level != until and
+                (deadline is None or time.monotonic() < deadline) and
+                (cancel is None or not cancel.is_set()))
+
+    result = previous
+    if result is None:
+        result = Analysis(game.game_id, game.version, FACTS, GameGrid(game),
+                          None, None)
+    if go_on(FACTS):
+        probabilities = marginal_probabilities(game)
+        result = result._replace(level=APPROXIMATE,
+                                 probabilities=probabilities,
+                                 suggestions=rank_suggestions(probabilities))
+    if go_on(APPROXIMATE):
+        try:
+            probabilities = exact_probabilities(game, deadline, cancel)
+        except (TimeoutError, concurrent.futures.CancelledError):
+            return result
+        result = result._replace(level=EXACT,
+                                 probabilities=probabilities,
+                                 suggestions=rank_suggestions(probabilities))
+    return result
+
+
+def _refine(game, seconds):
+    """Analyze game within seconds (run in a background worker)."""
+    return analyze(game, time.monotonic() + seconds)
+
+
+class AnalysisRunner:
+    """Runs time-budgeted analyses, and refines them in the background.
+
+    The best Analysis so far of each game state is kept in a cache under
+    (game_id, version).  Whenever an Analysis falls short of EXACT, a
+    background worker is asked to try again with a longer time budget, at
+    most once per game state.
+
+    Speculative precomputation runs in a pool of background threads, one
+    level at a time (caching each as it is reached), and can be cancelled
+    between levels or during deal counting.  At most one precomputation per
+    game is kept: precomputing a new version cancels the one before.  The
+    pool is shared by all games, so a game's precomputation waits only if
+    every thread is busy with other games' (for at most background_seconds
+    each); to wait less, size the pool like the refinement workers.
+
+    Public methods:
+        cached     -- the best cached Analysis of a Game's state, if any
+        analyze    -- analyze a Game within a time budget
+        precompute -- start analyzing a new Game state ahead of its viewing
+
+    Instance variables:
+        cache              -- a cache with get/put methods (e.g. a ViewCache)
+        background_seconds -- the time budget for each background refinement
+    """
+
+    def __init__(self, cache, executor=None, background_seconds=60.0,
+                 max_attempts=256, speculative_workers=1):
+        """Initializes the runner.
+
+        Arguments:
+            cache               -- where to keep each game state's Analysis
+            executor            -- a concurrent.futures executor to refine
+                                   analyses in (by default, a process pool
+                                   is started when first needed)
+            background_seconds  -- the time budget for each refinement
+            max_attempts        -- how many game states to remember having
+                                   tried to refine, so as not to try again
+            speculative_workers -- how many threads to precompute in
+        """
+        self.cache = cache
+        self.background_seconds = background_seconds
+        self._executor = executor
+        self._max_attempts = max_attempts
+        self._speculative_workers = speculative_workers
+        self._attempts = collections.OrderedDict()
+        self._lock = threading.RLock()
+        self._speculator = None
+        # For each game_id: (version, Future, cancel Event) of the latest
+        # precomputation, until it is done.
+        self._speculative = {}
+
+    def cached(self, game):
+        """Return the best cached Analysis of game's state, or None."""
+        return self.cache.get((game.game_id, game.version))
+
+    def analyze(self, game, seconds):
+        """Return the best Analysis of game that can be had within seconds.
+
+        If game's state is being precomputed, up to half of seconds is spent
+        waiting for that to finish, and the rest (at least) is left to
+        analyze it here, should it not.  If the Analysis is not EXACT, a
+        background refinement is started, and a later call for the same game
+        state may return a better Analysis.
+        """
+        deadline = time.monotonic() + seconds
+        speculative = self._speculative.get(game.game_id)
+        if speculative is not None and speculative[0] == game.version:
+            concurrent.futures.wait([speculative[1]], seconds / 2)
+        previous = self.cached(game)
+        if previous is not None and previous.level == EXACT:
+            return previous
+        result = analyze(game, deadline, previous)
+        self.__store(result)
+        if result.level != EXACT and game.game_id not in self._speculative:
+            self.__refine_in_background(game)
+        return self.cached(game) or result
+
+    def precompute(self, game):
+        """Start analyzing game's state in the background.
+
+        Any precomputation still running for an earlier version of the same
+        game is cancelled.  The Game must not be changed afterwards (pass a
+        copy if it will be).
+        """
+        with self._lock:
+            self.__cancel(game.game_id)
+            if self._speculator is None:
+                self._speculator = concurrent.futures.ThreadPoolExecutor(
+                    self._speculative_workers)
+            cancel = threading.Event()
+            future = self._speculator.submit(self.__precompute, game, cancel)
+            self._speculative[game.game_id] = (game.version, future, cancel)
+        future.add_done_callback(
+            lambda f: self.__precomputed(game.game_id, f))
+
+    def __cancel(self, game_id):
+        """Cancel the precomputation for game_id, if any (holding the lock)."""
+        speculative = self._speculative.pop(game_id, None)
+        if speculative is not None:
+            speculative[2].set()
+            speculative[1].cancel()
+
+    def __precompute(self, game, cancel):
+        deadline = time.monotonic() + self.background_seconds
+        result = self.cached(game)
+        for level in LEVELS:
+            if cancel.is_set():
+                return
+            result = analyze(game, deadline, result, cancel, level)
+            self.__store(result)
+
+    def __precomputed(self, game_id, future):
+        with self._lock:
+            speculative = self._speculative.get(game_id)
+            if speculative is not None and speculative[1] is future:
+                del self._speculative[game_id]
+
+    def __store(self, result):
+        """Cache result, unless a better Analysis is cached already."""
+        key = (result.game_id, result.version)
+        with self._lock:
+            cached = self.cache.get(key)
+            if cached is None or \
+                    LEVELS.index(cached.level) < LEVELS.index(result.level):
+                self.cache.put(key, result)
+
+    def __refine_in_background(self, game):
+        key = (game.game_id, game.version)
+        with self._lock:
+            if key in self._attempts:
+                return
+            self._attempts[key] = True
+            while len(self._attempts) > self._max_attempts:
+                self._attempts.popitem(last=False)
+            if self._executor is None:
+                self._executor = concurrent.futures.ProcessPoolExecutor()
+        # The executor pickles its arguments later, in a thread of its own,
+        # by when the Game may have changed; so it is given a snapshot.
+        future = self._executor.submit(
+            _refine, game.fork(game.game_id), self.background_seconds)
+        future.add_done_callback(self.__refined)
+
+    def __refined(self, future):
+        if not future.cancelled() and future.exception() is None:
+            self.__store(future.result())
@@ -0,0 +1,322 @@
+"""archive.py -- A compact, columnar archive of many Clue game event logs
+
+Event logs (see gamelog.py) and pickled Games are fine for a handful of games,
+but an archive of every game ever played takes a lot of disk space in those
+formats, and every game must be parsed in full before anything can be asked
+of it.  This module keeps many games' event logs in one directory, column by
+column, as flat arrays of fixed-width integers:
+
+    meta.json    -- the format version, the game and event counts, and the
+                    distinct game setups (see gamelog.game_setup)
+    game_id.bin  -- per game: its game_id, as 16 raw bytes
+    setup.bin    -- per game: the index of its setup in meta.json (uint32)
+    ends.bin     -- per game: the index just past its last event (uint64), so
+                    that game i's events are those from ends[i - 1] (or 0)
+                    up to ends[i]
+    game.bin     -- per event: the index of its game (uint32)
+    kind.bin     -- per event: its kind, as an index into KINDS (uint8)
+    player.bin   -- per event: its player, as a seat number (uint8)
+    cards.bin    -- per event: its (up to 3) cards, as indices into the setup's
+                    persons + weapons + rooms, padded with -1 (3 x int8)
+    shower.bin   -- per event: for suggestions, the seat number of the player
+                    who showed a card, or -1 (int8)
+    shown.bin    -- per event: for suggestions, the card shown, or -1 (int8)
+
+All numbers are little-endian.  The columns are memory-mapped by Archive, so
+opening an archive is instant whatever its size, and NumPy can scan or filter
+whole columns (e.g. find every game in which a suggestion went unanswered)
+without decoding a single game.  Only the selected games are then decoded
+back into ClueEvents, and replayed into Games.
+
+Games are only ever appended to an archive.  The counts in meta.json are
+written last, so an archive interrupted while being written is still valid:
+it just lacks the games that were being added.
+
+Classes:
+    ArchiveWriter -- appends games to an archive
+    Archive       -- a memory-mapped, read-only view of an archive
+
+Constants:
+    KINDS -- the event kinds, in the order they are numbered in the archive
+"""
+
+from cluesolver.cluegame import ClueEvent
+from cluesolver import gamelog
+import json
+import os
+import numpy as np
+
+FORMAT_VERSION = 1
+
+KINDS = ("have", "pass", "show", "suggest")
+
+GAME_COLUMNS = {
+    "game_id": np.dtype("V16"),
+    "setup": np.dtype("<u4"),
+    "ends": np.dtype("<u8"),
+}
+
+EVENT_COLUMNS = {
+    "game": np.dtype("<u4"),
+    "kind": np.dtype("u1"),
+    "player": np.dtype("u1"),
+    "cards": np.dtype(("i1", 3)),
+    "shower": np.dtype("i1"),
+    "shown": np.dtype("i1"),
+}
+
+
+def _setup_cards(setup):
+    """The card names of a setup dict, in the order they are numbered."""
+    return setup["persons"] + setup["weapons"] + setup["rooms"]
+
+
+def _read_meta(path):
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    if meta.get("format") != FORMAT_VERSION:
+        raise ValueError("Unsupported archive format: {!r}".format(
+            meta.get("format")))
+    return meta
+
+
+class ArchiveWriter:
+    """Appends games to an archive, creating it if need be.
+
+    Games are buffered in memory, and written out every flush_events events,
+    and on close.  An ArchiveWriter is a context manager, which closes it.
+
+    Public methods:
+        add     -- append a Game to the archive
+        add_log -- append a setup and list of events to the archive
+        flush   -- write out the buffered games
+        close   -- write out the buffered games, and stop writing
+
+    Instance variables:
+        path         -- the directory of the archive
+        flush_events -- how many events to buffer before writing them out
+    """
+
+    def __init__(self, path, flush_events=65536):
+        self.path = path
+        self.flush_events = flush_events
+        os.makedirs(path, exist_ok=True)
+        if os.path.exists(os.path.join(path, "meta.json")):
+            meta = _read_meta(path)
+        else:
+            meta = {"format": FORMAT_VERSION, "games": 0, "events": 0,
+                    "setups": []}
+        self._meta = meta
+        self._setups = {json.dumps(s, sort_keys=True): i
+                        for i, s in enumerate(meta["setups"])}
+        self._files = {}
+        for columns, count in [(GAME_COLUMNS, meta["games"]),
+                               (EVENT_COLUMNS, meta["events"])]:
+            for name, dtype in columns.items():
+                f = open(os.path.join(path, name + ".bin"), "ab")
+                # Drop anything written after the last complete flush.
+                f.truncate(count * dtype.itemsize)
+                self._files[name] = f
+        self._buffers = {name: [] for name in self._files}
+        self._buffered_events = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add(self, game):
+        """Append a Game's setup and event log to the archive."""
+        self.add_log(gamelog.game_setup(game), game.events, game.game_id)
+
+    def add_log(self, setup, events, game_id=None):
+        """Append a game, given as a setup dict and a list of ClueEvents.
+
+        Arguments:
+            setup   -- the game setup dict (see gamelog.py)
+            events  -- the list of ClueEvents, in the order they happened
+            game_id -- the game's id, as 32 hex digits (default: random)
+
+        Raises ValueError if the game does not fit the archive format.
+        """
+        game_id = bytes.fromhex(game_id) if game_id else os.urandom(16)
+        if len(game_id) != 16:
+            raise ValueError("Invalid game id: {}".format(game_id.hex()))
+        key = json.dumps(setup, sort_keys=True)
+        if key not in self._setups:
+            if len(_setup_cards(setup)) > 127 or len(setup["players"]) > 127:
+                raise ValueError("Too many cards or players to archive")
+            self._setups[key] = len(self._meta["setups"])
+            self._meta["setups"].append(setup)
+        cards = {name: i for i, name in enumerate(_setup_cards(setup))}
+        seats = {p[0]: i for i, p in enumerate(setup["players"])}
+
+        rows = []
+        for e in events:
+            e = ClueEvent(*e)
+            if e.kind not in KINDS:
+                raise ValueError("Unknown event kind: {!r}".format(e.kind))
+            if len(e.cards) > 3:
+                raise ValueError("Too many cards in event: {}".format(e))
+            padding = [-1] * (3 - len(e.cards))
+            try:
+                row = (KINDS.index(e.kind), seats[e.player],
+                       [cards[c] for c in e.cards] + padding,
+                       seats[e.shower] if e.shower else -1,
+                       cards[e.shown] if e.shown else -1)
+            except KeyError as err:
+                raise ValueError("Unknown player or card in event {}: {}"
+                                 .format(e, err))
+            rows.append(row)
+
+        game = self._meta["games"] + len(self._buffers["game_id"])
+        end = self._meta["events"] + self._buffered_events + len(rows)
+        self._buffers["game_id"].append(game_id)
+        self._buffers["setup"].append(self._setups[key])
+        self._buffers["ends"].append(end)
+        self._buffers["game"].extend([game] * len(rows))
+        for name, column in zip(["kind", "player", "cards", "shower",
+                                 "shown"], zip(*rows)):
+            self._buffers[name].extend(column)
+        self._buffered_events += len(rows)
+        if self._buffered_events >= self.flush_events:
+            self.flush()
+
+    def flush(self):
+        """Write out the buffered games, then the counts in meta.json."""
+        buffered_games = len(self._buffers["game_id"])
+        for columns in [GAME_COLUMNS, EVENT_COLUMNS]:
+            for name, dtype in columns.items():
+                buffer = self._buffers[name]
+                if dtype == GAME_COLUMNS["game_id"]:
+                    data = b"".join(buffer)
+                else:
+                    data = np.array(buffer, dtype=dtype.base).tobytes()
+                self._files[name].write(data)
+                self._files[name].flush()
+                buffer.clear()
+        self._meta["games"] += buffered_games
+        self._meta["events"] += self._buffered_events
+        self._buffered_events = 0
+        meta_path = os.path.join(self.path, "meta.json")
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump(self._meta, f)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    def close(self):
+        """Write out the buffered games, and close the archive files."""
+        if self._files:
+            self.flush()
+            for f in self._files.values():
+                f.close()
+            self._files = {}
+
+
+class Archive:
+    """A memory-mapped, read-only view of an archive written by ArchiveWriter.
+
+    Every column (see module docstring) is available as a NumPy array
+    attribute of the same name, memory-mapped from its file.  For example,
+    the indices of the games in which some suggestion went unanswered are:
+
+        archive.select((archive.kind == KINDS.index("suggest")) &
+                       (archive.shower == -1))
+
+    Public methods:
+        setup_of   -- the setup dict of a game
+        events_of  -- the list of ClueEvents of a game
+        replay     -- replay a game into a new Game
+        games      -- replay many games, one at a time
+        select     -- the games with any events matching a mask
+        find       -- the index of a game, given its game_id
+        game_id_of -- the game_id of a game
+
+    Instance variables:
+        path   -- the directory of the archive
+        setups -- the list of distinct game setup dicts
+        (and one array per column)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        meta = _read_meta(path)
+        self.setups = meta["setups"]
+        for columns, count in [(GAME_COLUMNS, meta["games"]),
+                               (EVENT_COLUMNS, meta["events"])]:
+            for name, dtype in columns.items():
+                if count:
+                    column = np.memmap(os.path.join(path, name + ".bin"),
+                                       dtype=dtype, mode="r",
+                                       shape=(count,))
+                else:
+                    column = np.empty((0,), dtype=dtype)
+                setattr(self, name, column)
+
+    def __len__(self):
+        return len(self.ends)
+
+    def setup_of(self, i):
+        """Return the setup dict of the i-th game."""
+        return self.setups[self.setup[i]]
+
+    def events_of(self, i):
+        """Return the list of ClueEvents of the i-th game."""
+        setup = self.setup_of(i)
+        cards = _setup_cards(setup)
+        seats = [p[0] for p in setup["players"]]
+        start, end = int(self.ends[i - 1]) if i else 0, int(self.ends[i])
+        events = []
+        for kind, player, event_cards, shower, shown in zip(
+                self.kind[start:end].tolist(),
+                self.player[start:end].tolist(),
+                self.cards[start:end].tolist(),
+                self.shower[start:end].tolist(),
+                self.shown[start:end].tolist()):
+            events.append(ClueEvent(
+                KINDS[kind], seats[player],
+                [cards[c] for c in event_cards if c >= 0],
+                seats[shower] if shower >= 0 else None,
+                cards[shown] if shown >= 0 else None))
+        return events
+
+    def replay(self, i):
+        """Replay the i-th game into a new Game, with its archived game_id."""
+        game = gamelog.replay(self.setup_of(i), self.events_of(i))
+        game.game_id = self.game_id_of(i)
+        return game
+
+    def games(self, indices=None):
+        """Replay the given games (default: all), yielding each Game in turn.
+
+        Only one game is decoded and replayed at a time, so this is suitable
+        for scanning however many games.
+        """
+        if indices is None:
+            indices = range(len(self))
+        for i in indices:
+            yield self.replay(int(i))
+
+    def select(self, mask):
+        """Return the sorted indices of the games with any event in mask.
+
+        Arguments:
+            mask -- a boolean array over all events, as obtained by comparing
+                    the event columns
+        """
+        return np.unique(self.game[np.asarray(mask, dtype=bool)])
+
+    def find(self, game_id):
+        """Return the index of the game with the given game_id.
+
+        Raises KeyError if the archive has no such game.
+        """
+        matches = np.flatnonzero(
+            self.game_id == np.void(bytes.fromhex(game_id)))
+        if not len(matches):
+            raise KeyError(game_id)
+        return int(matches[0])
+
+    def game_id_of(self, i):
+        """Return the game_id of the i-th game, as 32 hex digits."""
+        return bytes(self.game_id[i]).hex()
@@ -0,0 +1,145 @@
+"""batch.py -- Replay a directory of archived games through the Game engine
+
+This is a tool for comparing versions of the inference engine: it replays every
+archived game (event logs or pickled Games, see gamelog.py) found in a
+directory through the current Game class, in a pool of worker processes, and
+writes one result row per game as CSV or JSON Lines.
+
+Game files are streamed from the directory and results are streamed to the
+output, with only a bounded number of games in flight at once, so memory use
+does not grow with the number of games.
+
+Usage:
+    python -m cluesolver.batch DIRECTORY [-o OUTPUT] [--format csv|json]
+                               [-j JOBS]
+
+Functions:
+    iter_game_files -- lazily list the archived game files in a directory
+    analyze_game    -- replay one archived game and measure the results
+    run_batch       -- analyze many games in a process pool
+    main            -- command line entry point
+"""
+
+from cluesolver.cluegame import ClueCardType, ClueRelationType
+from cluesolver import gamelog
+import argparse
+import concurrent.futures
+import csv
+import json
+import os
+import sys
+import time
+
+
+GAME_FILE_SUFFIXES = (".jsonl", ".pickledb", ".pickle")
+
+RESULT_FIELDS = ["game", "events", "haves", "passes", "envelope_event",
+                 "total_seconds", "mean_event_seconds", "max_event_seconds",
+                 "error"]
+
+
+def iter_game_files(directory):
+    """Lazily yield paths of archived game files under directory."""
+    for entry in os.scandir(directory):
+        if entry.is_dir():
+            yield from iter_game_files(entry.path)
+        elif entry.name.endswith(GAME_FILE_SUFFIXES):
+            yield entry.path
+
+
+def analyze_game(path):
+    """Replay one archived game through a fresh Game, and measure it.
+
+    Returns:
+        a dict with the keys in RESULT_FIELDS; envelope_event is the (1-based)
+        number of the event after which all cards in the file were known
+    """
+    result = dict.fromkeys(RESULT_FIELDS)
+    result["game"] = path
+    try:
+        setup, events = gamelog.open_log(path)
+        game = gamelog.new_game(setup)
+        timings = []
+        for i, e in enumerate(events, start=1):
+            start = time.perf_counter()
+            game.record_event(e)
+            timings.append(time.perf_counter() - start)
+            if result["envelope_event"] is None and \
+                    len(game.cards_in_the_file) == len(ClueCardType):
+                result["envelope_event"] = i
+    except Exception as e:
+        result["error"] = "{}: {}".format(type(e).__name__, e)
+        return result
+
+    result["events"] = len(timings)
+    result["haves"] = sum(1 for r in game.relations
+                          if r.rel_type == ClueRelationType.HAVE)
+    result["passes"] = sum(1 for r in game.relations
+                           if r.rel_type == ClueRelationType.PASS)
+    result["total_seconds"] = sum(timings)
+    if timings:
+        result["mean_event_seconds"] = sum(timings) / len(timings)
+        result["max_event_seconds"] = max(timings)
+    return result
+
+
+def run_batch(paths, jobs=None, max_pending=None):
+    """Analyze games in a process pool, yielding results as they complete.
+
+    At most max_pending games are submitted to the pool at any one time, so
+    paths may be an arbitrarily long (lazy) iterable.
+
+    Arguments:
+        paths       -- an iterable of archived game file paths
+        jobs        -- number of worker processes (default: CPU count)
+        max_pending -- max games in flight (default: 4 per worker)
+    """
+    jobs = jobs or os.cpu_count() or 1
+    max_pending = max_pending or 4 * jobs
+    paths = iter(paths)
+    with concurrent.futures.ProcessPoolExecutor(jobs) as pool:
+        pending = set()
+        while True:
+            for path in paths:
+                pending.add(pool.submit(analyze_game, path))
+                if len(pending) >= max_pending:
+                    break
+            if not pending:
+                return
+            done, pending = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Replay archived Clue games and report the results.")
+    parser.add_argument("directory",
+                        help="directory of event logs or pickled games")
+    parser.add_argument("-o", "--output", default="-",
+                        help="file to write results to (default: stdout)")
+    parser.add_argument("--format", choices=["csv", "json"], default="csv")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="number of worker processes")
+    args = parser.parse_args(argv)
+
+    out = sys.stdout if args.output == "-" else \
+        open(args.output, "w", newline="")
+    try:
+        if args.format == "csv":
+            writer = csv.DictWriter(out, fieldnames=RESULT_FIELDS)
+            writer.writeheader()
+            write = writer.writerow
+        else:
+            def write(result):
+                out.write(json.dumps(result) + "\n")
+        for result in run_batch(iter_game_files(args.directory), args.jobs):
+            write(result)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""cli.py -- Command line interface to the Clue Solver engine
+
+Each command reads a game, either as an event log (see gamelog.py) or as a
+pickled Game, from a file or from standard input ("-", the default), and
+replays it through the Game inference engine.
+
+Commands:
+    replay -- replay the events, printing what each one lets us deduce
+    solve  -- print the cards known to be in the file
+    status -- print a card-by-player grid of everything known
+    batch  -- replay a whole directory of games (see batch.py)
+    archive -- pack a directory of games into a columnar archive (archive.py)
+    import -- import text or CSV game transcripts (see transcript.py)
+
+Startup time matters here (the CLI is meant to be run from scripts, possibly
+once per game), so only the engine itself is imported up front; in particular,
+nothing from the Flask web app, and nothing heavier than the standard library.
+
+Functions:
+    main -- command line entry point
+"""
+
+from cluesolver.cluegame import ClueCardType, ClueRelationType
+from cluesolver.viewmodel import GameGrid, HAVE, PASS, SHOW, UNKNOWN
+from cluesolver import gamelog
+import argparse
+import os
+import sys
+import time
+
+
+def _read_game(path):
+    """Return (setup, events) from a log/pickle path, or "-" for stdin."""
+    if path == "-":
+        return gamelog.read_log(sys.stdin)
+    return gamelog.open_log(path)
+
+
+def _known_facts(game):
+    return {(r.rel_type.value, r.player.name, r.cards[0].name)
+            for r in game.relations
+            if r.rel_type != ClueRelationType.SHOW}
+
+
+def replay(args, out):
+    setup, events = _read_game(args.file)
+    game = gamelog.new_game(setup)
+    known = set()
+    for i, e in enumerate(events, start=1):
+        game.record_event(e)
+        facts = _known_facts(game)
+        new_facts = sorted(facts - known)
+        known = facts
+        out.write("{}: {} {} {}\n".format(
+            i, e.player, e.kind, ", ".join(e.cards)))
+        for rel_type, player, card in new_facts:
+            out.write("    => {} {} {}\n".format(
+                player, rel_type, card))
+    if args.save:
+        game.save(args.save)
+
+
+def solve(args, out):
+    game = gamelog.replay(*_read_game(args.file))
+    in_the_file = game.cards_in_the_file
+    for t in ClueCardType:
+        names = [c.name for c in in_the_file if c.card_type == t]
+        out.write("{}: {}\n".format(t.value, names[0] if names else "?"))
+    return 0 if len(in_the_file) == len(ClueCardType) else 1
+
+
+def status(args, out):
+    grid = GameGrid(gamelog.replay(*_read_game(args.file)))
+    marks = {HAVE: "X", PASS: "-", SHOW: "?", UNKNOWN: "."}
+    card_width = max(len(c.name) for c in grid.cards)
+    widths = [max(len(p), 1) for p in grid.players]
+    out.write(" " * card_width + "  " +
+              "  ".join(grid.players) + "  File\n")
+    for card, statuses, in_the_file in grid.rows():
+        row = [marks[s].ljust(w) for s, w in zip(statuses, widths)]
+        row.append("X" if in_the_file else "")
+        out.write(card.name.ljust(card_width) + "  " +
+                  "  ".join(row).rstrip() + "\n")
+
+
+def batch(args, out):
+    from cluesolver import batch as batch_module
+    argv = [args.directory, "--format", args.format]
+    if args.jobs:
+        argv += ["--jobs", str(args.jobs)]
+    if args.output:
+        argv += ["--output", args.output]
+    batch_module.main(argv)
+
+
+def archive(args, out):
+    from cluesolver.archive import ArchiveWriter
+    from cluesolver.batch import iter_game_files
+    count = 0
+    with ArchiveWriter(args.archive) as writer:
+        for path in iter_game_files(args.directory):
+            setup, events = gamelog.open_log(path)
+            writer.add_log(setup, events)
+            count += 1
+    out.write("Archived {} games in {}\n".format(count, args.archive))
+
+
+def import_transcripts(args, out):
+    from cluesolver import transcript
+    start = time.perf_counter()
+    n_events = n_errors = 0
+    for path in args.files:
+        game, errors = transcript.import_file(path)
+        for e in errors:
+            out.write("{}:{}: {}\n".format(path, e.line, e.message))
+        n_events += len(game.events)
+        n_errors += len(errors)
+        if args.output:
+            name = os.path.splitext(os.path.basename(path))[0] + ".jsonl"
+            with open(os.path.join(args.output, name), "w") as f:
+                gamelog.write_log(game, f)
+    out.write("Imported {} games, {} events, with {} errors in {:.2f}s\n"
+              .format(len(args.files), n_events, n_errors,
+                      time.perf_counter() - start))
+    return 1 if n_errors else 0
+
+
+def main(argv=None, out=None):
+    out = out or sys.stdout
+    parser = argparse.ArgumentParser(
+        prog="cluesolver",
+        description="Record a Clue game so your computer can solve it!")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser(
+        "replay", help="replay events, printing what each one reveals")
+    p.add_argument("file", nargs="?", default="-",
+                   help="event log or pickled game (default: stdin)")
+    p.add_argument("--save", help="pickle the resulting game to this path")
+    p.set_defaults(func=replay)
+
+    for name, func, help_text in [
+            ("solve", solve, "print the cards known to be in the file"),
+            ("status", status, "print a grid of everything known")]:
+        p = commands.add_parser(name, help=help_text)
+        p.add_argument("file", nargs="?", default="-",
+                       help="event log or pickled game (default: stdin)")
+        p.set_defaults(func=func)
+
+    p = commands.add_parser(
+        "batch", help="replay a directory of games in a process pool")
+    p.add_argument("directory")
+    p.add_argument("-o", "--output")
+    p.add_argument("--format", choices=["csv", "json"], default="csv")
+    p.add_argument("-j", "--jobs", type=int)
+    p.set_defaults(func=batch)
+
+    p = commands.add_parser(
+        "archive", help="pack a directory of games into a columnar archive")
+    p.add_argument("directory")
+    p.add_argument("archive", help="archive directory to add the games to")
+    p.set_defaults(func=archive)
+
+    p = commands.add_parser(
+        "import", help="import text or CSV game transcripts")
+    p.add_argument("files", nargs="+", metavar="file")
+    p.add_argument("-o", "--output",
+                   help="directory to write the games to, as event logs")
+    p.set_defaults(func=import_transcripts)
+
+    args = parser.parse_args(argv)
+    try:
+        result = args.func(args, out)
+    except (ValueError, OSError) as e:
+        parser.exit(2, "cluesolver: error: {}\n".format(e))
+    return result if isinstance(result, int) else 0
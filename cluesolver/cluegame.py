@@ -0,0 +1,1365 @@
+"""cluegame.py -- Classes to track Clue game events and make inferences
+
+The board game Clue is also known as Cluedo.  This module contains classes that
+make it possible to record specific knowledge-generating events that a Clue
+player may observe during the course of a game (such as, for example, that
+Player A showed Player B one of either Card X, Card Y, or Card Z).
+
+More to the point, Clue is a game about building knowledge through logical
+inference. As such, these classes are designed to track not only these events
+themselves, but also the sum total of game knowledge that can be logically
+inferred from them.
+
+Classes:
+    ClueCardType     -- an Enum of possible card types in the game
+    ClueRelationType -- an Enum of possible types of Player-Card relation
+    Player           -- a player in the Clue game
+    Card             -- a card in the Clue game
+    ClueRelation     -- an individual Player-Card relation that is known
+    ClueEvent        -- a user-entered game event, as recorded in a Game
+    ClueContradiction -- raised when events contradict each other
+    Rule             -- a deduction rule of the Game engine
+    RuleStats        -- how much work a deduction rule has done
+    Game             -- a tracker and inference engine for total game knowledge
+
+Functions:
+    normalize_to_list -- matches an object (or its name) to a list of objects
+    deduction_rules   -- the deduction rules, in the order they are run
+    rule_stats        -- how much work each deduction rule has done
+
+Constants:
+    UNKNOWN, HAS, PASSES -- the values in a Game's knowledge matrix (see
+                            Game.knowledge)
+"""
+
+from cluesolver.objectfilter import ObjectFilter
+import array
+import enum
+import pickle
+import os
+import collections
+import contextlib
+import time
+
+
+class ClueCardType(enum.Enum):
+    """an Enum of possible card types in a Clue game"""
+    PERSON = "Person"
+    WEAPON = "Weapon"
+    ROOM = "Room"
+
+
+class ClueRelationType(enum.Enum):
+    """an Enum of possible types of Player-Card relation to record in Clue
+
+    These represent my own semi-invented terminology for describing a player's
+    knowledge in a Clue game.  In case their meanings are not entirely
+    self-evident, an explanation of these terms and how they relate to player
+    knowledge in the game of Clue can be found the package README.md file; see
+    esp. the "Theory" section.
+    """
+    HAVE = "have"
+    PASS = "pass"
+    SHOW = "show"
+
+
+# How relation types are stored (see Game.__init_relations).  A fact of 0
+# means nothing is known.
+_HAVE, _PASS, _SHOW, _RESOLVED = 1, 2, 3, 4
+_CODES = {ClueRelationType.HAVE: _HAVE, ClueRelationType.PASS: _PASS,
+          ClueRelationType.SHOW: _SHOW}
+_TYPES = {_HAVE: ClueRelationType.HAVE, _PASS: ClueRelationType.PASS,
+          _SHOW: ClueRelationType.SHOW, _RESOLVED: ClueRelationType.SHOW}
+
+# The values in a Game's knowledge matrix (see Game.knowledge).
+UNKNOWN, HAS, PASSES = 0, _HAVE, _PASS
+
+Player = collections.namedtuple('Player', 'name hand_size')
+Player.__doc__ += ': A player in the Clue game'
+Player.name.__doc__ = 'A name by which this player is identified'
+Player.hand_size.__doc__ = 'Number of cards in hand of this player'
+
+Card = collections.namedtuple('Card', 'name card_type')
+Card.__doc__ += ': A card in the Clue game'
+Card.name.__doc__ = 'A name by which this card is identified'
+Card.card_type.__doc__ = 'Which ClueCardType this card belongs to'
+
+ClueEvent = collections.namedtuple(
+    'ClueEvent', 'kind player cards shower shown', defaults=(None, None))
+ClueEvent.__doc__ += ': A user-entered event in the Clue game'
+ClueEvent.kind.__doc__ = \
+    'A ClueRelationType value ("have", "pass", "show"), or "suggest"'
+ClueEvent.player.__doc__ = 'The name of the Player involved (or suggesting)'
+ClueEvent.cards.__doc__ = 'A list of the names of the Cards involved'
+ClueEvent.shower.__doc__ = \
+    'For a "suggest" event, the name of the Player who showed a card, if any'
+ClueEvent.shown.__doc__ = \
+    'For a "suggest" event, the name of the Card shown, if it was seen'
+
+
+class ClueContradiction(ValueError):
+    """Raised when a recorded event contradicts what is already known.
+
+    Instance variables:
+        event -- the ClueEvent that revealed the contradiction, if known
+    """
+    event = None
+
+
+def normalize_to_list(obj, lst):
+    """Returns a matching member of a Player or Card list, if possible.
+
+    Assumes names of objects in the list are unique, for match by name.
+
+    Arguments:
+        obj -- a Player, Card, or a name (string) representing one
+        lst -- a list of Players or Cards
+
+    Returns:
+        a Player or Card from the list, matching obj
+    """
+    if obj in lst:
+        return obj
+
+    try:
+        my_obj = next(o for o in lst if o.name == obj)
+
+    except(StopIteration):
+        raise ValueError("No such Player/Card {} in list {}".format(
+            obj, lst))
+
+    return my_obj
+
+
+class ClueRelation(collections.namedtuple(
+        'ClueRelation', 'rel_type player cards')):
+    """A generalized representation of a piece of Clue game knowledge to record
+
+    A ClueRelation instance represents knowledge of a specific type of
+    relationship between a given Player, and one or more given Cards.
+
+    How many Cards are in a relation, depends on the relation's type:
+        A HAVE or PASS relation has 1 card.
+        A SHOW relation has 3 cards.
+
+    Instance variables:
+        rel_type -- a ClueRelationType, defining the type of this relation
+        player   -- the Player who is involved in this relation
+        cards    -- a list of the Card(s) involved in this relation
+
+    The __contains__ method is signficiantly customized (perhaps "bastardized")
+    to aid querying.
+    """
+    __slots__ = ()
+
+    def __repr__(self):
+        return "ClueRelation(Type={}, Player={}, Cards={})".format(
+            self.rel_type, self.player, self.cards)
+
+    def __contains__(self, obj):
+        """Checks for any of several distinct conditions
+
+        The inherited method is overridden, in a slight abuse, to check whether
+        ANY of the following two conditions holds (logical "or"):
+            - a given Player is self.player
+            - a given Card is in self.cards
+            - a given ClueCardType is represented among self.cards
+
+        The last condition may seem strange, but I found it a useful trick to
+        help keep the semantics consistently intuitive for certain queries that
+        become relevant when making inferences in the game of Clue.  If I come
+        up with a better way (i.e. a simple way to query lists of ClueRelations
+        with intuitive-enough semantics that avoids the need for it), then I
+        may consider removing this last condition, as it seems potentially
+        confusing.
+        """
+        return obj == self.player \
+            or obj in self.cards \
+            or obj in [c.card_type for c in self.cards]
+
+
+class ClueRelationFilter(ObjectFilter):
+    """A tool to query a list of ClueRelations
+
+    Public methods (besides inherited methods):
+        match -- recursively tests aspects of a ClueRelation
+    """
+    __slots__ = ()
+
+    def match(self, relation):
+        """Recursively check if relation matches all filter statements.
+
+        Arguments:
+            relation -- the relation to check
+        """
+        if self.statement == "and":
+            return self.left.match(relation) and self.right.match(relation)
+        elif self.statement == "or":
+            return self.left.match(relation) or self.right.match(relation)
+        elif self.statement == "not":
+            return not self.left.match(relation)
+        elif self.statement == "all":
+            return True
+        elif self.statement in list(ClueRelationType):
+            return relation.rel_type == self.statement
+        else:
+            return self.statement in relation
+
+
+Rule = collections.namedtuple('Rule', 'name triggers scope cost')
+Rule.__doc__ += ': A deduction rule of the Game engine (see Game.__propagate)'
+Rule.name.__doc__ = 'The name of the rule'
+Rule.triggers.__doc__ = \
+    'The ClueRelationTypes of the new relations that wake the rule up'
+Rule.scope.__doc__ = \
+    'What the rule is run on: "relation", "player" or "card type"'
+Rule.cost.__doc__ = 'An estimate of the cost of running the rule once'
+
+RuleStats = collections.namedtuple(
+    'RuleStats', 'wakeups runs deductions seconds')
+RuleStats.__doc__ += ': How much work a deduction rule has done'
+RuleStats.wakeups.__doc__ = 'How many new relations have woken the rule up'
+RuleStats.runs.__doc__ = 'How many times the rule has been run'
+RuleStats.deductions.__doc__ = 'How many new relations the rule has recorded'
+RuleStats.seconds.__doc__ = 'How many seconds its runs have taken in all'
+
+_registered_rules = []
+
+
+def _rule(triggers, scope, cost):
+    """Register a Game method as a deduction rule (see Game.__propagate)."""
+    def register(method):
+        _registered_rules.append((Rule(
+            method.__name__.strip('_'), tuple(triggers), scope, cost), method))
+        return method
+    return register
+
+
+class Game:
+    """Encapsulates and updates the total state of the game knowledge.
+
+    The Game instance knows the following:
+        - a set of Cards (self.cards)
+        - a set of Players (self.players)
+        - all known ClueRelations between Players and Cards (self.relations),
+          except for SHOWs that are resolved -- i.e. for which we know which of
+          the cards the player has -- which are moved to self.resolved_shows
+        - which Cards are "in the file", meaning the Clue confidential file --
+          this is how you win folks! (self.cards_in_the_file)
+
+    The Game instance provides public methods to record new ClueRelations as
+    they become known.  Each such user-entered event is also kept, in order, in
+    an event log (self.events), so that the game can be replayed.
+
+    These same public methods also repeatedly check for and record the
+    consequences of any logical deductions that follow from each
+    newly-discovered ClueRelation.
+
+    There are also save/load/delete methods to handle persisting the game
+    state.  Each Game has a random game_id, and a version counter which is
+    incremented whenever its state changes, so that anything derived from a
+    given game state can be cached under (game_id, version).  Snapshots of
+    the state are kept every CHECKPOINT_INTERVAL events, so that the state at
+    any point in the game can be recovered quickly (see state_at).
+
+    A Game can be forked (see fork) to try out hypothetical events without
+    touching the original.  Forks share all of their state with the original
+    until either of them changes, and even then only the containers are
+    copied, not the (immutable) Players, Cards and ClueEvents in them.
+
+    The deductions are made by rules, each of which declares which types of
+    new relation wake it up, and an estimate of its cost.  Cheap rules, which
+    only look at the new relation itself, are run before more costly rules,
+    which look at a player's whole hand or at all the cards of a type; and
+    those only run once for each player (or card type) with new relations
+    since they last ran, however many (see __propagate, and rule_stats).
+
+    Internally, Players and Cards are numbered, and relations are stored as
+    columns of small integers (see __init_relations), which takes a fraction
+    of the memory of ClueRelation objects.  self.relations and
+    self.resolved_shows make ClueRelation objects out of them on demand.
+    What is known of who has which card is kept as a players x cards matrix
+    of bytes, which self.knowledge exposes without copying it.
+
+    Public methods:
+        record_have
+        record_pass
+        record_show
+        record_suggestion
+        record_event
+        retract_event
+        state_at
+        fork
+        conflicting_events
+        batch
+        knowledge
+        save
+
+    Class methods:
+        load
+        delete
+
+    Instance variables:
+        players
+        seating
+        cards
+        player_order
+        card_order
+        cards_in_the_file
+        relations
+        resolved_shows
+        events
+        game_id
+        version
+    """
+
+    CHECKPOINT_INTERVAL = 16
+
+    def __init__(self,
+                 clue_cards_persons,
+                 clue_cards_weapons,
+                 clue_cards_rooms,
+                 players):
+        """Initializes the game state.
+
+        Creates a set of Players and a set of Cards.  All other instance
+        variables are initialized to empty.
+
+        Arguments:
+            clue_cards_persons -- a list of Person card names to play with
+            clue_cards_weapons -- a list of Weapon card names to play with
+            clue_cards_rooms -- a list of Room card names to play with
+            players -- a list of tuples representing all Players in the Game,
+                       in seating order (clockwise from anyone)
+        """
+
+        # Setup the Cards
+        clue_cards = {
+            ClueCardType.PERSON: clue_cards_persons,
+            ClueCardType.WEAPON: clue_cards_weapons,
+            ClueCardType.ROOM: clue_cards_rooms
+        }
+        self.cards = set()
+        card_list = []
+        for t in ClueCardType:
+            for n in clue_cards[t]:
+                if n not in [c.name for c in self.cards]:
+                    self.cards.add(Card(n, t))
+                    card_list.append(Card(n, t))
+                else:
+                    raise ValueError("Duplicate card name: {}".format(n))
+
+        # Setup the Players
+        self.players = set()
+        self.seating = []
+        for p in players:
+            new_p = Player._make(p)
+            if new_p.name not in [q.name for q in self.players]:
+                self.players.add(new_p)
+                self.seating.append(new_p.name)
+            else:
+                raise ValueError(
+                    "Duplicate player name: {}".format(new_p.name))
+
+        num_cards_in_the_file = len(clue_cards.keys())
+        num_cards_in_hands = sum([p.hand_size for p in self.players])
+        if len(self.cards) != num_cards_in_the_file + num_cards_in_hands:
+            raise ValueError("Player hand sizes and card count don't add up!")
+
+        # Setup the Game state knowledge
+        self.__init_numbering(card_list)
+        self.events = []
+        self.__init_relations()
+        self.__init_indexes()
+        self._batch_depth = 0
+        self._checkpoints = {}
+        self._shared = False
+
+        # Identify this game, and each state it passes through, for caching
+        self.game_id = os.urandom(16).hex()
+        self.version = 0
+
+    def __setstate__(self, state):
+        """Restore a pickled Game, including ones saved by older versions."""
+        state = dict(state)
+        # Saved before the deduction rules had agendas (see __propagate)
+        state.pop('_pending', None)
+        relations = resolved_shows = None
+        if 'relations' in state:
+            # Saved before relations were stored compactly; the indexes over
+            # them are rebuilt below.
+            relations = state.pop('relations')
+            resolved_shows = state.pop('resolved_shows', [])
+            for name in ['_facts', '_active_shows', '_watches',
+                         '_have_counts', '_pass_counts', '_dirty_players',
+                         '_dirty_types']:
+                state.pop(name, None)
+        self.__dict__.update(state)
+        self.__dict__.setdefault('events', [])
+        self.__dict__.setdefault('game_id', os.urandom(16).hex())
+        self.__dict__.setdefault(
+            'seating', sorted(p.name for p in self.players))
+        self.__dict__.setdefault('_agendas', None)
+        self.__dict__.setdefault('_batch_depth', 0)
+        self.__dict__.setdefault('_checkpoints', {})
+        self.__dict__.setdefault('_shared', False)
+        if relations is not None:
+            type_order = list(ClueCardType)
+            self.__init_numbering(sorted(
+                self.cards,
+                key=lambda c: (type_order.index(c.card_type), c.name)))
+            self.__init_relations()
+            self.__init_indexes()
+            for r in resolved_shows:
+                self.__append_relation(_RESOLVED, *self.__numbers(
+                    r.player, r.cards))
+            for r in relations:
+                self.__index_relation(self.__append_relation(
+                    _CODES[r.rel_type], *self.__numbers(r.player, r.cards)))
+            for shows in list(self._active_shows.values()):
+                for i in shows:
+                    self.__watch_show(i)
+        if not self.events and len(self._rel_types):
+            # Saved before events were logged: the log is made up from the
+            # relations, so that the Game can still be rebuilt (e.g. after a
+            # contradiction, or a retracted event) without losing them.
+            self.events = [self.__event_from_relation(i)
+                           for i in range(len(self._rel_types))]
+        self.__dict__.setdefault('version', len(self.events))
+
+    def __init_numbering(self, card_list):
+        """Number the Players (in seating order), and the Cards in card_list.
+
+        Internally, Players and Cards are only referred to by these numbers.
+        """
+        self._player_list = [normalize_to_list(name, self.players)
+                             for name in self.seating]
+        self._card_list = list(card_list)
+        self._player_numbers = {
+            p: i for i, p in enumerate(self._player_list)}
+        self._card_numbers = {c: i for i, c in enumerate(self._card_list)}
+        self._cards_of_type = {
+            t: [i for i, c in enumerate(self._card_list) if c.card_type == t]
+            for t in ClueCardType}
+
+    def __init_relations(self):
+        """Set up the (empty) store of all known relations.
+
+        Each relation is numbered in the order it was recorded, and stored
+        across 4 arrays of small integers, rather than as a ClueRelation
+        object:
+            _rel_types   -- its type: _HAVE, _PASS, _SHOW, or _RESOLVED for a
+                            SHOW that is resolved
+            _rel_players -- the number of its Player
+            _rel_ends    -- the end of its Cards in _rel_cards (they start
+                            where those of the previous relation end)
+            _rel_cards   -- the numbers of the Cards of every relation
+        """
+        self._rel_types = array.array('B')
+        self._rel_players = array.array('H')
+        self._rel_ends = array.array('I')
+        self._rel_cards = array.array('H')
+
+    def __init_indexes(self):
+        """Set up the (empty) indexes over the relations.
+
+        Players and Cards are referred to by number (see __init_numbering),
+        and relations by their number in the store (see __init_relations).
+
+        _facts holds, at [player * number of cards + card], _HAVE or _PASS
+        if that HAVE or PASS relation is known, or else 0.
+
+        _active_shows maps each player to a list of their open SHOWs.
+
+        _watches maps [player * number of cards + card] to a list of watches
+        on open SHOWs.  Each open SHOW is watched through 2 of its cards that
+        the player is not known to PASS (in the style of a SAT solver's
+        "watched literals").  A watch is a list [show, card, card], shared
+        by the watch lists of both cards.  A SHOW only needs checking when
+        one of its 2 watched cards gets a PASS, so other PASSes never visit
+        it at all.
+
+        _have_counts and _pass_counts hold each player's number of known
+        HAVEs and PASSes, so that a player's hand can be checked for
+        saturation in O(1), without re-scanning any relations.
+
+        _dirty_players and _dirty_types hold the players (with new
+        relations) and ClueCardTypes (with new HAVEs/PASSes) since the last
+        consistency check, so that only those need checking again.
+
+        _agendas holds, for each deduction rule, what it still has to be run
+        on (see __propagate), or is None if no rule has anything to do.
+        """
+        n_players = len(self._player_list)
+        self._facts = bytearray(n_players * len(self._card_list))
+        self._active_shows = {}
+        self._watches = {}
+        self._have_counts = array.array('H', [0] * n_players)
+        self._pass_counts = array.array('H', [0] * n_players)
+        self._dirty_players = set()
+        self._dirty_types = set()
+        self._agendas = None
+
+    def __new_agendas(self):
+        """Return empty agendas for the deduction rules (see __propagate).
+
+        Each rule run on relations has a queue of relation numbers; each rule
+        run on players or card types has a set of them.
+        """
+        return [collections.deque() if rule.scope == "relation" else set()
+                for rule, _ in _RULES]
+
+    @property
+    def relations(self):
+        """All known ClueRelations, except for resolved SHOWs.
+
+        This makes a new list of ClueRelation objects on each call.
+        """
+        return [self.__relation(i) for i, t in enumerate(self._rel_types)
+                if t != _RESOLVED]
+
+    @property
+    def resolved_shows(self):
+        """The SHOW ClueRelations for which we know which card was shown.
+
+        This makes a new list of ClueRelation objects on each call.
+        """
+        return [self.__relation(i) for i, t in enumerate(self._rel_types)
+                if t == _RESOLVED]
+
+    @property
+    def player_order(self):
+        """The Players, in the order of the rows of self.knowledge().
+
+        This is the seating order (see self.seating).
+        """
+        return list(self._player_list)
+
+    @property
+    def card_order(self):
+        """The Cards, in the order of the columns of self.knowledge().
+
+        This is the order of the card types in ClueCardType, and within each
+        type, the order the Cards were given in when the Game was created (or
+        by name, for a Game saved before Cards were numbered).  So Games with
+        the same Cards may have them in different orders.
+        """
+        return list(self._card_list)
+
+    @property
+    def cards_in_the_file(self):
+        """If we know that no player has a given card, it is in the file!"""
+        n = len(self._card_list)
+        return {c for i, c in enumerate(self._card_list)
+                if self._facts[i::n].count(_PASS) == len(self._player_list)}
+
+    def record_have(self, player, card):
+        """Record a HAVE relation, and make deductions accordingly.
+
+        This is a thin wrapper for self.__record_user_event, solely to
+        enhance external usability.
+        """
+        self.__record_user_event(ClueEvent("have", player, [card]))
+
+    def record_pass(self, player, card):
+        """Record a PASS relation, and make deductions accordingly.
+
+        This is a thin wrapper for self.__record_user_event, solely to
+        enhance external usability.
+        """
+        self.__record_user_event(ClueEvent("pass", player, [card]))
+
+    def record_show(self, player, cards):
+        """Record a SHOW relation, and make deductions accordingly.
+
+        This is a thin wrapper for self.__record_user_event, solely to
+        enhance external usability.
+        """
+        self.__record_user_event(ClueEvent("show", player, cards))
+
+    def record_suggestion(self, suggester, cards, shower=None, shown=None):
+        """Record a whole suggestion round, and make deductions accordingly.
+
+        Going around the table in seating order from the suggester, each
+        player before the shower must have passed, so PASSes are recorded for
+        them for every suggested card.  The shower then gets a HAVE for the
+        shown card if we saw it, or else a SHOW for the suggested cards.
+
+        The round is recorded as a single event, and deductions are made once
+        all of its relations are recorded.
+
+        Arguments:
+            suggester -- the Player who made the suggestion
+            cards -- the suggested Cards
+            shower -- the Player who showed a card, or None if nobody did
+            shown -- the Card shown, if known to us
+        """
+        self.__record_user_event(
+            ClueEvent("suggest", suggester, cards, shower, shown))
+
+    def record_event(self, event):
+        """Record a ClueEvent (e.g. one replayed from another Game's log)."""
+        self.__record_user_event(event)
+
+    def retract_event(self, index):
+        """Remove an event from the log, e.g. to correct a typo.
+
+        The Game state is rebuilt by replaying the remaining events (from
+        the last snapshot before the event, see state_at).
+
+        Arguments:
+            index -- the position of the event in self.events
+        """
+        events = list(self.events)
+        del events[index]
+        self.__unshare()
+        self.__rebuild(events)
+        self.version += 1
+
+    def state_at(self, k):
+        """Return the Game as it was after the first k events.
+
+        The state after every CHECKPOINT_INTERVAL events (or, for events
+        recorded in a batch, at the end of the batch) is kept as a snapshot,
+        so this only has to replay the events since the last snapshot,
+        however long the game.
+
+        Arguments:
+            k -- the number of events, from 0 to len(self.events)
+
+        Returns:
+            a new Game, independent of this one (with its own game_id)
+        """
+        if not 0 <= k <= len(self.events):
+            raise ValueError("No such point in the game: {}".format(k))
+        start = max((n for n in self._checkpoints if n <= k), default=0)
+        if start:
+            state = pickle.loads(self._checkpoints[start])
+            state['events'] = self.events[:start]
+            game = Game.__new__(Game)
+            game.__setstate__(state)
+            game._checkpoints = {}
+        else:
+            game = Game(*self.__setup_args())
+        for e in self.events[start:k]:
+            game.record_event(e)
+        game.game_id = os.urandom(16).hex()
+        return game
+
+    def fork(self, game_id=None):
+        """Return a copy of the Game, to record hypothetical events in.
+
+        The copy is made lazily: the fork shares the state of this Game until
+        either of them records or retracts an event, when that one copies the
+        containers of the state for itself (copy-on-write).  So forking is
+        cheap, and so are forks only ever read from.
+
+        Arguments:
+            game_id -- the game_id of the fork; by default, a new one.  (A
+                       snapshot of this Game to be analyzed, and cached
+                       under this Game's game_id, keeps it.)
+
+        Returns:
+            a new Game, independent of this one
+        """
+        fork = Game.__new__(Game)
+        fork.__dict__.update(self.__dict__)
+        self._shared = fork._shared = True
+        fork.game_id = game_id or os.urandom(16).hex()
+        return fork
+
+    def conflicting_events(self, event):
+        """Find a minimal set of recorded events that event contradicts.
+
+        The culprits are found from the last one back, each by bisecting
+        for the shortest stretch of the game (see state_at) that, with event
+        and the culprits after it, is a contradiction.  So this only
+        replays O(log n) short stretches of the game for each culprit,
+        rather than the whole game once for each event.
+
+        Arguments:
+            event -- a ClueEvent, e.g. from ClueContradiction.event
+
+        Returns:
+            a list of events from self.events, in order, such that recording
+            them and event (but without any one of them) is a contradiction;
+            or None if event does not contradict self.events at all
+        """
+        extra = [event]
+        end = len(self.events)
+        if not self.__contradicts(end, extra):
+            return None
+        culprits = []
+        while end and not self.__contradicts(0, extra):
+            # The first `good` events (and extra) are no contradiction; the
+            # first `end` events are.
+            good = 0
+            while end - good > 1:
+                middle = (good + end) // 2
+                if self.__contradicts(middle, extra):
+                    end = middle
+                else:
+                    good = middle
+            end -= 1
+            culprits.insert(0, self.events[end])
+            extra.append(self.events[end])
+        return culprits
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Defer deductions until the end of a with block.
+
+        Relations recorded inside the block are checked for conflicts as
+        usual, but their consequences are only worked out (all together) when
+        the outermost batch block exits.  This saves repeating deductions when
+        recording many related events at once.
+
+        The outermost block is all or nothing: if an event recorded in it
+        conflicts with what is known (or anything else raises out of it), or
+        the deductions at the end reveal a contradiction, all the events
+        recorded in the block are undone, and the exception is raised.
+        """
+        self.__unshare()
+        start = len(self.events)
+        self._batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and len(self.events) > start:
+                self.__rebuild(self.events[:start])
+                self.version += 1
+            raise
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            try:
+                self.__propagate()
+            except ClueContradiction:
+                self.__rebuild(self.events[:start])
+                self.version += 1
+                raise
+            if len(self.events) // self.CHECKPOINT_INTERVAL > \
+                    start // self.CHECKPOINT_INTERVAL:
+                self.__checkpoint()
+
+    def knowledge(self):
+        """Return what is known of who has which card, as a matrix.
+
+        The matrix has a row for each of self.player_order, and a column for
+        each of self.card_order.  Each entry is HAS or PASSES if the player
+        is known to have, or not to have, the card; or else UNKNOWN.
+
+        The matrix is a read-only memoryview of the Game's own storage, not
+        a copy, so it is free to make, and numpy.asarray (for one) can read
+        it without copying it either.  It reflects the state of the Game at
+        the time of the call; after the Game changes, call this again.
+
+        Returns:
+            a 2-dimensional memoryview of unsigned bytes
+        """
+        return memoryview(self._facts).toreadonly().cast(
+            'B', (len(self._player_list), len(self._card_list)))
+
+    def __record_user_event(self, event):
+        """Record a user-entered ClueEvent, and add it to the log.
+
+        If the event contradicts what is already known, the Game state is left
+        as it was, and ClueContradiction is raised.
+        """
+        event = self.__normalize_event(event)
+        self.__unshare()
+        try:
+            self._batch_depth += 1
+            try:
+                if event.kind == "suggest":
+                    self.__record_suggestion_relations(event)
+                else:
+                    self.__record_relation(
+                        _CODES[ClueRelationType(event.kind)],
+                        *self.__numbers(event.player, event.cards))
+            finally:
+                self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.__propagate()
+        except ClueContradiction as e:
+            if e.event is None:
+                e.event = event
+            self.__rebuild(self.events)
+            raise
+        self.events.append(event)
+        self.version += 1
+        if self._batch_depth == 0 and \
+                len(self.events) % self.CHECKPOINT_INTERVAL == 0:
+            self.__checkpoint()
+
+    def __normalize_event(self, event):
+        """Validate a ClueEvent, and return it with everything named by name.
+
+        Arguments:
+            event -- a ClueEvent with Players/Cards as objects or names
+        """
+        if event.kind not in ["have", "pass", "show", "suggest"]:
+            raise ValueError("No such event kind: {}".format(event.kind))
+        player, cards = self.__normalize_input(event.player, event.cards)
+        shower, shown = event.shower, event.shown
+        if event.kind != "suggest":
+            if shower is not None or shown is not None:
+                raise ValueError("Only suggestions have a shower or shown")
+        else:
+            if shower is not None:
+                shower = normalize_to_list(shower, self.players).name
+                if shower == player.name:
+                    raise ValueError("A player cannot show to themself!")
+            if shown is not None:
+                if shower is None:
+                    raise ValueError("A card cannot be shown by nobody!")
+                shown = normalize_to_list(shown, self.cards).name
+                if shown not in [c.name for c in cards]:
+                    raise ValueError(
+                        "The card shown must be one of the cards suggested")
+        return ClueEvent(event.kind, player.name, [c.name for c in cards],
+                         shower, shown)
+
+    def __record_suggestion_relations(self, event):
+        """Record the ClueRelations implied by a "suggest" ClueEvent."""
+        suggester, cards = self.__numbers(event.player, event.cards)
+        n_players = len(self._player_list)
+        for i in range(1, n_players):
+            p = (suggester + i) % n_players  # Players are numbered by seat
+            if self.seating[p] == event.shower:
+                break
+            for c in cards:
+                self.__record_relation(_PASS, p, [c])
+        if event.shown is not None:
+            self.__record_relation(
+                _HAVE, *self.__numbers(event.shower, [event.shown]))
+        elif event.shower is not None:
+            self.__record_relation(
+                _SHOW, self.__numbers(event.shower, [])[0], cards)
+
+    def __unshare(self):
+        """Copy any state shared with forks, before it is changed.
+
+        Only the containers are copied; what is in them is immutable, and
+        stays shared.  The watches are the exception: each is a list shared
+        by two watch lists, and is copied once for both.
+        """
+        if not self._shared:
+            return
+        self._rel_types = array.array('B', self._rel_types)
+        self._rel_players = array.array('H', self._rel_players)
+        self._rel_ends = array.array('I', self._rel_ends)
+        self._rel_cards = array.array('H', self._rel_cards)
+        self.events = list(self.events)
+        self._facts = bytearray(self._facts)
+        self._active_shows = {p: list(shows)
+                              for p, shows in self._active_shows.items()}
+        copies = {}
+        self._watches = {
+            key: [copies.setdefault(id(w), list(w)) for w in watches]
+            for key, watches in self._watches.items()}
+        self._have_counts = array.array('H', self._have_counts)
+        self._pass_counts = array.array('H', self._pass_counts)
+        self._dirty_players = set(self._dirty_players)
+        self._dirty_types = set(self._dirty_types)
+        if self._agendas is not None:
+            self._agendas = [type(a)(a) for a in self._agendas]
+        self._checkpoints = dict(self._checkpoints)
+        self._shared = False
+
+    def __rebuild(self, events):
+        """Reset the Game state, and replay the given list of events.
+
+        The state is restored from the last snapshot (see state_at) taken
+        before events and self.events part ways, if any, and only the events
+        since then are replayed; so undoing the last few events, as after a
+        contradiction, costs the same however long the game.
+
+        The version is left as it was; callers that change the state must
+        increment it themselves.
+        """
+        batch_depth, version, game_id = \
+            self._batch_depth, self.version, self.game_id
+        same = 0
+        for old, new in zip(self.events, events):
+            if old != new:
+                break
+            same += 1
+        start = max((n for n in self._checkpoints if n <= same), default=0)
+        checkpoints = {n: s for n, s in self._checkpoints.items()
+                       if n <= start}
+        if start:
+            self.__dict__.update(pickle.loads(checkpoints[start]))
+            self.events = events[:start]
+        else:
+            self.__init_relations()
+            self.events = []
+            self.__init_indexes()
+        self._batch_depth = 0
+        self._checkpoints = checkpoints
+        for e in events[start:]:
+            self.__record_user_event(e)
+        self._batch_depth, self.version, self.game_id = \
+            batch_depth, version, game_id
+
+    def __checkpoint(self):
+        """Keep a snapshot of the current state (see state_at)."""
+        self._checkpoints[len(self.events)] = self.__snapshot()
+
+    def __snapshot(self):
+        """Return the pickled Game state, less its own snapshots.
+
+        The events are left out too, as they are a prefix of self.events
+        (and to keep them would make the snapshots grow quadratically with
+        the game); state_at puts them back.
+        """
+        state = dict(self.__dict__)
+        del state['_checkpoints']
+        del state['_shared']
+        del state['events']
+        return pickle.dumps(state)
+
+    def __contradicts(self, k, events):
+        """Check whether the first k events and a list of events conflict."""
+        game = self.fork() if k == len(self.events) else self.state_at(k)
+        try:
+            with game.batch():
+                for e in events:
+                    game.record_event(e)
+        except ClueContradiction:
+            return True
+        return False
+
+    def __setup_args(self):
+        """Return the arguments to create a new Game like this one.
+
+        The Cards are given in the order of self.card_order, so that the
+        new Game numbers them the same way.
+        """
+        hand_sizes = {p.name: p.hand_size for p in self.players}
+        return [[c.name for c in self._card_list if c.card_type == t]
+                for t in ClueCardType] + \
+            [[(name, hand_sizes[name]) for name in self.seating]]
+
+    def __numbers(self, player, cards):
+        """Return the numbers of a Player and Cards (or of their names)."""
+        player, cards = self.__normalize_input(player, cards)
+        return (self._player_numbers[player],
+                [self._card_numbers[c] for c in cards])
+
+    def __relation(self, i):
+        """Make a ClueRelation object out of the i-th stored relation."""
+        start = self._rel_ends[i - 1] if i else 0
+        return ClueRelation(
+            rel_type=_TYPES[self._rel_types[i]],
+            player=self._player_list[self._rel_players[i]],
+            cards=[self._card_list[c]
+                   for c in self._rel_cards[start:self._rel_ends[i]]])
+
+    def __event_from_relation(self, i):
+        """Make a ClueEvent that records the i-th stored relation."""
+        relation = self.__relation(i)
+        return ClueEvent(relation.rel_type.value, relation.player.name,
+                         [c.name for c in relation.cards])
+
+    def __cards_of(self, i):
+        """Return the numbers of the Cards of the i-th stored relation."""
+        return self._rel_cards[self._rel_ends[i - 1] if i else 0:
+                               self._rel_ends[i]]
+
+    def __append_relation(self, code, player, cards):
+        """Add a relation to the store, and return its number."""
+        self._rel_types.append(code)
+        self._rel_players.append(player)
+        self._rel_cards.extend(cards)
+        self._rel_ends.append(len(self._rel_cards))
+        return len(self._rel_types) - 1
+
+    def __record_relation(self, code, player, cards):
+        """Record a new relation, and make deductions accordingly.
+
+        Arguments:
+            code   -- _HAVE, _PASS or _SHOW
+            player -- the number of the Player
+            cards  -- a list of the numbers of the Cards
+        """
+        n = len(self._card_list)
+        if code != _SHOW:
+            # Check for any redundancy or conflict with an existing HAVE/PASS
+            known = self._facts[player * n + cards[0]]
+            if known:
+                if known == code:
+                    return  # Ignore attempted duplicate.
+                else:
+                    raise ClueContradiction(
+                        "Cannot mark Relation {} {} {}; ".format(
+                            _TYPES[code], self._player_list[player],
+                            self._card_list[cards[0]]) +
+                        "the opposite is already marked!")
+        elif any(self._facts[player * n + c] == _HAVE for c in cards):
+            self.__append_relation(_RESOLVED, player, cards)
+            return  # Nothing new to learn.
+
+        i = self.__append_relation(code, player, cards)
+        self.__index_relation(i)
+        self.__wake_rules(i)
+        if self._batch_depth == 0:
+            self.__propagate()
+
+    def __index_relation(self, i):
+        """Add the newly-recorded i-th relation to the indexes."""
+        code, player = self._rel_types[i], self._rel_players[i]
+        if code == _SHOW:
+            self._active_shows.setdefault(player, []).append(i)
+            self._dirty_players.add(player)
+            return
+        card = self.__cards_of(i)[0]
+        self._facts[player * len(self._card_list) + card] = code
+        if code == _HAVE:
+            self._have_counts[player] += 1
+        else:
+            self._pass_counts[player] += 1
+        self._dirty_players.add(player)
+        self._dirty_types.add(self._card_list[card].card_type)
+        if code == _HAVE:
+            self.__retire_shows_resolved_by(player, card)
+
+    def __retire_shows_resolved_by(self, player, card):
+        """Mark player's open SHOWs that include card as resolved.
+
+        Once we know player has one of a SHOW's cards, the SHOW can't tell us
+        anything more, so there is no need to keep checking it.
+        """
+        active = self._active_shows.get(player, [])
+        resolved = [s for s in active if card in self.__cards_of(s)]
+        if resolved:
+            self._active_shows[player] = [
+                s for s in active if s not in resolved]
+            for s in resolved:
+                self._rel_types[s] = _RESOLVED
+
+    def __wake_rules(self, i):
+        """Put the newly-recorded i-th relation on the rules' agendas.
+
+        Each rule that the relation's type triggers gets it on its agenda:
+        the relation itself, its player, or its card's type, depending on
+        the scope of the rule.
+        """
+        agendas = self._agendas
+        if agendas is None:
+            agendas = self._agendas = self.__new_agendas()
+        for k, scope in _TRIGGERED[self._rel_types[i]]:
+            _stats[k][0] += 1
+            if scope == "relation":
+                agendas[k].append(i)
+            elif scope == "player":
+                agendas[k].add(self._rel_players[i])
+            else:
+                agendas[k].add(
+                    self._card_list[self.__cards_of(i)[0]].card_type)
+
+    def __propagate(self):
+        """Run the deduction rules on their agendas, until none remain.
+
+        The rules are run cheapest first: a rule only gets its turn when no
+        cheaper rule has anything left to do, and it gives way again as soon
+        as one has.  So the rules that look at a whole hand or card type only
+        run once the cheap rules have worked out all they can, and only once
+        for each player or card type with new relations since they last ran,
+        however many new relations that is.
+
+        Relations recorded while this runs go on the agendas rather than being
+        handled recursively, and their turn comes in the same loop.
+        """
+        self._batch_depth += 1
+        try:
+            agendas = self._agendas or []
+            while True:
+                for k, agenda in enumerate(agendas):
+                    if agenda:
+                        break
+                else:
+                    break
+                method, take, cheaper = _RUNNERS[k]
+                n_relations, runs = len(self._rel_types), 0
+                start = time.perf_counter()
+                try:
+                    while agenda:
+                        method(self, take(agenda))
+                        runs += 1
+                        if any(agendas[j] for j in cheaper):
+                            break
+                finally:
+                    stats = _stats[k]
+                    stats[1] += runs
+                    stats[2] += len(self._rel_types) - n_relations
+                    stats[3] += time.perf_counter() - start
+            self._agendas = None
+        finally:
+            self._batch_depth -= 1
+        self.__check_consistency()
+
+    def __disjoint_open_shows(self, player):
+        """Count a set of player's open SHOWs that have no card in common.
+
+        Only the cards the player is not known to PASS count.
+        """
+        n = len(self._card_list)
+        shows = sorted(
+            ({c for c in self.__cards_of(s)
+              if self._facts[player * n + c] != _PASS}
+             for s in self._active_shows.get(player, [])), key=len)
+        used = set()
+        count = 0
+        for cards in shows:
+            if used.isdisjoint(cards):
+                used |= cards
+                count += 1
+        return count
+
+    def __check_consistency(self):
+        """Check the hand sizes and card counts, raising ClueContradiction.
+
+        Only the Players and ClueCardTypes with new relations since the last
+        check are checked again.  (Conflicting HAVEs/PASSes, and SHOWs for
+        which every card is PASSed, are caught as they are recorded.)
+
+        Each of a player's open SHOWs needs a card of the player's that is
+        not yet known, so a player cannot have more open SHOWs with no card
+        in common than they have cards left to know.  The SHOWs are picked
+        greedily (smallest first), which is cheap, and never finds a
+        contradiction that isn't there, but may miss some that are.
+        """
+        n = len(self._card_list)
+        while self._dirty_players:
+            player = self._dirty_players.pop()
+            p = self._player_list[player]
+            if self._have_counts[player] > p.hand_size:
+                raise ClueContradiction(
+                    "{} has more than {} cards!".format(p.name, p.hand_size))
+            if self._have_counts[player] + \
+                    self.__disjoint_open_shows(player) > p.hand_size:
+                raise ClueContradiction(
+                    "{} cannot have shown that many different cards with "
+                    "only {} cards!".format(p.name, p.hand_size))
+            if n - self._pass_counts[player] < p.hand_size:
+                raise ClueContradiction(
+                    "{} has fewer than {} cards!".format(
+                        p.name, p.hand_size))
+        while self._dirty_types:
+            t = self._dirty_types.pop()
+            located = in_the_file = 0
+            for c in self._cards_of_type[t]:
+                facts = self._facts[c::n]
+                if _HAVE in facts:
+                    located += 1
+                elif facts.count(_PASS) == len(facts):
+                    in_the_file += 1
+            if in_the_file > 1:
+                raise ClueContradiction(
+                    "More than one {} is in the file!".format(t.value))
+            if located == len(self._cards_of_type[t]):
+                raise ClueContradiction(
+                    "No {} is left for the file!".format(t.value))
+
+    @_rule([ClueRelationType.HAVE], "relation", cost=1)
+    def __deduce_other_player_passes_from_have(self, i):
+        """If player has card, we infer all other players do not have card."""
+        player, card = self._rel_players[i], self.__cards_of(i)[0]
+        for other_p in range(len(self._player_list)):
+            if other_p != player:
+                self.__record_relation(_PASS, other_p, [card])
+
+    @_rule([ClueRelationType.PASS], "relation", cost=1)
+    def __move_watches_from_pass(self, i):
+        """Move the watches on open SHOWs off a card the player PASSes."""
+        player, card = self._rel_players[i], self.__cards_of(i)[0]
+        for watch in self._watches.pop(
+                player * len(self._card_list) + card, []):
+            self.__move_watch(watch, card)
+
+    @_rule([ClueRelationType.HAVE], "player", cost=2)
+    def __deduce_player_passes_from_known_whole_hand(self, player):
+        """If all player's cards are known, mark passes for all other cards."""
+        n = len(self._card_list)
+        if self._have_counts[player] == self._player_list[player].hand_size:
+            for other_c in range(n):
+                if not self._facts[player * n + other_c]:
+                    self.__record_relation(_PASS, player, [other_c])
+
+    @_rule([ClueRelationType.PASS], "player", cost=2)
+    def __deduce_player_haves_from_known_passes(self, player):
+        """If player passes all but hand_size cards, they have the rest."""
+        n = len(self._card_list)
+        if n - self._pass_counts[player] == \
+                self._player_list[player].hand_size:
+            for other_c in range(n):
+                if not self._facts[player * n + other_c]:
+                    self.__record_relation(_HAVE, player, [other_c])
+
+    @_rule([ClueRelationType.HAVE], "card type", cost=3)
+    def __deduce_card_passes_from_cardtype_completion(self, cluecardtype):
+        """If all cards but 1 of this type are accounted for, mark passes.
+
+        If we know which player has every card of this type but 1, mark passes
+        for all players for the remaining card.
+        """
+        n = len(self._card_list)
+        remaining = [c for c in self._cards_of_type[cluecardtype]
+                     if _HAVE not in self._facts[c::n]]
+        if len(remaining) == 1:
+            for p in range(len(self._player_list)):
+                self.__record_relation(_PASS, p, remaining)
+
+    @_rule([ClueRelationType.SHOW], "relation", cost=1)
+    def __watch_show(self, show):
+        """Start watching a new open SHOW; infer a HAVE if it is decided.
+
+        If the SHOW's player PASSes all but 1 of its cards, then infer and
+        record a HAVE for the player and the remaining card.  Otherwise,
+        watch 2 of the cards not PASSed.  (A SHOW resolved since it was
+        recorded is left alone.)
+
+        Arguments:
+            show -- the number of the SHOW relation
+        """
+        if self._rel_types[show] != _SHOW:
+            return
+        n = len(self._card_list)
+        player = self._rel_players[show]
+        cards = self.__cards_of(show)
+        unpassed_cards = [c for c in cards
+                          if self._facts[player * n + c] != _PASS]
+        if len(unpassed_cards) == 1:
+            self.__record_relation(_HAVE, player, unpassed_cards)
+        elif not unpassed_cards:
+            raise ClueContradiction(
+                "{} cannot show any of {}!".format(
+                    self._player_list[player].name,
+                    [self._card_list[c].name for c in cards]))
+        else:
+            watch = [show] + unpassed_cards[:2]
+            for c in unpassed_cards[:2]:
+                self._watches.setdefault(player * n + c, []).append(watch)
+
+    def __move_watch(self, watch, passed_card):
+        """Respond to a PASS for one of the 2 cards watched on an open SHOW.
+
+        Move the watch to another card not PASSed, if there is one.  If not,
+        the other watched card is the only one left, so record a HAVE for it
+        (or, if it is PASSed too, raise ClueContradiction).
+        """
+        show = watch[0]
+        if self._rel_types[show] == _RESOLVED:
+            return  # This SHOW is resolved; drop the watch.
+
+        n = len(self._card_list)
+        player = self._rel_players[show]
+        cards = self.__cards_of(show)
+        slot = watch.index(passed_card, 1)
+        other_card = watch[3 - slot]
+        for c in cards:
+            if c not in watch[1:] and \
+                    self._facts[player * n + c] != _PASS:
+                watch[slot] = c
+                self._watches.setdefault(player * n + c, []).append(watch)
+                return
+
+        if self._facts[player * n + other_card] == _PASS:
+            raise ClueContradiction(
+                "{} cannot show any of {}!".format(
+                    self._player_list[player].name,
+                    [self._card_list[c].name for c in cards]))
+        self.__record_relation(_HAVE, player, [other_card])
+
+    def __normalize_input(self, player, cards):
+        """Allow to pass in Players/Cards either as objects, or by name
+
+        Assumes that Player and Card names are unique.
+
+        Arguments:
+            player -- a Player object, or name (string) to normalize
+            cards -- a list of Card objects, or names (strings) to normalize
+        Returns:
+            a Player object and a list of Card objects from the current Game
+        """
+        player = normalize_to_list(player, self.players)
+        my_cards = []
+        for c in cards:
+            my_cards.append(
+                normalize_to_list(c, self.cards))
+        cards = my_cards
+        return player, cards
+
+    def save(self, path):
+        """Persists the Game state to a file.
+
+        BEWARE: Overwrites any existing file at 'path'.
+        """
+        with open(path, 'wb') as dbfile:
+            pickle.dump(self, dbfile)
+
+    def load(obj, path):
+        """Loads a persisted Game state from a file."""
+        if os.path.isfile(path):
+            with open(path, 'rb') as dbfile:
+                return pickle.load(dbfile)
+        else:
+            return None
+
+    def delete(obj, path):
+        """Deletes a persisted Game state in a file.
+
+        BEWARE: Deletes any existing file at 'path'.
+        """
+        os.remove(path)
+
+
+Game.load = classmethod(Game.load)
+Game.delete = classmethod(Game.delete)
+
+# The deduction rules and their methods, cheapest first (see Game.__propagate)
+_RULES = sorted(_registered_rules, key=lambda r: r[0].cost)
+# For each relation type, the (position, scope) of each rule it triggers
+_TRIGGERED = {
+    code: [(k, rule.scope) for k, (rule, _) in enumerate(_RULES)
+           if _TYPES[code] in rule.triggers]
+    for code in (_HAVE, _PASS, _SHOW)}
+# For each rule, its method, how to take the next thing off its agenda, and
+# the positions of the cheaper rules (see Game.__propagate)
+_RUNNERS = [
+    (method,
+     collections.deque.popleft if rule.scope == "relation" else set.pop,
+     [j for j, (r, _) in enumerate(_RULES) if r.cost < rule.cost])
+    for rule, method in _RULES]
+# For each rule, its [wakeups, runs, deductions, seconds] (see rule_stats)
+_stats = [[0, 0, 0, 0.0] for _ in _RULES]
+
+
+def deduction_rules():
+    """Return the list of the Game's deduction Rules, in the order they run."""
+    return [rule for rule, _ in _RULES]
+
+
+def rule_stats(reset=False):
+    """Return how much work each deduction rule has done, in all Games.
+
+    The counts are kept for every Game in the process, since it started (or
+    since the last reset); they are cheap to keep, so they are always on.
+    They are not exact if Games are played in several threads at once.
+
+    Comparing the seconds per run of the rules, and how many deductions they
+    make, with their declared costs shows whether the rules are run in the
+    best order.
+
+    Arguments:
+        reset -- whether to start counting again from zero
+
+    Returns:
+        a dict of rule names to RuleStats
+    """
+    stats = {rule.name: RuleStats(*s) for (rule, _), s in zip(_RULES, _stats)}
+    if reset:
+        for s in _stats:
+            s[:] = [0, 0, 0, 0.0]
+    return stats
@@ -0,0 +1,152 @@
+"""exact.py -- Exact card location probabilities, by counting deals
+
+probability.py estimates card location probabilities quickly, but only
+approximately.  This module computes them exactly, by counting every deal of
+the cards that is consistent with what the Game knows, and for each player
+and card, how many of those deals put the card in the player's hand.
+
+The deals are counted by dynamic programming over the cards, one at a time,
+rather than by enumerating them.  The state after placing some of the cards
+is:
+    - how many more cards each player's hand can take,
+    - which card types already have their card in the file, and
+    - which open SHOWs (among those with cards still to come) are already
+      satisfied by a card placed so far.
+Each state maps to the number of ways of reaching it.  A forward pass counts
+the ways to reach each state, and a backward pass the ways to complete each
+state into a full deal; together they give the number of deals placing each
+card in each location.
+
+The number of states grows quickly with the number of open SHOWs, so this
+can take anywhere from milliseconds to (much) longer.  It therefore takes an
+optional deadline, and gives up with TimeoutError once it passes; and an
+optional cancel event, to be given up on at any time.
+
+Functions:
+    exact_probabilities -- count the deals consistent with a Game
+"""
+
+from cluesolver.cluegame import ClueCardType, ClueRelationType
+from cluesolver.probability import MarginalProbabilities
+import concurrent.futures
+import numpy as np
+import time
+
+
+def exact_probabilities(game, deadline=None, cancel=None):
+    """Compute the exact probability of each card being in each location.
+
+    Every deal consistent with the Game's HAVEs, PASSes and open SHOWs, the
+    hand sizes, and the one card of each type in the file, is counted as
+    equally likely.
+
+    Arguments:
+        game     -- the Game to analyze
+        deadline -- an optional time.monotonic() value to give up at
+        cancel   -- an optional threading.Event, to give up once it is set
+
+    Returns:
+        a MarginalProbabilities instance (with deals set to the number of
+        consistent deals), laid out as by probability.marginal_probabilities
+
+    Raises:
+        TimeoutError, if the deadline passes first
+        concurrent.futures.CancelledError, if cancel is set first
+    """
+    players = game.player_order
+    type_order = list(ClueCardType)
+    cards = sorted(game.cards,
+                   key=lambda c: (type_order.index(c.card_type), c.name))
+    n_players = len(players)
+    file_location = n_players
+
+    # The locations each card may be in: a player index, or the file.
+    card_index = {c: i for i, c in enumerate(cards)}
+    player_index = {p: i for i, p in enumerate(players)}
+    allowed = [set(range(n_players + 1)) for _ in cards]
+    shows = []
+    for r in game.relations:
+        col = card_index[r.cards[0]]
+        if r.rel_type == ClueRelationType.HAVE:
+            allowed[col] = {player_index[r.player]}
+        elif r.rel_type == ClueRelationType.PASS:
+            allowed[col].discard(player_index[r.player])
+        else:
+            shows.append(r)
+    allowed = [sorted(a) for a in allowed]
+
+    # Open SHOWs, each as (player index, bit), and the bits to check (and
+    # then clear) after the last of each SHOW's cards has been placed.
+    shows_by_card = [[] for _ in cards]
+    due_after = [0] * len(cards)
+    for bit, show in enumerate(shows):
+        cols = [card_index[c] for c in show.cards]
+        for col in cols:
+            shows_by_card[col].append((player_index[show.player], 1 << bit))
+        due_after[max(cols)] |= 1 << bit
+
+    def step(state, col, location):
+        """The state after placing cards[col] at location, or None."""
+        capacity, filed, satisfied = state
+        if location == file_location:
+            t = type_order.index(cards[col].card_type)
+            if filed & (1 << t):
+                return None
+            filed |= 1 << t
+        else:
+            if not capacity[location]:
+                return None
+            capacity = (capacity[:location] + (capacity[location] - 1,) +
+                        capacity[location + 1:])
+            for player, bit in shows_by_card[col]:
+                if player == location:
+                    satisfied |= bit
+        if satisfied & due_after[col] != due_after[col]:
+            return None
+        return capacity, filed, satisfied & ~due_after[col]
+
+    def check_deadline(k=0):
+        """Give up if it is time to; only checked every 64th k."""
+        if k % 64:
+            return
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError("Ran out of time counting deals")
+        if cancel is not None and cancel.is_set():
+            raise concurrent.futures.CancelledError()
+
+    # Forward pass: the number of ways to reach each state.
+    start = (tuple(p.hand_size for p in players), 0, 0)
+    forward = [{start: 1}]
+    for col in range(len(cards)):
+        counts = {}
+        for k, (state, ways) in enumerate(forward[-1].items()):
+            check_deadline(k)
+            for location in allowed[col]:
+                new_state = step(state, col, location)
+                if new_state is not None:
+                    counts[new_state] = counts.get(new_state, 0) + ways
+        forward.append(counts)
+
+    # Backward pass: the number of ways to complete each state.
+    all_types = (1 << len(type_order)) - 1
+    complete = {s: 1 for s in forward[-1] if s[1] == all_types}
+    deals = sum(forward[-1][s] for s in complete)
+    located = np.zeros((n_players + 1, len(cards)), dtype=object)
+    for col in reversed(range(len(cards))):
+        completions = {}
+        for k, (state, ways) in enumerate(forward[col].items()):
+            check_deadline(k)
+            total = 0
+            for location in allowed[col]:
+                new_state = step(state, col, location)
+                n = complete.get(new_state, 0) if new_state else 0
+                located[location, col] += ways * n
+                total += n
+            if total:
+                completions[state] = total
+        complete = completions
+
+    values = np.zeros(located.shape)
+    if deals:
+        values = (located / deals).astype(float)
+    return MarginalProbabilities(players, cards, values, 0, deals)
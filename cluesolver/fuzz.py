@@ -0,0 +1,271 @@
+"""fuzz.py -- Differential fuzz testing of the Game engine against brute force
+
+Every fact the Game engine infers must be true in every deal of the cards that
+is consistent with the events it was given.  For small enough decks we can
+simply enumerate all such deals, and check that.
+
+This module generates random small games: a random deck, a random deal, and a
+random sequence of truthful HAVE/PASS/SHOW and suggestion events for that
+deal.  It feeds the events to a Game, and compares every inferred HAVE/PASS,
+and cards_in_the_file, against a brute-force enumeration of the consistent
+deals (the "oracle").  Any mismatch is shrunk to a minimal sequence of events
+that still exhibits it.
+
+Usage:
+    python -m cluesolver.fuzz [--seconds N] [-j JOBS] [--seed SEED]
+
+Functions:
+    random_setup     -- make a random small game setup
+    random_deal      -- deal the cards of a setup at random
+    random_events    -- make random truthful events for a deal
+    consistent_deals -- enumerate all deals consistent with some events
+    check            -- compare the Game engine to the brute-force oracle
+    shrink           -- reduce a failing event sequence to a minimal one
+    fuzz             -- run random trials in parallel within a time budget
+    main             -- command line entry point
+"""
+
+from cluesolver.cluegame import ClueEvent, ClueRelationType
+from cluesolver import gamelog
+import argparse
+import concurrent.futures
+import itertools
+import os
+import random
+import sys
+import time
+
+
+TYPE_KEYS = ["persons", "weapons", "rooms"]
+
+
+def random_setup(rng, max_cards_per_type=3, max_players=3):
+    """Make a random small game setup dict (see gamelog.py)."""
+    setup = {}
+    for key in TYPE_KEYS:
+        n = rng.randint(1, max_cards_per_type)
+        setup[key] = ["{}{}".format(key[0].upper(), i) for i in range(n)]
+    n_players = rng.randint(2, max_players)
+    n_in_hands = sum(len(setup[k]) for k in TYPE_KEYS) - len(TYPE_KEYS)
+    cuts = sorted(rng.randint(0, n_in_hands) for _ in range(n_players - 1))
+    sizes = [b - a for a, b in zip([0] + cuts, cuts + [n_in_hands])]
+    setup["players"] = [[chr(ord("A") + i), s] for i, s in enumerate(sizes)]
+    return setup
+
+
+def random_deal(setup, rng):
+    """Deal the cards of setup at random.
+
+    Returns:
+        a dict mapping each player name to a frozenset of card names, plus
+        the key None mapping to the frozenset of cards in the file
+    """
+    envelope = [rng.choice(setup[k]) for k in TYPE_KEYS]
+    rest = [c for k in TYPE_KEYS for c in setup[k] if c not in envelope]
+    rng.shuffle(rest)
+    deal = {None: frozenset(envelope)}
+    for name, hand_size in setup["players"]:
+        deal[name], rest = frozenset(rest[:hand_size]), rest[hand_size:]
+    return deal
+
+
+def random_events(setup, deal, rng, n_events):
+    """Make a list of n_events random ClueEvents, all true of deal."""
+    cards = [c for k in TYPE_KEYS for c in setup[k]]
+    players = [p for p, _ in setup["players"]]
+    events = []
+    while len(events) < n_events:
+        player = rng.choice(players)
+        kind = rng.choice(["have", "pass", "show", "show", "suggest"])
+        if kind == "have" and deal[player]:
+            events.append(ClueEvent(
+                "have", player, [rng.choice(sorted(deal[player]))]))
+        elif kind == "pass" and len(deal[player]) < len(cards):
+            events.append(ClueEvent("pass", player, [rng.choice(
+                [c for c in cards if c not in deal[player]])]))
+        elif kind == "show" and deal[player]:
+            shown = rng.choice(sorted(deal[player]))
+            others = rng.sample([c for c in cards if c != shown],
+                                rng.randint(0, min(2, len(cards) - 1)))
+            show_cards = others + [shown]
+            rng.shuffle(show_cards)
+            events.append(ClueEvent("show", player, show_cards))
+        elif kind == "suggest":
+            suggested = [rng.choice(setup[k]) for k in TYPE_KEYS]
+            i = players.index(player)
+            shower = next((p for p in players[i + 1:] + players[:i]
+                           if deal[p] & set(suggested)), None)
+            shown = None
+            if shower is not None and rng.random() < 0.5:
+                shown = rng.choice(sorted(deal[shower] & set(suggested)))
+            events.append(ClueEvent("suggest", player, suggested,
+                                    shower, shown))
+    return events
+
+
+def _all_deals(setup):
+    """Yield every possible deal of setup, in the format of random_deal."""
+    players = setup["players"]
+
+    def hands(remaining, i):
+        if i == len(players):
+            yield {}
+            return
+        name, hand_size = players[i]
+        for hand in itertools.combinations(sorted(remaining), hand_size):
+            for rest in hands(remaining - set(hand), i + 1):
+                rest[name] = frozenset(hand)
+                yield rest
+
+    all_cards = {c for k in TYPE_KEYS for c in setup[k]}
+    for envelope in itertools.product(*(setup[k] for k in TYPE_KEYS)):
+        for deal in hands(all_cards - set(envelope), 0):
+            deal[None] = frozenset(envelope)
+            yield deal
+
+
+def _satisfies(setup, deal, event):
+    held = deal[event.player]
+    if event.kind == "suggest":
+        players = [p for p, _ in setup["players"]]
+        i = players.index(event.player)
+        for p in players[i + 1:] + players[:i]:
+            if p == event.shower:
+                return (event.shown in deal[p] if event.shown is not None
+                        else any(c in deal[p] for c in event.cards))
+            if any(c in deal[p] for c in event.cards):
+                return False
+        return event.shower is None
+    elif event.kind == "have":
+        return event.cards[0] in held
+    elif event.kind == "pass":
+        return event.cards[0] not in held
+    else:
+        return any(c in held for c in event.cards)
+
+
+def consistent_deals(setup, events):
+    """Return a list of every deal of setup consistent with all events."""
+    return [d for d in _all_deals(setup)
+            if all(_satisfies(setup, d, e) for e in events)]
+
+
+def check(setup, events):
+    """Compare the Game engine's conclusions with the brute-force oracle.
+
+    Returns:
+        a list of descriptions of each unsound conclusion (empty if none)
+    """
+    deals = consistent_deals(setup, events)
+    game = gamelog.new_game(setup)
+    try:
+        for e in events:
+            game.record_event(e)
+    except ValueError as err:
+        return ["engine rejected consistent events: {}".format(err)]
+
+    problems = []
+    for r in game.relations:
+        if r.rel_type == ClueRelationType.SHOW:
+            continue
+        player, card = r.player.name, r.cards[0].name
+        expected = r.rel_type == ClueRelationType.HAVE
+        if any((card in d[player]) != expected for d in deals):
+            problems.append("unsound {} {} {}".format(
+                player, r.rel_type.value, card))
+    for c in game.cards_in_the_file:
+        if any(c.name not in d[None] for d in deals):
+            problems.append("unsound card in the file {}".format(c.name))
+    return problems
+
+
+def shrink(events, still_fails):
+    """Reduce events to a minimal sublist for which still_fails holds.
+
+    Uses a simple delta-debugging strategy: try removing ever-smaller chunks
+    of events, keeping any removal after which still_fails(events) is true;
+    then keep trying to remove single events until none can be.  (One pass
+    is not enough, as removing an event can make one before it removable.)
+    The result is 1-minimal: removing any single event makes it pass.
+    """
+    events = list(events)
+    chunk = max(len(events) // 2, 1)
+    while True:
+        removed = False
+        i = 0
+        while i < len(events):
+            candidate = events[:i] + events[i + chunk:]
+            if still_fails(candidate):
+                events = candidate
+                removed = True
+            else:
+                i += chunk
+        if chunk > 1:
+            chunk //= 2
+        elif not removed:
+            return events
+
+
+def _run_trials(seed, deadline, max_trials):
+    """Run random trials until deadline; return (trials run, failures)."""
+    rng = random.Random(seed)
+    trials = 0
+    failures = []
+    while trials < max_trials and time.monotonic() < deadline:
+        trials += 1
+        setup = random_setup(rng)
+        deal = random_deal(setup, rng)
+        events = random_events(setup, deal, rng, rng.randint(1, 12))
+        if check(setup, events):
+            events = shrink(events, lambda es: bool(check(setup, es)))
+            failures.append({"setup": setup,
+                             "events": [e._asdict() for e in events],
+                             "problems": check(setup, events)})
+    return trials, failures
+
+
+def fuzz(seconds=10.0, jobs=None, seed=None, max_trials=None):
+    """Run random differential trials in parallel within a time budget.
+
+    Arguments:
+        seconds    -- wall-clock time budget
+        jobs       -- number of worker processes (default: CPU count)
+        seed       -- base random seed, for reproducible runs
+        max_trials -- optional cap on the number of trials per worker
+
+    Returns:
+        the number of trials run, and a list of (shrunk) failures
+    """
+    jobs = jobs or os.cpu_count() or 1
+    seed = random.randrange(2 ** 32) if seed is None else seed
+    deadline = time.monotonic() + seconds
+    max_trials = max_trials or sys.maxsize
+    if jobs == 1:
+        return _run_trials(seed, deadline, max_trials)
+    with concurrent.futures.ProcessPoolExecutor(jobs) as pool:
+        results = pool.map(_run_trials, range(seed, seed + jobs),
+                           [deadline] * jobs, [max_trials] * jobs)
+        trials, failures = 0, []
+        for t, f in results:
+            trials += t
+            failures.extend(f)
+    return trials, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Fuzz the Game engine against a brute-force oracle.")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("-j", "--jobs", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    trials, failures = fuzz(args.seconds, args.jobs, args.seed)
+    for f in failures:
+        print(f)
+    print("{} trials, {} failures".format(trials, len(failures)))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""gamelog.py -- Read, write and replay Clue game event logs
+
+A Game keeps a log of the events entered into it (see Game.events).  This
+module persists such logs in a simple, engine-independent text format, so that
+games can be archived and later replayed through any version of the Game
+inference engine.
+
+An event log file is in JSON Lines format.  The first line describes the game
+setup, and each following line is one event, in the order it was entered:
+
+    {"persons": [...], "weapons": [...], "rooms": [...],
+     "players": [["Adam", 5], ["Cynthia", 5], ...]}
+    {"kind": "have", "player": "Adam", "cards": ["Rope"]}
+    {"kind": "show", "player": "Greg", "cards": ["Rope", "Hall", "Knife"]}
+    {"kind": "suggest", "player": "Adam", "cards": ["Plum", "Rope", "Hall"],
+     "shower": "Greg", "shown": null}
+
+Players are listed in seating order.  Event fields other than kind, player
+and cards may be omitted when null.
+
+Functions:
+    game_setup -- describe the setup of a Game as a dict
+    new_game   -- create a fresh Game from a setup dict
+    write_log  -- write a Game's setup and event log to a file
+    read_log   -- read a setup and (lazily) the events from a log file
+    open_log   -- read a setup and events from a log or a pickled Game
+    replay     -- create a Game from a setup and feed it a list of events
+"""
+
+from cluesolver.cluegame import ClueCardType, ClueEvent, Game
+import json
+
+
+def game_setup(game):
+    """Describe the setup of a Game as a dict (see module docstring)."""
+    setup = {}
+    for key, t in [("persons", ClueCardType.PERSON),
+                   ("weapons", ClueCardType.WEAPON),
+                   ("rooms", ClueCardType.ROOM)]:
+        setup[key] = sorted(c.name for c in game.cards if c.card_type == t)
+    players = {p.name: p for p in game.players}
+    setup["players"] = [[name, players[name].hand_size]
+                        for name in game.seating]
+    return setup
+
+
+def new_game(setup):
+    """Create a fresh Game with no events from a setup dict."""
+    return Game(setup["persons"], setup["weapons"], setup["rooms"],
+                [tuple(p) for p in setup["players"]])
+
+
+def write_log(game, f):
+    """Write a Game's setup and event log to an open text file."""
+    f.write(json.dumps(game_setup(game)) + "\n")
+    for e in game.events:
+        f.write(json.dumps({k: v for k, v in e._asdict().items()
+                            if v is not None}) + "\n")
+
+
+def read_log(f):
+    """Read an event log from an open text file (or other iterable of lines).
+
+    The events are parsed lazily, as the returned iterator is consumed.
+
+    Returns:
+        the setup dict, and an iterator of ClueEvents
+    """
+    lines = iter(f)
+    setup = json.loads(next(lines))
+
+    def events():
+        for line in lines:
+            if line.strip():
+                yield ClueEvent(**json.loads(line))
+
+    return setup, events()
+
+
+def open_log(path):
+    """Read a setup and list of events from a log file or a pickled Game.
+
+    Files ending in ".jsonl" are read as event logs; anything else is assumed
+    to be a Game pickled by Game.save.
+    """
+    if path.endswith(".jsonl"):
+        with open(path) as f:
+            setup, events = read_log(f)
+            return setup, list(events)
+    game = Game.load(path)
+    if game is None:
+        raise ValueError("No saved game at {}".format(path))
+    return game_setup(game), list(game.events)
+
+
+def replay(setup, events):
+    """Create a Game from a setup dict, and record each of the events."""
+    game = new_game(setup)
+    for e in events:
+        game.record_event(e)
+    return game
@@ -0,0 +1,99 @@
+"""knowledge.py -- Games' knowledge matrices as NumPy arrays, for analytics
+
+Each Game keeps what is known of who has which card as a players x cards
+matrix of bytes (see Game.knowledge), which NumPy can read without copying.
+This module makes NumPy arrays of them: of a single Game, without copying;
+or of many Games at once, stacked into one games x players x cards array for
+vectorized analysis across games.  For example, to find how often each
+player's holding of each card is known, across a number of games:
+
+    known = (stack(games) != UNKNOWN).mean(axis=0)
+
+The entries are UNKNOWN, HAS or PASSES (from cluegame.py).  Games can only be
+stacked if they have the same Players and Cards, but not necessarily in the
+same order (see Game.player_order and Game.card_order): e.g. Games created
+from the same setup number their Cards in the order they were given, but
+Games loaded from before Cards were numbered number them by name.
+
+Functions:
+    knowledge_array -- a Game's knowledge matrix as a NumPy array (no copy)
+    stack           -- stack the knowledge matrices of many Games
+"""
+
+from cluesolver.cluegame import HAS, PASSES, UNKNOWN  # noqa: F401
+import numpy as np
+
+
+def knowledge_array(game):
+    """Return the knowledge matrix of a Game as a NumPy array.
+
+    The array is a read-only view of the Game's own storage (see
+    Game.knowledge), not a copy, so it only reflects the state of the Game
+    at the time of the call.
+
+    Returns:
+        a players x cards array of uint8
+    """
+    return np.asarray(game.knowledge())
+
+
+def stack(games, out=None):
+    """Stack the knowledge matrices of Games into one 3-dimensional array.
+
+    Each Game's matrix is copied into the array once, with no intermediate
+    copies, unless its Players or Cards are in a different order from the
+    first Game's, when its rows and columns are first rearranged to match.
+
+    Arguments:
+        games -- a sequence of Games with the same Players and Cards
+        out   -- an array of uint8 to stack into, of shape games x players x
+                 cards, or None to make a new one (e.g. to reuse one array
+                 for many batches of games)
+
+    Returns:
+        the games x players x cards array of uint8, indexed by the position
+        of each Game in games, and by the position of each Player and Card
+        in the first Game's player_order and card_order
+
+    Raises ValueError if the Games do not all have the same Players and
+    Cards, or out is the wrong shape.
+    """
+    games = list(games)
+    if not games:
+        raise ValueError("No games to stack")
+    players, cards = games[0].player_order, games[0].card_order
+    orders = [(_reorder(game.player_order, players, i),
+               _reorder(game.card_order, cards, i))
+              for i, game in enumerate(games)]
+    shape = (len(games), len(players), len(cards))
+    if out is None:
+        out = np.empty(shape, dtype=np.uint8)
+    elif out.shape != shape or out.dtype != np.uint8:
+        raise ValueError("Expected a uint8 array of shape {}, not {} {}"
+                         .format(shape, out.dtype, out.shape))
+    for i, (game, (rows, columns)) in enumerate(zip(games, orders)):
+        if rows is None and columns is None:
+            out[i] = game.knowledge()
+        else:
+            out[i] = knowledge_array(game)[np.ix_(
+                range(len(players)) if rows is None else rows,
+                range(len(cards)) if columns is None else columns)]
+    return out
+
+
+def _reorder(order, first_order, i):
+    """Return how to rearrange the i-th Game's order to the first's.
+
+    Returns:
+        None if the orders are the same, or else the list of the positions
+        in order of each of first_order
+
+    Raises ValueError if the orders are not of the same Players (or Cards).
+    """
+    if order == first_order:
+        return None
+    if len(order) != len(first_order) or set(order) != set(first_order):
+        raise ValueError("Game {} does not have the same players and cards "
+                         "as the first".format(i))
+    positions = {x: n for n, x in enumerate(order)}
+    return [positions[x] for x in first_order]
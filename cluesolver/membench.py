@@ -0,0 +1,95 @@
+"""membench.py -- Measure how much memory Games take up
+
+Simulations and servers keep many Games in memory at once, so the size of a
+Game matters.  This benchmark plays a number of random games of standard
+Clue (see STANDARD_SETUP), each with the same number of random, truthful
+events (see fuzz.py), keeps them all in memory, and measures with tracemalloc
+how much memory was allocated for them.  It reports the footprint per game,
+and per relation known, and for comparison the size of a pickled game.
+
+Usage:
+    python -m cluesolver.membench [--games N] [--events N] [--seed SEED]
+
+Functions:
+    measure -- play and keep many games, measuring their memory footprint
+    main    -- command line entry point
+"""
+
+from cluesolver import fuzz, gamelog
+import argparse
+import collections
+import pickle
+import random
+import sys
+import time
+import tracemalloc
+
+STANDARD_SETUP = {
+    "persons": ["Colonel Mustard", "Miss Scarlet", "Professor Plum",
+                "Mrs. White", "Mr. Green", "Mrs. Peacock"],
+    "weapons": ["Rope", "Lead Pipe", "Revolver", "Candlestick", "Knife",
+                "Wrench"],
+    "rooms": ["Billiard Room", "Ballroom", "Lounge", "Kitchen",
+              "Conservatory", "Library", "Dining Room", "Hall", "Study"],
+    "players": [["Adam", 5], ["Cynthia", 5], ["Greg", 4], ["David", 4]],
+}
+
+Measurement = collections.namedtuple(
+    'Measurement', 'games bytes_per_game relations_per_game '
+                   'pickled_bytes_per_game seconds')
+
+
+def measure(n_games=1000, n_events=40, seed=0):
+    """Play n_games random games, and measure their memory footprint.
+
+    The events are made up before measuring starts, so only the Games
+    themselves (and whatever they refer to, that was not already there) are
+    counted.
+
+    Returns:
+        a Measurement
+    """
+    rng = random.Random(seed)
+    logs = [fuzz.random_events(STANDARD_SETUP,
+                               fuzz.random_deal(STANDARD_SETUP, rng),
+                               rng, n_events)
+            for _ in range(n_games)]
+    # Create one game up front, so that one-off allocations (e.g. of
+    # interned names and caches) are not charged to the games measured.
+    gamelog.replay(STANDARD_SETUP, logs[0])
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    games = [gamelog.replay(STANDARD_SETUP, events) for events in logs]
+    seconds = time.perf_counter() - start
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    relations = sum(len(g.relations) + len(g.resolved_shows) for g in games)
+    pickled = sum(len(pickle.dumps(g)) for g in games)
+    return Measurement(n_games, allocated / n_games, relations / n_games,
+                       pickled / n_games, seconds)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Measure the memory footprint of Games.")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--events", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    m = measure(args.games, args.events, args.seed)
+    print("{} games of {} events, replayed in {:.2f}s (under tracemalloc)"
+          .format(m.games, args.events, m.seconds))
+    print("{:>10.0f} bytes per game in memory".format(m.bytes_per_game))
+    print("{:>10.1f} relations per game".format(m.relations_per_game))
+    print("{:>10.0f} bytes per relation".format(
+        m.bytes_per_game / m.relations_per_game))
+    print("{:>10.0f} bytes per game pickled".format(
+        m.pickled_bytes_per_game))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""objectfilter.py -- General tools for querying custom Python class instances
+
+I am not really totally sure that the functionality provided here can't already
+be had in a much more succinct way somehow, e.g. using Python builtin
+generators, list comprehensions, or something of the sort.  I tried for a
+little while, and failed to find an adequate alternative for my querying needs.
+Anyway, I wrote this, so here it is; I'll use it until and unless I find a
+distinctly better way.
+
+Classes:
+    ObjectFilter -- a tool to query a list of Python custom class instances
+"""
+
+import weakref
+
+
+class ObjectFilter:
+    """Represents a filter to match custom objects of any kind.
+
+    The filter is represented as a binary tree structure; this allows building
+    compound filters by joining independent filters using a logical operator.
+
+    Filters are immutable and hash-consed: constructing a filter that is
+    structurally equal to one that already exists returns the existing object.
+    This means identical subtrees are shared rather than rebuilt, and filters
+    can be compared, hashed and used as dictionary keys.  A filter's statement
+    must therefore be hashable.
+
+    Public methods:
+        match      -- check a single object against the filter
+        add        -- add a filter condition to the query
+        get        -- query a list and return results based on the filter
+        iter       -- lazily yield results from a list based on the filter
+        first      -- return the first matching item from a list, if any
+        exists     -- check whether any item in a list matches the filter
+        count      -- count the items in a list that match the filter
+
+    Instance variables (read-only):
+        left       -- left child filter
+        right      -- right child filter
+        statement  -- this node's filter component
+    """
+    __slots__ = ('statement', 'left', 'right', '_hash', '__weakref__')
+
+    _interned = weakref.WeakValueDictionary()
+
+    def __new__(cls, statement=None, left=None, right=None):
+        """Return the unique filter node for the given structure.
+
+        The filter's specific matching behavior is based on `statement`, and is
+        defined in the self.match method.
+
+        Arguments:
+            statement -- defines what objects this filter should match
+            left      -- left child filter, for compound filters
+            right     -- right child filter, for compound filters
+        """
+        key = (cls, statement, left, right)
+        node = cls._interned.get(key)
+        if node is None:
+            node = super().__new__(cls)
+            object.__setattr__(node, 'statement', statement)
+            object.__setattr__(node, 'left', left)
+            object.__setattr__(node, 'right', right)
+            object.__setattr__(node, '_hash', hash(key))
+            cls._interned[key] = node
+        return node
+
+    def __init__(self, statement=None, left=None, right=None):
+        """All initialization is done (once per structure) in __new__."""
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ObjectFilter instances are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("ObjectFilter instances are immutable")
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if type(self) is not type(other):
+            return NotImplemented
+        return (self.statement, self.left, self.right) == \
+            (other.statement, other.left, other.right)
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        return (type(self), (self.statement, self.left, self.right))
+
+    def __repr__(self):
+        if self.left is None:
+            return "{}({!r})".format(type(self).__name__, self.statement)
+        return "{}({!r}, {!r}, {!r})".format(
+            type(self).__name__, self.statement, self.left, self.right)
+
+    def match(self, obj):
+        """Recursively check if obj matches all filter statements.
+
+        Arguments:
+            obj -- the object to check
+        """
+        if self.statement == "and":
+            return self.left.match(obj) and self.right.match(obj)
+        elif self.statement == "or":
+            return self.left.match(obj) or self.right.match(obj)
+        elif self.statement == "not":
+            return not self.left.match(obj)
+        else:
+            return NotImplemented
+
+    def compound(self, op="not", other_filter=None):
+        """Create a compound filter using a logical operator.
+
+        Arguments:
+            op           -- logical operator to use
+            other_filter -- other filter to combine with, if op is "and"/"or"
+        """
+        if op in ["and", "or", "not"]:
+            return ObjectFilter(op, self, other_filter)
+        else:
+            raise ValueError("Specified op was {}; ".format(op) +
+                             "expected 'and', 'or', or 'not'")
+
+    def __add__(self, other):
+        """Combine with another filter to create a compound "and" filter."""
+        return self.compound(op="and", other_filter=other)
+
+    def __truediv__(self, other):
+        """Combine with another filter to create a compound "or" filter."""
+        return self.compound(op="or", other_filter=other)
+
+    def __neg__(self):
+        """Invert filter, creating a compound "not" filter."""
+        return self.compound(op="not")
+
+    def iter(self, objlist):
+        """Lazily yield each item from objlist that matches the filter."""
+        for obj in objlist:
+            if self.match(obj):
+                yield obj
+
+    def get(self, objlist):
+        """Return all items from objlist that match the filter."""
+        return list(self.iter(objlist))
+
+    def first(self, objlist, default=None):
+        """Return the first item from objlist that matches the filter.
+
+        Stops scanning objlist as soon as a match is found.
+
+        Arguments:
+            objlist -- the items to scan
+            default -- what to return if no item matches
+        """
+        return next(self.iter(objlist), default)
+
+    def exists(self, objlist):
+        """Check whether any item from objlist matches the filter.
+
+        Stops scanning objlist as soon as a match is found.
+        """
+        return any(True for _ in self.iter(objlist))
+
+    def count(self, objlist):
+        """Return the number of items from objlist that match the filter."""
+        return sum(1 for _ in self.iter(objlist))
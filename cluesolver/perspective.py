@@ -0,0 +1,97 @@
+"""perspective.py -- Track what each player in a Clue game can deduce
+
+A Game records everything that *I* know.  To guess what my opponents know, we
+need one Game per player perspective: what Adam can deduce from the events he
+has witnessed.  Most events are public (everyone sees who passes, and who
+shows a card to whom), but some are private to one player (their own hand,
+and the cards shown to them).
+
+Running one full Game per player, each re-running every deduction for every
+public event, wastes both memory and time.  Instead, a PerspectiveTracker
+keeps:
+    - one shared Game for the public events, and
+    - for each player, only the list of their private events (an overlay).
+
+A player's own Game is only made once the player has private events
+(otherwise the shared public Game *is* their perspective): each private event
+is recorded on it as it comes, so that one that contradicts what the player
+knows is rejected at once, rather than every time the perspective is asked
+for.  It is a fork of the public Game (see Game.fork), with only the
+player's private events recorded on top: it shares the public Game's state,
+and all the deductions already made from the public events, and only copies
+that state once its private events change it.  Deductions don't depend on the
+order of the events, so this knows just what replaying all of them in order
+would.  Recording a public event touches only the shared Game; each
+perspective is forked afresh from it, the next time it is needed.
+
+Classes:
+    PerspectiveTracker -- a set of per-player Games sharing public events
+"""
+
+from cluesolver.cluegame import Game
+
+
+class PerspectiveTracker:
+    """Tracks what each player can deduce, sharing the public events.
+
+    Public methods:
+        record_public  -- record an event witnessed by every player
+        record_private -- record an event witnessed by one player only
+        perspective    -- the Game as it is known to a given player
+
+    Instance variables:
+        public -- the Game of public knowledge, shared by all perspectives
+    """
+
+    def __init__(self,
+                 clue_cards_persons,
+                 clue_cards_weapons,
+                 clue_cards_rooms,
+                 players):
+        """Initializes the tracker; arguments are as for Game."""
+        self._setup = (clue_cards_persons, clue_cards_weapons,
+                       clue_cards_rooms, players)
+        self.public = Game(*self._setup)
+        # For each player: a list of their private ClueEvents
+        self._private = {p.name: [] for p in self.public.players}
+        # For each materialized perspective: [Game, the public version it
+        # was forked from]
+        self._views = {}
+
+    def record_public(self, event):
+        """Record a ClueEvent that every player witnessed."""
+        self.public.record_event(event)
+
+    def record_private(self, viewer, event):
+        """Record a ClueEvent that only viewer (a player name) witnessed.
+
+        If the event contradicts what viewer knows, it is not recorded, and
+        ClueContradiction is raised.
+        """
+        if viewer not in self._private:
+            raise ValueError("No such Player {}".format(viewer))
+        self.__view(viewer).record_event(event)
+        self._private[viewer].append(event)
+
+    def perspective(self, viewer):
+        """Return the Game of what viewer (a player name) can deduce.
+
+        The returned Game shares its state with the tracker, and must not be
+        modified directly; record events through the tracker instead.
+        """
+        if viewer not in self._private:
+            raise ValueError("No such Player {}".format(viewer))
+        if not self._private[viewer]:
+            return self.public
+        return self.__view(viewer)
+
+    def __view(self, viewer):
+        """Return viewer's own Game, forked from the current public Game."""
+        view = self._views.get(viewer)
+        if view is None or view[1] != self.public.version:
+            game = self.public.fork()
+            with game.batch():
+                for event in self._private[viewer]:
+                    game.record_event(event)
+            view = self._views[viewer] = [game, self.public.version]
+        return view[0]
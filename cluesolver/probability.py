@@ -0,0 +1,171 @@
+"""probability.py -- Fast approximate card location probabilities
+
+The rule-based deductions in cluegame.py only ever produce certainties: a
+player either HAS or PASSES a card.  In between those certainties there is a
+lot of useful, if fuzzier, knowledge.  This module estimates, for every player
+and card, the marginal probability that the player holds the card (and for
+every card, the probability that it is in the file).
+
+The estimate is made by iterative proportional fitting over a players x cards
+matrix (plus one extra row for the file), which is repeatedly rescaled until
+it satisfies, as nearly as possible, all of the following at once:
+    - each player's row sums to that player's hand size
+    - each card's column sums to 1 (every card is somewhere)
+    - the file row holds exactly 1 card of each ClueCardType
+    - each SHOW gives its player at least 1 card among the cards shown
+    - recorded HAVEs and PASSes stay fixed at 1 and 0
+
+This is an approximation (it treats the constraints as independent), but every
+step is a vectorized NumPy operation, so it runs in milliseconds even for
+large decks.
+
+Classes:
+    MarginalProbabilities -- a probability matrix with stable row/col labels
+
+Functions:
+    marginal_probabilities -- estimate the probability matrix for a Game
+"""
+
+from cluesolver.cluegame import ClueCardType, ClueRelationType
+import numpy as np
+
+
+class MarginalProbabilities:
+    """A players (plus file) x cards matrix of location probabilities.
+
+    Rows are ordered as self.players, followed by one final row for the file.
+    Columns are ordered as self.cards.
+
+    Public methods:
+        probability  -- look up the probability for a Player/Card pair
+        in_the_file  -- look up the probability that a Card is in the file
+        heat_map     -- rows of (label, probabilities) ready for rendering
+
+    Instance variables:
+        players     -- a list of Players, in seating (row) order
+        cards       -- a list of Cards, in column order
+        values      -- the NumPy array of probabilities
+        iterations  -- how many fitting iterations were run
+        deals       -- the number of consistent deals, if the probabilities
+                       were computed exactly by counting them (else None)
+    """
+
+    def __init__(self, players, cards, values, iterations, deals=None):
+        self.players = players
+        self.cards = cards
+        self.values = values
+        self.iterations = iterations
+        self.deals = deals
+        self._player_index = {p: i for i, p in enumerate(players)}
+        self._card_index = {c: i for i, c in enumerate(cards)}
+
+    def probability(self, player, card):
+        """Return the probability that player holds card."""
+        return float(self.values[self._player_index[player],
+                                 self._card_index[card]])
+
+    def in_the_file(self, card):
+        """Return the probability that card is in the file."""
+        return float(self.values[-1, self._card_index[card]])
+
+    def heat_map(self):
+        """Return a list of (row label, list of probabilities) pairs.
+
+        The last row is labelled "File"; columns follow self.cards.
+        """
+        labels = [p.name for p in self.players] + ["File"]
+        return [(label, [float(v) for v in row])
+                for label, row in zip(labels, self.values)]
+
+
+def marginal_probabilities(game, max_iterations=200, tolerance=1e-6):
+    """Estimate the probability of each card being in each location.
+
+    Arguments:
+        game           -- the Game to analyze
+        max_iterations -- upper bound on the number of fitting iterations
+        tolerance      -- stop once no probability changes by more than this
+
+    Returns:
+        a MarginalProbabilities instance
+    """
+    players = game.player_order
+    type_order = list(ClueCardType)
+    cards = sorted(game.cards,
+                   key=lambda c: (type_order.index(c.card_type), c.name))
+    player_index = {p: i for i, p in enumerate(players)}
+    card_index = {c: i for i, c in enumerate(cards)}
+    n_rows, n_cols = len(players) + 1, len(cards)
+
+    # Known facts: NaN marks an entry that is free to be fitted.
+    fixed = np.full((n_rows, n_cols), np.nan)
+    show_rows, show_cols = [], []
+    for r in game.relations:
+        row = player_index[r.player]
+        cols = [card_index[c] for c in r.cards]
+        if r.rel_type == ClueRelationType.HAVE:
+            fixed[:, cols[0]] = 0.0
+            fixed[row, cols[0]] = 1.0
+        elif r.rel_type == ClueRelationType.PASS:
+            fixed[row, cols[0]] = 0.0
+        elif r.rel_type == ClueRelationType.SHOW:
+            show_rows.append(row)
+            # Pad short SHOWs with a dummy column that always holds 0.
+            show_cols.append(cols + [n_cols] * (3 - len(cols)))
+
+    # A card every player PASSes is in the file, to the exclusion of the
+    # rest of its type.
+    for col in np.flatnonzero((fixed[:-1] == 0.0).all(axis=0)):
+        same_type = [card_index[c] for c in cards
+                     if c.card_type == cards[col].card_type]
+        fixed[-1, same_type] = 0.0
+        fixed[-1, col] = 1.0
+
+    free = np.isnan(fixed)
+    fixed_values = np.where(free, 0.0, fixed)
+    values = np.where(free, 1.0, fixed_values)
+
+    # Target sum for each row block: hand sizes, then 1 per type in the file.
+    row_blocks = [(np.s_[i], np.s_[:], p.hand_size)
+                  for i, p in enumerate(players)]
+    for t in type_order:
+        cols = np.array([card_index[c] for c in cards if c.card_type == t])
+        if len(cols):
+            row_blocks.append((np.s_[-1], cols, 1.0))
+
+    show_rows = np.array(show_rows, dtype=int)
+    show_cols = np.array(show_cols, dtype=int).reshape(-1, 3)
+
+    iterations = 0
+    for iterations in range(1, max_iterations + 1):
+        previous = values.copy()
+
+        for row, cols, target in row_blocks:
+            block = values[row, cols]
+            block_free = free[row, cols]
+            free_mass = block[block_free].sum()
+            if free_mass > 0:
+                scale = (target - fixed_values[row, cols].sum()) / free_mass
+                values[row, cols] = np.where(
+                    block_free, block * max(scale, 0.0), block)
+
+        free_mass = np.where(free, values, 0.0).sum(axis=0)
+        scale = np.divide(1.0 - fixed_values.sum(axis=0), free_mass,
+                          out=np.ones(n_cols), where=free_mass > 0)
+        values = np.where(free, values * np.clip(scale, 0.0, None), values)
+
+        if len(show_rows):
+            padded = np.hstack([values, np.zeros((n_rows, 1))])
+            totals = padded[show_rows[:, None], show_cols].sum(axis=1)
+            boost = np.divide(1.0, totals, out=np.ones(len(totals)),
+                              where=totals > 0)
+            factors = np.ones((n_rows, n_cols + 1))
+            np.maximum.at(factors, (show_rows[:, None], show_cols),
+                          np.maximum(boost, 1.0)[:, None])
+            values = np.where(free, values * factors[:, :n_cols], values)
+
+        np.clip(values, 0.0, 1.0, out=values)
+        if np.abs(values - previous).max() <= tolerance:
+            break
+
+    return MarginalProbabilities(players, cards, values, iterations)
@@ -0,0 +1,255 @@
+"""store.py -- Keep many Games on disk, and the busy ones in memory
+
+A GameStore saves each Game under its game_id, in a sharded directory layout
+(directory/ab/cd/abcd....pickledb), so that a single directory never holds
+more than a few hundred files however many games are stored.
+
+Loading a Game from disk (unpickling it and rebuilding its indexes) for every
+request is wasteful when the same few games are in play, so the store also
+keeps a pool of recently used Games in memory.  A Game changed in memory is
+only written back to disk when it leaves the pool (or on flush()).  Games
+leave the pool when:
+    - they have been idle for longer than idle_seconds,
+    - the pool holds more than max_games games, or
+    - the pool's games take up more than max_bytes of memory, as measured by
+      deep_sizeof() (the least recently used go first).
+
+Each Game is checked out under its own lock, so that two requests for the
+same game do not change it at the same time.  (So don't call other GameStore
+methods while a Game is checked out.)
+
+Classes:
+    GameStore -- a sharded on-disk store of Games, with an in-memory pool
+
+Functions:
+    deep_sizeof -- estimate the memory taken up by an object and its contents
+"""
+
+from cluesolver.cluegame import Game
+import collections
+import contextlib
+import os
+import re
+import sys
+import threading
+import time
+
+GAME_ID_PATTERN = re.compile("[0-9a-f]{32}")
+
+
+def deep_sizeof(obj):
+    """Estimate the memory taken up by obj, and everything it refers to.
+
+    Shared objects are only counted once; classes, functions and modules are
+    not counted at all.
+    """
+    seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen or isinstance(o, type) or callable(o):
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset, collections.deque)):
+            stack.extend(o)
+        if hasattr(o, '__dict__'):
+            stack.append(o.__dict__)
+        for slot in getattr(type(o), '__slots__', ()):
+            if hasattr(o, slot):
+                stack.append(getattr(o, slot))
+    return total
+
+
+class _PoolEntry:
+    """A Game in the pool, with its bookkeeping."""
+    __slots__ = ('game', 'lock', 'last_used', 'saved_version', 'size')
+
+    def __init__(self, game, saved_version):
+        self.game = game
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+        self.saved_version = saved_version
+        self.size = None
+
+
+class GameStore:
+    """A sharded on-disk store of Games, with a pool of them in memory.
+
+    Public methods:
+        path_for    -- the file path a game_id is stored at
+        add         -- store a new Game
+        import_file -- store the Game saved in a file, and move the file aside
+        checkout    -- a context manager, lending out a stored Game
+        delete      -- delete a stored Game
+        sweep       -- write back and evict idle and excess Games from the pool
+        flush       -- write back every changed Game in the pool
+
+    Instance variables:
+        directory    -- the root directory of the store
+        max_games    -- the most Games to keep in the pool
+        idle_seconds -- how long a Game may stay unused in the pool
+        max_bytes    -- the most memory the pool's Games may take up
+    """
+
+    def __init__(self, directory, max_games=128, idle_seconds=900.0,
+                 max_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.max_games = max_games
+        self.idle_seconds = idle_seconds
+        self.max_bytes = max_bytes
+        self._pool = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, game_id):
+        try:
+            path = self.path_for(game_id)
+        except ValueError:
+            return False
+        return game_id in self._pool or os.path.isfile(path)
+
+    def path_for(self, game_id):
+        """Return the path of the file to store game_id in.
+
+        Raises ValueError if game_id is not a valid game_id.
+        """
+        if not isinstance(game_id, str) or \
+                not GAME_ID_PATTERN.fullmatch(game_id):
+            raise ValueError("Invalid game id: {!r}".format(game_id))
+        return os.path.join(self.directory, game_id[0:2], game_id[2:4],
+                            game_id + ".pickledb")
+
+    def add(self, game):
+        """Store a new Game, in the pool (it is written to disk later)."""
+        self.path_for(game.game_id)
+        with self._lock:
+            self._pool[game.game_id] = _PoolEntry(game, None)
+        self.sweep()
+
+    def import_file(self, path):
+        """Store the Game saved at path (see Game.save), and move it aside.
+
+        The Game is written to the store at once, and only then is the file
+        renamed to path + ".imported", so that it is imported only once, and
+        the Game is never only in memory.  (A Game saved before events were
+        logged gets an event log made up from its relations as it is loaded,
+        so it can be replayed and corrected like any other.)
+
+        Returns:
+            the game_id of the Game, or None if there is no file at path
+        """
+        game = Game.load(path)
+        if game is None:
+            return None
+        self.path_for(game.game_id)
+        entry = _PoolEntry(game, None)
+        with self._lock:
+            self._pool[game.game_id] = entry
+            with entry.lock:
+                self.__write_back(entry)
+        os.replace(path, path + ".imported")
+        self.sweep()
+        return game.game_id
+
+    @contextlib.contextmanager
+    def checkout(self, game_id):
+        """Lend out the Game stored under game_id (or None if there is none).
+
+        The Game is locked against other checkouts until the with block
+        exits.  Any changes made to it are kept, and written back to disk in
+        due course.
+        """
+        while True:
+            entry = self.__entry(game_id)
+            if entry is None:
+                yield None
+                return
+            with entry.lock:
+                if self._pool.get(game_id) is not entry:
+                    continue  # Evicted while we waited; load it again.
+                try:
+                    yield entry.game
+                finally:
+                    entry.last_used = time.monotonic()
+                    if entry.game.version != entry.saved_version:
+                        entry.size = None
+            break
+        self.sweep()
+
+    def delete(self, game_id):
+        """Delete the Game stored under game_id, if any."""
+        path = self.path_for(game_id)
+        with self._lock:
+            self._pool.pop(game_id, None)
+            if os.path.isfile(path):
+                Game.delete(path)
+
+    def sweep(self, now=None):
+        """Write back and evict idle Games, and Games over the pool limits.
+
+        Returns:
+            the total measured size of the Games left in the pool
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            # Games checked out right now are neither idle, nor safe to
+            # measure or evict, so they are skipped.
+            for entry in self._pool.values():
+                if entry.size is None and entry.lock.acquire(blocking=False):
+                    try:
+                        entry.size = deep_sizeof(entry.game)
+                    finally:
+                        entry.lock.release()
+            excess_games = len(self._pool) - self.max_games
+            total = sum(e.size or 0 for e in self._pool.values())
+            for game_id, entry in list(self._pool.items()):
+                if not (now - entry.last_used > self.idle_seconds or
+                        excess_games > 0 or total > self.max_bytes):
+                    continue
+                if not entry.lock.acquire(blocking=False):
+                    continue
+                try:
+                    self.__write_back(entry)
+                finally:
+                    entry.lock.release()
+                del self._pool[game_id]
+                excess_games -= 1
+                total -= entry.size or 0
+            return total
+
+    def flush(self):
+        """Write back every changed Game in the pool to disk."""
+        with self._lock:
+            for entry in self._pool.values():
+                with entry.lock:
+                    self.__write_back(entry)
+
+    def __entry(self, game_id):
+        """Return the pool entry for game_id, loading it if need be."""
+        try:
+            path = self.path_for(game_id)
+        except ValueError:
+            return None
+        with self._lock:
+            entry = self._pool.get(game_id)
+            if entry is None:
+                game = Game.load(path)
+                if game is None:
+                    return None
+                entry = _PoolEntry(game, game.version)
+                self._pool[game_id] = entry
+            self._pool.move_to_end(game_id)
+            return entry
+
+    def __write_back(self, entry):
+        """Save the Game of a pool entry, if it has changed."""
+        if entry.game.version != entry.saved_version:
+            path = self.path_for(entry.game.game_id)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            entry.game.save(path + ".tmp")
+            os.replace(path + ".tmp", path)
+            entry.saved_version = entry.game.version
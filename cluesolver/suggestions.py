@@ -0,0 +1,58 @@
+"""suggestions.py -- Rank the possible suggestions by what they may reveal
+
+On their turn, a player suggests one person, one weapon and one room.  The
+most useful suggestions are those about cards whose whereabouts we are least
+sure of: a card known to be in the file, or known to be in some hand, has
+nothing left to tell us.
+
+This module scores every possible suggestion by the total uncertainty about
+whether its cards are in the file -- the sum of the binary entropies of their
+probabilities of being in the file (see probability.py and exact.py) -- and
+ranks them.  It is a heuristic (it ignores who would get to show a card, for
+one thing), but it is cheap: the scores of all suggestions are computed at
+once, with NumPy broadcasting.
+
+Functions:
+    rank_suggestions -- the best suggestions to make, best first
+"""
+
+from cluesolver.cluegame import ClueCardType
+import numpy as np
+
+
+def _entropy(p):
+    """The binary entropy, in bits, of each probability in an array."""
+    p = np.clip(p, 1e-12, 1 - 1e-12)
+    return -(p * np.log2(p) + (1 - p) * np.log2(1 - p))
+
+
+def rank_suggestions(probabilities, top=10):
+    """Return the top suggestions to make, by what they may reveal.
+
+    Arguments:
+        probabilities -- a MarginalProbabilities for the Game
+        top           -- how many suggestions to return
+
+    Returns:
+        a list of up to top (score, [person, weapon, room]) tuples, best
+        first, where the cards are given by name
+    """
+    by_type = []
+    for t in ClueCardType:
+        cards = [c for c in probabilities.cards if c.card_type == t]
+        if not cards:
+            return []
+        scores = _entropy(np.array(
+            [probabilities.in_the_file(c) for c in cards]))
+        by_type.append((cards, scores))
+
+    (persons, p), (weapons, w), (rooms, r) = by_type
+    totals = p[:, None, None] + w[None, :, None] + r[None, None, :]
+    flat = totals.ravel()
+    best = np.argsort(-flat, kind="stable")[:top]
+    ranking = []
+    for i in best:
+        a, b, c = np.unravel_index(i, totals.shape)
+        ranking.append((float(flat[i]),
+                        [persons[a].name, weapons[b].name, rooms[c].name]))
+    return ranking
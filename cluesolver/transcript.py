@@ -0,0 +1,369 @@
+"""transcript.py -- Import games written down as plain text transcripts
+
+Games logged on paper, or in a spreadsheet, are easiest to type up as plain
+sentences, one turn per line:
+
+    # Lines starting with # are comments.
+    players: Adam 2, Cynthia 2, Greg 1, David 1
+    persons: Colonel Mustard, Miss Scarlet, Professor Plum
+    weapons: Rope, Knife, Wrench
+    rooms: Hall, Lounge, Study
+    Adam has Rope, Hall
+    Adam suggests Plum Rope Hall; Cynthia passes; Greg shows
+    Greg suggests Scarlet Knife Study; Cynthia shows Knife
+    David suggests Mustard Wrench Lounge; nobody shows
+    Cynthia does not have Wrench
+    David shows one of Plum, Wrench, Lounge
+
+The setup lines (players, in seating order, with their hand sizes; and the
+cards) come first, unless the transcript is imported into an existing Game.
+Each other line is either a suggestion -- who suggested what, then who passed
+and who showed a card (and which card, if it was seen), separated by
+semicolons -- or any number of "X has C", "X does not have C" (or "X passes
+C") and "X shows [one of] C, D, E" statements, separated by semicolons.
+
+Players and cards can be named by any word of their name that no other name
+shares (so "Plum" for "Professor Plum"), in any case.
+
+A CSV transcript (from a spreadsheet) has the same sentences in its cells;
+the cells of each row are read as the clauses of one line.
+
+The transcript is read a line at a time, and its events are fed to the Game
+in batches (see Game.batch), so that deductions are only made once for each
+batch.  A line that cannot be understood, or that contradicts what came
+before, is reported (with its line number) and skipped, and the import goes
+on with the next line.  Undoing a line that contradicts what came before
+only replays the events since the Game's last snapshot (see Game.state_at),
+so it costs the same however long the game.
+
+Classes:
+    NameIndex       -- looks up the Players and Cards of a Game by name
+    TranscriptError -- a problem with a line of a transcript
+
+Functions:
+    parse_line        -- parse a line of a transcript into ClueEvents
+    import_transcript -- import a transcript into a Game
+    import_file       -- import a text or CSV transcript file into a Game
+"""
+
+from cluesolver.cluegame import ClueContradiction, ClueEvent, Game
+import collections
+import csv
+
+TranscriptError = collections.namedtuple('TranscriptError', 'line message')
+TranscriptError.__doc__ += ': A problem with a line of a transcript'
+TranscriptError.line.__doc__ = 'The line number (counting from 1)'
+TranscriptError.message.__doc__ = 'What the problem is'
+
+SETUP_KEYS = ("players", "persons", "weapons", "rooms")
+
+VERBS = {
+    "suggests": "suggest", "suggested": "suggest", "suggest": "suggest",
+    "has": "have", "had": "have", "have": "have",
+    "passes": "pass", "passed": "pass", "pass": "pass",
+    "shows": "show", "showed": "show", "show": "show",
+}
+
+NEGATIONS = [["does", "not", "have"], ["did", "not", "have"],
+             ["doesn't", "have"], ["didn't", "have"]]
+
+NOBODY = [["nobody"], ["no", "one"], ["noone"], ["none"]]
+
+
+def _words(text):
+    """Split text into lowercase words, at whitespace and commas."""
+    return text.replace(",", " ").lower().split()
+
+
+class NameIndex:
+    """Looks up the Players and Cards of a Game by (part of) their names.
+
+    Names are matched in any case.  Any word of a name that is not part of
+    any other name can stand for the whole name.
+
+    Public methods:
+        match     -- the longest name at a position in a list of words
+        match_all -- all the names in a list of words
+
+    Instance variables:
+        players -- a dict of name word tuples to Players
+        cards   -- a dict of name word tuples to Cards
+    """
+
+    def __init__(self, game):
+        self.players = {}
+        self.cards = {}
+        everything = [(o, self.players) for o in game.players] + \
+            [(o, self.cards) for o in game.cards]
+        word_count = collections.Counter(
+            w for o, _ in everything for w in set(_words(o.name)))
+        for o, names in everything:
+            words = _words(o.name)
+            names[tuple(words)] = o
+            for w in words:
+                if word_count[w] == 1:
+                    names.setdefault((w,), o)
+        self._longest = max(len(k) for k in
+                            list(self.players) + list(self.cards))
+
+    def match(self, words, start, names):
+        """Match the longest name at words[start:].
+
+        Arguments:
+            words -- a list of lowercase words
+            start -- the position to match at
+            names -- self.players or self.cards
+
+        Returns:
+            the matching Player or Card (or None), and the position after it
+        """
+        for end in range(min(len(words), start + self._longest), start, -1):
+            o = names.get(tuple(words[start:end]))
+            if o is not None:
+                return o, end
+        return None, start
+
+    def match_all(self, words, names):
+        """Match all of a list of words as a list of names.
+
+        Raises ValueError if some of the words do not name anything.
+        """
+        found = []
+        i = 0
+        while i < len(words):
+            o, i = self.match(words, i, names)
+            if o is None:
+                raise ValueError("Unknown {}: {!r}".format(
+                    "player" if names is self.players else "card", words[i]))
+            found.append(o)
+        return found
+
+
+def _parse_clause(clause, index):
+    """Parse "<player> <verb> [<cards>]" into (player, kind, cards).
+
+    The player is None for "nobody shows".
+    """
+    words = _words(clause)
+    for nobody in NOBODY:
+        if words[:len(nobody)] == nobody:
+            if words[len(nobody):] not in ([], ["shows"], ["showed"]):
+                raise ValueError("Expected 'nobody shows': {!r}".format(
+                    clause.strip()))
+            return None, "show", []
+
+    player, i = index.match(words, 0, index.players)
+    if player is None:
+        raise ValueError("Unknown player in {!r}".format(clause.strip()))
+    if i == len(words):
+        raise ValueError("Expected a verb after {!r}".format(player.name))
+    kind = VERBS.get(words[i])
+    if kind:
+        i += 1
+    else:
+        for negation in NEGATIONS:
+            if words[i:i + len(negation)] == negation:
+                kind = "pass"
+                i += len(negation)
+                break
+        else:
+            raise ValueError("Unknown verb {!r}".format(words[i]))
+    if kind == "show":
+        for filler in [["one", "of"], ["a", "card"]]:
+            if words[i:i + len(filler)] == filler:
+                i += len(filler)
+    return player, kind, index.match_all(words[i:], index.cards)
+
+
+def parse_line(line, index, seating):
+    """Parse a line of a transcript (see module docstring) into ClueEvents.
+
+    Arguments:
+        line    -- the line, less any comment
+        index   -- a NameIndex for the Game
+        seating -- the Player names in seating order (see Game.seating)
+
+    Returns:
+        a list of ClueEvents, naming Players and Cards by the objects
+
+    Raises ValueError if the line cannot be understood.
+    """
+    clauses = [c for c in line.split(";") if c.strip()]
+    first = _parse_clause(clauses[0], index)
+    if first[1] == "suggest":
+        return [_parse_suggestion(first, clauses[1:], index, seating)]
+
+    events = []
+    for clause in clauses:
+        player, kind, cards = _parse_clause(clause, index)
+        if player is None:
+            raise ValueError("'Nobody shows' must follow a suggestion")
+        if kind == "suggest":
+            raise ValueError("A suggestion must start a line of its own")
+        if not cards:
+            raise ValueError("Expected cards after {!r}".format(
+                clause.strip()))
+        if kind == "show" and len(cards) > 1:
+            events.append(ClueEvent("show", player, cards))
+        else:
+            kind = "have" if kind == "show" else kind
+            events.extend(ClueEvent(kind, player, [c]) for c in cards)
+    return events
+
+
+def _parse_suggestion(first, clauses, index, seating):
+    """Parse a suggestion, and what came of it, into a ClueEvent."""
+    suggester, _, cards = first
+    if len(cards) != 3:
+        raise ValueError("A suggestion needs 3 cards, not {}".format(
+            len(cards)))
+    shower = shown = None
+    passers = []
+    for clause in clauses:
+        player, kind, shown_cards = _parse_clause(clause, index)
+        if kind == "pass" and player is not None and not shown_cards:
+            passers.append(player.name)
+        elif kind == "show" and player is None:
+            pass
+        elif kind == "show" and shower is None and len(shown_cards) <= 1:
+            shower = player
+            shown = shown_cards[0] if shown_cards else None
+        else:
+            raise ValueError("Expected 'X passes' or 'X shows [card]' "
+                             "after a suggestion: {!r}".format(clause.strip()))
+
+    # Everyone after the suggester passes, up to the shower (if any).
+    i = seating.index(suggester.name)
+    expected = []
+    for name in seating[i + 1:] + seating[:i]:
+        if shower is not None and name == shower.name:
+            break
+        expected.append(name)
+    unexpected = [p for p in passers if p not in expected]
+    if unexpected:
+        raise ValueError("{} cannot have passed, going by the seating order "
+                         "{}".format(", ".join(unexpected),
+                                     ", ".join(seating)))
+    return ClueEvent("suggest", suggester, cards, shower, shown)
+
+
+def _setup_game(setup, line_number):
+    """Create a Game from the setup lines read so far."""
+    missing = [k for k in SETUP_KEYS if k not in setup]
+    if missing:
+        raise ValueError("line {}: no {} given before the first event".format(
+            line_number, ", ".join(missing)))
+    try:
+        return Game(setup["persons"], setup["weapons"], setup["rooms"],
+                    setup["players"])
+    except ValueError as e:
+        raise ValueError("line {}: {}".format(line_number, e))
+
+
+def _parse_setup(key, value):
+    """Parse the value of a setup line."""
+    names = [n.strip() for n in value.split(",") if n.strip()]
+    if key != "players":
+        return names
+    players = []
+    for p in names:
+        name, _, hand_size = p.rpartition(" ")
+        if not name or not hand_size.isdigit():
+            raise ValueError("Expected 'name hand_size': {!r}".format(p))
+        players.append((name.strip(), int(hand_size)))
+    return players
+
+
+def _feed(game, pending, errors):
+    """Record a batch of (line number, event) in game, noting any errors.
+
+    The events are recorded in a single batch.  Only if the batch as a whole
+    turns out to be a contradiction (and so is undone) are they recorded
+    again one at a time, to find out which of them are to blame.
+    """
+    batch_errors = []
+    try:
+        with game.batch():
+            for number, event in pending:
+                try:
+                    game.record_event(event)
+                except ValueError as e:
+                    batch_errors.append(TranscriptError(number, str(e)))
+    except ClueContradiction:
+        for number, event in pending:
+            try:
+                game.record_event(event)
+            except ValueError as e:
+                errors.append(TranscriptError(number, str(e)))
+    else:
+        errors.extend(batch_errors)
+
+
+def import_transcript(lines, game=None, batch_size=64):
+    """Import a transcript (see module docstring) into a Game.
+
+    Lines that cannot be understood, or contradict the lines before them,
+    are skipped, and reported in the list of errors.
+
+    Arguments:
+        lines      -- an iterable of lines, read lazily
+        game       -- the Game to import into; or None to create one, from
+                      the setup lines at the start of the transcript
+        batch_size -- how many events to record in each batch
+
+    Returns:
+        the Game, and a list of TranscriptErrors in order of line number
+
+    Raises ValueError if there is no Game to import into, and the setup lines
+    are missing or invalid.
+    """
+    setup = {}
+    index = None if game is None else NameIndex(game)
+    errors = []
+    pending = []
+    line_number = 0
+    for line_number, line in enumerate(lines, start=1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        if index is None:
+            key, sep, value = line.partition(":")
+            key = key.strip().lower()
+            if sep and key in SETUP_KEYS:
+                try:
+                    setup[key] = _parse_setup(key, value)
+                except ValueError as e:
+                    raise ValueError("line {}: {}".format(line_number, e))
+                continue
+            game = _setup_game(setup, line_number)
+            index = NameIndex(game)
+        try:
+            events = parse_line(line, index, game.seating)
+        except ValueError as e:
+            errors.append(TranscriptError(line_number, str(e)))
+            continue
+        pending.extend((line_number, e) for e in events)
+        if len(pending) >= batch_size:
+            _feed(game, pending, errors)
+            pending = []
+    if game is None:
+        game = _setup_game(setup, line_number)
+    _feed(game, pending, errors)
+    errors.sort()
+    return game, errors
+
+
+def _csv_lines(f):
+    """Join the cells of each CSV row into one line of clauses."""
+    for row in csv.reader(f):
+        yield "; ".join(cell for cell in row if cell.strip())
+
+
+def import_file(path, game=None, batch_size=64):
+    """Import a transcript file into a Game (see import_transcript).
+
+    Files ending in ".csv" are read as CSV; anything else as plain text.
+    """
+    with open(path, newline="") as f:
+        lines = _csv_lines(f) if path.endswith(".csv") else f
+        return import_transcript(lines, game, batch_size)
@@ -0,0 +1,105 @@
+"""viewmodel.py -- A compact, display-ready summary of a Game's knowledge
+
+Game.relations is a complete record, but it is a poor thing to show a person:
+it grows to hundreds of entries over a game.  This module condenses it into
+the familiar Clue "detective notes" grid, with one row per card and one column
+per player, built in a single pass over the relations.
+
+A GameGrid only depends on the Game state it was built from, so it can be
+cached under the Game's (game_id, version).
+
+Classes:
+    GameGrid -- a card x player status grid for a Game
+
+Functions:
+    describe_event -- a one-line, human-readable description of a ClueEvent
+
+Constants:
+    HAVE, PASS, SHOW, UNKNOWN -- the possible status of a grid cell
+"""
+
+from cluesolver.cluegame import ClueCardType, ClueRelationType
+
+HAVE = "have"
+PASS = "pass"
+SHOW = "show"
+UNKNOWN = ""
+
+
+class GameGrid:
+    """A card x player grid of what is known about each card's location.
+
+    Each cell holds HAVE or PASS if that is known, otherwise SHOW if the card
+    is part of an open SHOW for that player (a SHOW for which we don't yet
+    know which card the player has), otherwise UNKNOWN.
+
+    Public methods:
+        status -- look up the status for a player name and card name
+        rows   -- the grid rows, for rendering
+
+    Instance variables:
+        game_id           -- the game_id of the Game this grid describes
+        version           -- the version of the Game this grid describes
+        players           -- a list of player names, in seating (column) order
+        cards             -- a list of Cards, in row order
+        open_shows        -- a list of (player name, card names) pairs
+        resolved_shows    -- the same, for SHOWs that are resolved
+        cards_in_the_file -- a set of the Cards known to be in the file
+    """
+
+    def __init__(self, game):
+        """Build the grid from the current state of game."""
+        self.game_id = game.game_id
+        self.version = game.version
+        self.players = list(game.seating)
+        type_order = list(ClueCardType)
+        self.cards = sorted(
+            game.cards, key=lambda c: (type_order.index(c.card_type), c.name))
+
+        self._cells = {}
+        shows = []
+        for r in game.relations:
+            if r.rel_type == ClueRelationType.HAVE:
+                self._cells[(r.player.name, r.cards[0].name)] = HAVE
+            elif r.rel_type == ClueRelationType.PASS:
+                self._cells[(r.player.name, r.cards[0].name)] = PASS
+            else:
+                shows.append(r)
+
+        self.open_shows = []
+        for s in shows:
+            card_names = [c.name for c in s.cards]
+            self.open_shows.append((s.player.name, card_names))
+            for c in card_names:
+                self._cells.setdefault((s.player.name, c), SHOW)
+        self.resolved_shows = [(s.player.name, [c.name for c in s.cards])
+                               for s in game.resolved_shows]
+
+        self.cards_in_the_file = {
+            c for c in self.cards
+            if all(self._cells.get((p, c.name)) == PASS
+                   for p in self.players)}
+
+    def status(self, player_name, card_name):
+        """Return the status of the cell for player_name and card_name."""
+        return self._cells.get((player_name, card_name), UNKNOWN)
+
+    def rows(self):
+        """Return a list of (Card, statuses by player, in the file) tuples."""
+        return [(c,
+                 [self.status(p, c.name) for p in self.players],
+                 c in self.cards_in_the_file)
+                for c in self.cards]
+
+
+def describe_event(event):
+    """Return a one-line, human-readable description of a ClueEvent."""
+    cards = ", ".join(event.cards)
+    if event.kind != "suggest":
+        verb = {"have": "has", "pass": "does not have",
+                "show": "has one of"}[event.kind]
+        return "{} {} {}".format(event.player, verb, cards)
+    if event.shower is None:
+        return "{} suggests {}; nobody shows".format(event.player, cards)
+    return "{} suggests {}; {} shows {}".format(
+        event.player, cards, event.shower, event.shown or "a card")
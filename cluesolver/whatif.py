@@ -0,0 +1,78 @@
+"""whatif.py -- Work out what hypothetical events would let us deduce
+
+At the table, it helps to know in advance what an event would tell us: "if
+Cynthia shows me one of these three, what would I learn?"  This module
+records each of a number of hypothetical sets of events in its own fork of
+the Game (see Game.fork), which leaves the Game itself untouched, and reports
+only what each set of events would add to what is already known.
+
+Forks are cheap, as they share the Game's state until they record an event,
+and even then share all the relations already known.  The hypotheses can be
+evaluated concurrently, in a concurrent.futures executor.
+
+Classes:
+    Outcome -- what a hypothetical set of events would add to a Game
+
+Functions:
+    what_if -- work out the Outcomes of hypothetical sets of events
+"""
+
+from cluesolver.cluegame import ClueContradiction, ClueRelationType
+import collections
+
+Outcome = collections.namedtuple(
+    'Outcome', 'events haves passes cards_in_the_file contradiction')
+Outcome.__doc__ += ': What a hypothetical set of events would add to a Game'
+Outcome.events.__doc__ = 'The list of hypothetical ClueEvents'
+Outcome.haves.__doc__ = \
+    'A sorted list of the new (player name, card name) HAVEs'
+Outcome.passes.__doc__ = \
+    'A sorted list of the new (player name, card name) PASSes'
+Outcome.cards_in_the_file.__doc__ = \
+    'A sorted list of the names of the cards newly known to be in the file'
+Outcome.contradiction.__doc__ = \
+    'None, or the message of the ClueContradiction the events would raise'
+
+
+def _known(game):
+    """Return the sets of known HAVEs, PASSes and cards in the file."""
+    known = {ClueRelationType.HAVE: set(), ClueRelationType.PASS: set()}
+    for r in game.relations:
+        if r.rel_type in known:
+            known[r.rel_type].add((r.player.name, r.cards[0].name))
+    return (known[ClueRelationType.HAVE], known[ClueRelationType.PASS],
+            {c.name for c in game.cards_in_the_file})
+
+
+def _evaluate(fork, events, before):
+    """Record events in a fork, and return the Outcome."""
+    try:
+        with fork.batch():
+            for e in events:
+                fork.record_event(e)
+    except ClueContradiction as e:
+        return Outcome(events, [], [], [], str(e))
+    after = _known(fork)
+    return Outcome(events, *(sorted(a - b) for a, b in zip(after, before)),
+                   None)
+
+
+def what_if(game, hypotheses, executor=None):
+    """Work out what each of a number of sets of events would add to a Game.
+
+    The Game itself is left as it was.
+
+    Arguments:
+        game       -- the Game
+        hypotheses -- a list of lists of ClueEvents, to be recorded together
+        executor   -- a concurrent.futures executor to evaluate the hypotheses
+                      in, or None to evaluate them one after the other
+
+    Returns:
+        a list of Outcomes, one for each list of events, in the same order
+    """
+    before = _known(game)
+    args = [(game.fork(), list(events), before) for events in hypotheses]
+    if executor is None:
+        return [_evaluate(*a) for a in args]
+    return list(executor.map(_evaluate, *zip(*args))) if args else []
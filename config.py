@@ -3,7 +3,20 @@ import os
 
 class Config(object):
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'you-will-never-guess'
+    GAMES_DIRECTORY = os.environ.get('CLUE_GAMES_DIRECTORY') or 'games'
+    # Where earlier versions kept their one game; it is imported into
+    # GAMES_DIRECTORY on startup (see app/routes.py).
     PICKLE_FILEPATH = os.environ.get('CLUE_PICKLE_FILEPATH') or 'game.pickledb'
+    GAME_POOL_SIZE = 128
+    GAME_IDLE_SECONDS = 900.0
+    GAME_POOL_MAX_BYTES = 64 * 1024 * 1024
+    VIEW_CACHE_SIZE = 64
+    ANALYSIS_SECONDS = 0.25
+    ANALYSIS_BACKGROUND_SECONDS = 60.0
+    ANALYSIS_WORKERS = 2
+    TRACE_FILE = os.environ.get('CLUE_TRACE_FILE')
+    TRACE_MAX_BYTES = 16 * 1024 * 1024
+    TRACE_BACKUP_COUNT = 5
     CLUE_CARDS_PERSONS = \
         [
             "Colonel Mustard",
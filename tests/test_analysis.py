@@ -0,0 +1,107 @@
+from app.viewcache import ViewCache
+from cluesolver import analysis, gamelog
+import concurrent.futures
+import copy
+import threading
+import time
+
+
+SETUP = {"persons": ["Plum", "White"], "weapons": ["Rope", "Knife"],
+         "rooms": ["Hall", "Study"],
+         "players": [["Adam", 2], ["Greg", 1]]}
+
+
+def test_analyze_within_deadline():
+    game = gamelog.new_game(SETUP)
+    game.record_show("Adam", ["Plum", "Rope"])
+
+    result = analysis.analyze(game, time.monotonic() - 1)
+    assert result.level == analysis.FACTS
+    assert result.probabilities is None
+
+    result = analysis.analyze(game, previous=result)
+    assert result.level == analysis.EXACT
+    assert result.probabilities.deals > 0
+
+
+def test_runner_refines_in_background():
+    game = gamelog.new_game(SETUP)
+    cache = ViewCache()
+    with concurrent.futures.ThreadPoolExecutor(1) as executor:
+        runner = analysis.AnalysisRunner(cache, executor)
+        result = runner.analyze(game, 0.0)
+        assert result.grid.version == game.version
+    assert runner.cached(game).level == analysis.EXACT
+    assert runner.analyze(game, 0.0).level == analysis.EXACT
+
+
+def test_precompute_cancels_superseded_versions():
+    game = gamelog.new_game(SETUP)
+    runner = analysis.AnalysisRunner(ViewCache())
+    release = threading.Event()
+    runner.precompute(_BlockingGame(release))  # keeps the worker busy
+
+    first = copy.deepcopy(game)
+    runner.precompute(first)
+    game.record_have("Greg", "Hall")
+    runner.precompute(game)
+    release.set()
+
+    assert runner.analyze(game, 5.0).level == analysis.EXACT
+    assert runner.cached(first) is None
+
+
+def test_waiting_for_precompute_leaves_time_to_analyze():
+    game = gamelog.new_game(SETUP)
+    runner = analysis.AnalysisRunner(ViewCache())
+    release = threading.Event()
+    runner.precompute(_BlockingGame(release))  # keeps the worker busy
+    runner.precompute(game)
+
+    result = runner.analyze(game, 0.2)
+    release.set()
+    assert result.level != analysis.FACTS
+
+
+def test_precompute_is_not_held_up_by_other_games():
+    game = gamelog.new_game(SETUP)
+    runner = analysis.AnalysisRunner(ViewCache(), speculative_workers=2)
+    release = threading.Event()
+    runner.precompute(_BlockingGame(release))  # keeps a worker busy
+    runner.precompute(game)
+
+    deadline = time.monotonic() + 5.0
+    while runner.cached(game) is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    assert runner.cached(game) is not None
+
+
+class _BlockingGame:
+    """Just enough of a Game to block analysis until released."""
+    game_id = "blocking"
+    version = 0
+
+    def __init__(self, release):
+        self.release = release
+
+    def __getattr__(self, name):
+        self.release.wait()
+        raise AttributeError("Not really a Game: no {}".format(name))
+
+
+def test_refinement_analyzes_the_state_it_was_asked_for():
+    game = gamelog.new_game(SETUP)
+    release = threading.Event()
+    with concurrent.futures.ThreadPoolExecutor(1) as executor:
+        executor.submit(release.wait)  # keeps the worker busy
+        runner = analysis.AnalysisRunner(ViewCache(), executor)
+        version = game.version
+        runner.analyze(game, 0.0)
+        game.record_have("Greg", "Hall")
+        release.set()
+
+    result = runner.cache.get((game.game_id, version))
+    assert result.level == analysis.EXACT
+    assert result.version == version
+    assert result.grid.status("Greg", "Hall") == ""
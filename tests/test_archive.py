@@ -0,0 +1,115 @@
+from cluesolver.archive import Archive, ArchiveWriter, KINDS
+from cluesolver.cli import main
+from cluesolver.cluegame import ClueEvent, Game
+from cluesolver import fuzz, gamelog
+import io
+import random
+import pytest
+
+
+@pytest.fixture
+def clue_game():
+    game = Game(
+            [
+                "Colonel Mustard",
+                "Miss Scarlet",
+                "Professor Plum"
+            ],
+            [
+                "Rope",
+                "Lead Pipe",
+                "Revolver"
+            ],
+            [
+                "Billiard Room",
+                "Ballroom",
+                "Lounge"
+            ],
+            [
+                ('Adam', 3),
+                ('Cynthia', 3)
+            ]
+        )
+    for c in ['Colonel Mustard', 'Rope', 'Ballroom']:
+        game.record_have('Adam', c)
+    game.record_suggestion('Adam', ['Miss Scarlet', 'Lead Pipe', 'Lounge'],
+                           'Cynthia', 'Lead Pipe')
+    game.record_pass('Cynthia', 'Miss Scarlet')
+    return game
+
+
+def test_round_trip(clue_game, tmp_path):
+    rng = random.Random(0)
+    setup = fuzz.random_setup(rng)
+    logs = [fuzz.random_events(setup, fuzz.random_deal(setup, rng), rng, 12)
+            for _ in range(20)]
+    path = str(tmp_path / "archive")
+
+    with ArchiveWriter(path, flush_events=50) as writer:
+        writer.add(clue_game)
+        for events in logs:
+            writer.add_log(setup, events)
+
+    archive = Archive(path)
+    assert len(archive) == 21
+    assert len(archive.setups) == 2
+    assert archive.events_of(0) == clue_game.events
+    for i, events in enumerate(logs, start=1):
+        assert archive.events_of(i) == events
+        assert archive.setup_of(i) == setup
+
+    game = archive.replay(archive.find(clue_game.game_id))
+    assert game.game_id == clue_game.game_id
+    assert game.cards_in_the_file == clue_game.cards_in_the_file
+
+
+def test_append_and_select(clue_game, tmp_path):
+    path = str(tmp_path / "archive")
+    with ArchiveWriter(path) as writer:
+        writer.add(clue_game)
+    with ArchiveWriter(path) as writer:
+        writer.add_log(gamelog.game_setup(clue_game),
+                       [ClueEvent('pass', 'Adam', ['Lounge'])])
+
+    archive = Archive(path)
+    assert len(archive) == 2
+    assert len(archive.setups) == 1
+    assert list(archive.select(archive.kind == KINDS.index('suggest'))) == [0]
+    assert list(archive.select(archive.kind == KINDS.index('pass'))) == [0, 1]
+    assert [len(g.events) for g in archive.games([1])] == [1]
+    with pytest.raises(KeyError):
+        archive.find("0" * 32)
+
+
+def test_invalid_event(clue_game, tmp_path):
+    path = str(tmp_path / "archive")
+    with ArchiveWriter(path) as writer:
+        with pytest.raises(ValueError):
+            writer.add_log(gamelog.game_setup(clue_game),
+                           [ClueEvent('pass', 'Nobody', ['Lounge'])])
+        writer.add(clue_game)
+
+    assert len(Archive(path)) == 1
+
+
+def test_empty_archive(tmp_path):
+    path = str(tmp_path / "archive")
+    ArchiveWriter(path).close()
+
+    archive = Archive(path)
+    assert len(archive) == 0
+    assert list(archive.games()) == []
+
+
+def test_cli_archive(clue_game, tmp_path):
+    games = tmp_path / "games"
+    games.mkdir()
+    with open(games / "one.jsonl", "w") as f:
+        gamelog.write_log(clue_game, f)
+    clue_game.save(str(games / "two.pickledb"))
+    out = io.StringIO()
+
+    assert main(["archive", str(games), str(tmp_path / "archive")], out) == 0
+    archive = Archive(str(tmp_path / "archive"))
+    assert len(archive) == 2
+    assert archive.events_of(1) == clue_game.events
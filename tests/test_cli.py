@@ -0,0 +1,81 @@
+from cluesolver.cluegame import Game
+from cluesolver import gamelog
+from cluesolver.cli import main
+import io
+import pytest
+
+
+@pytest.fixture
+def game_log(tmp_path):
+    game = Game(
+            [
+                "Colonel Mustard",
+                "Miss Scarlet",
+                "Professor Plum"
+            ],
+            [
+                "Rope",
+                "Lead Pipe",
+                "Revolver"
+            ],
+            [
+                "Billiard Room",
+                "Ballroom",
+                "Lounge"
+            ],
+            [
+                ('Adam', 3),
+                ('Cynthia', 3)
+            ]
+        )
+    for c in ['Colonel Mustard', 'Rope', 'Ballroom']:
+        game.record_have('Adam', c)
+    game.record_show('Cynthia', ['Miss Scarlet', 'Lead Pipe', 'Lounge'])
+    game.record_pass('Cynthia', 'Miss Scarlet')
+
+    path = tmp_path / "game.jsonl"
+    with open(path, "w") as f:
+        gamelog.write_log(game, f)
+    return str(path)
+
+
+def test_replay(game_log, tmp_path):
+    out = io.StringIO()
+    saved = str(tmp_path / "game.pickledb")
+
+    assert main(["replay", game_log, "--save", saved], out) == 0
+    lines = out.getvalue().splitlines()
+    assert lines[0] == "1: Adam have Colonel Mustard"
+    assert "    => Cynthia pass Colonel Mustard" in lines
+    assert len(Game.load(saved).events) == 5
+
+
+def test_solve(game_log):
+    out = io.StringIO()
+
+    assert main(["solve", game_log], out) == 1
+    assert out.getvalue().splitlines() == ["Person: Miss Scarlet",
+                                           "Weapon: ?",
+                                           "Room: ?"]
+
+
+def test_status_from_stdin(game_log, monkeypatch):
+    out = io.StringIO()
+    monkeypatch.setattr("sys.stdin", open(game_log))
+
+    assert main(["status"], out) == 0
+    rows = {line[:15].strip(): line[15:].split()
+            for line in out.getvalue().splitlines()[1:]}
+    assert rows["Miss Scarlet"] == ["-", "-", "X"]
+    assert rows["Lounge"] == ["-", "?"]
+    assert rows["Rope"] == ["X", "-"]
+
+
+def test_missing_file(tmp_path, capsys):
+    with pytest.raises(SystemExit) as e:
+        main(["solve", str(tmp_path / "missing.jsonl")], io.StringIO())
+
+    assert e.value.code == 2
+    err = capsys.readouterr().err
+    assert err.startswith("cluesolver: error: ")
+    assert "missing.jsonl" in err
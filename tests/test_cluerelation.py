@@ -1,6 +1,6 @@
 import pytest
-from app.cluegame import (ClueCardType, ClueRelationType, Card, Player,
-                          ClueRelation)
+from cluesolver.cluegame import (ClueCardType, ClueRelationType, Card,
+                                 Player, ClueRelation)
 
 
 @pytest.fixture
@@ -1,5 +1,6 @@
-from app.cluegame import (ClueCardType, Card, Player, ClueRelationFilter,
-                          ClueRelationType, ClueRelation)
+from cluesolver.cluegame import (ClueCardType, Card, Player,
+                                 ClueRelationFilter, ClueRelationType,
+                                 ClueRelation)
 import pytest
 
 
@@ -200,3 +201,80 @@ def test_operator_syntax(clue_card_set, get_obj, four_players,
 
     assert len(filter5.get(haves)) == 1
     assert len(filter5.get(shows)) == 2
+
+
+def test_early_exit_operations(clue_card_set, get_obj, four_players,
+                               four_haves_passes, three_shows):
+
+    players = four_players
+    cards = clue_card_set
+    haves = four_haves_passes
+    shows = three_shows
+
+    filter1 = ClueRelationFilter(get_obj(players, "Cynthia"))
+
+    assert list(filter1.iter(haves)) == filter1.get(haves)
+    assert filter1.count(haves) == 3
+    assert filter1.count(shows) == 1
+    assert filter1.exists(haves)
+    assert filter1.first(haves) == haves[0]
+
+    filter2 = filter1 + ClueRelationFilter(get_obj(cards, "Mrs. White"))
+
+    assert filter2.count(haves) == 0
+    assert not filter2.exists(haves)
+    assert filter2.first(haves) is None
+    assert filter2.first(haves, default=shows[0]) == shows[0]
+
+
+def test_iter_stops_early(get_obj, four_players, four_haves_passes):
+
+    players = four_players
+    haves = four_haves_passes
+    scanned = []
+
+    def scan():
+        for h in haves:
+            scanned.append(h)
+            yield h
+
+    filter1 = ClueRelationFilter(get_obj(players, "Cynthia"))
+
+    assert filter1.exists(scan())
+    assert len(scanned) == 1
+
+
+def test_filters_are_interned(clue_card_set, get_obj, four_players):
+
+    players = four_players
+    cards = clue_card_set
+
+    def build():
+        return (ClueRelationFilter(get_obj(players, "Cynthia")) +
+                ClueRelationFilter(get_obj(cards, "Rope"))) / \
+            -ClueRelationFilter(ClueRelationType.SHOW)
+
+    filter1 = build()
+    filter2 = build()
+
+    assert filter1 is filter2
+    assert filter1 == filter2
+    assert hash(filter1) == hash(filter2)
+    assert filter1.left is filter2.left
+
+    cache = {filter1: "cached"}
+    assert cache[build()] == "cached"
+
+    assert filter1 != build() + ClueRelationFilter(ClueRelationType.HAVE)
+    assert ClueRelationFilter(ClueRelationType.HAVE) != \
+        ClueRelationFilter(ClueRelationType.PASS)
+
+
+def test_filters_are_immutable(get_obj, four_players):
+
+    filter1 = ClueRelationFilter(get_obj(four_players, "Cynthia"))
+
+    with pytest.raises(AttributeError):
+        filter1.statement = "and"
+    with pytest.raises(AttributeError):
+        filter1.extra = None
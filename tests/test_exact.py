@@ -0,0 +1,35 @@
+from cluesolver import fuzz, gamelog
+from cluesolver.exact import exact_probabilities
+import pytest
+import random
+import time
+
+
+def test_exact_probabilities_match_brute_force():
+    rng = random.Random(1)
+    for _ in range(50):
+        setup = fuzz.random_setup(rng)
+        deal = fuzz.random_deal(setup, rng)
+        events = fuzz.random_events(setup, deal, rng, rng.randint(0, 8))
+        game = gamelog.replay(setup, events)
+        deals = fuzz.consistent_deals(setup, events)
+
+        probs = exact_probabilities(game)
+
+        assert probs.deals == len(deals)
+        for p in probs.players:
+            for c in probs.cards:
+                held = sum(c.name in d[p.name] for d in deals)
+                assert probs.probability(p, c) == \
+                    pytest.approx(held / len(deals))
+        for c in probs.cards:
+            filed = sum(c.name in d[None] for d in deals)
+            assert probs.in_the_file(c) == pytest.approx(filed / len(deals))
+
+
+def test_exact_probabilities_deadline():
+    setup = fuzz.random_setup(random.Random(2))
+    game = gamelog.new_game(setup)
+
+    with pytest.raises(TimeoutError):
+        exact_probabilities(game, time.monotonic() - 1)
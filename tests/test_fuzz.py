@@ -0,0 +1,59 @@
+from cluesolver.cluegame import ClueEvent, Game
+from cluesolver import fuzz
+import random
+
+
+def test_oracle_enumerates_consistent_deals():
+    setup = {"persons": ["P0", "P1"], "weapons": ["W0"], "rooms": ["R0"],
+             "players": [["A", 1], ["B", 0]]}
+
+    assert len(fuzz.consistent_deals(setup, [])) == 2
+    deals = fuzz.consistent_deals(setup, [ClueEvent("pass", "A", ["P0"])])
+    assert deals == [{"A": frozenset(["P1"]), "B": frozenset(),
+                      None: frozenset(["P0", "W0", "R0"])}]
+
+
+def test_random_events_are_truthful():
+    rng = random.Random(0)
+    for _ in range(50):
+        setup = fuzz.random_setup(rng)
+        deal = fuzz.random_deal(setup, rng)
+        events = fuzz.random_events(setup, deal, rng, 10)
+        assert deal in fuzz.consistent_deals(setup, events)
+
+
+def test_engine_is_sound():
+    trials, failures = fuzz.fuzz(seconds=60, jobs=1, seed=12345,
+                                 max_trials=200)
+
+    assert trials == 200
+    assert failures == []
+
+
+def test_check_detects_unsound_conclusions(monkeypatch):
+    setup = {"persons": ["P0", "P1"], "weapons": ["W0"], "rooms": ["R0"],
+             "players": [["A", 1], ["B", 0]]}
+    monkeypatch.setattr(Game, "cards_in_the_file",
+                        property(lambda self: set(self.cards)))
+
+    problems = fuzz.check(setup, [])
+
+    assert sorted(problems) == ["unsound card in the file P0",
+                                "unsound card in the file P1"]
+
+
+def test_shrink_finds_minimal_sequence():
+    events = list(range(20))
+
+    def still_fails(es):
+        return 3 in es and 17 in es
+
+    assert fuzz.shrink(events, still_fails) == [3, 17]
+
+
+def test_shrink_repeats_until_1_minimal():
+    # Removing 1 makes 0 removable, though it was not before.
+    def still_fails(es):
+        return es in ([0, 1, 2], [0, 2], [2])
+
+    assert fuzz.shrink([0, 1, 2], still_fails) == [2]
@@ -1,4 +1,7 @@
-from app.cluegame import ClueRelationType, Game
+from cluesolver.cluegame import (ClueContradiction, ClueEvent,
+                                 ClueRelationType, Game, deduction_rules,
+                                 rule_stats)
+import pickle
 import pytest
 
 
@@ -312,3 +315,390 @@ def test_simple_game(clue_game):
     assert {"player": "Adam", "card": "Ballroom"} in unhaving_cards_dicts
     having_cards_dicts = []
     unhaving_cards_dicts = []
+
+
+def test_suggestion_round():
+    game = Game(
+            [
+                "Colonel Mustard",
+                "Miss Scarlet"
+            ],
+            [
+                "Rope",
+                "Lead Pipe"
+            ],
+            [
+                "Billiard Room",
+                "Ballroom"
+            ],
+            [
+                ('Adam', 1),
+                ('Cynthia', 1),
+                ('Greg', 1)
+            ]
+        )
+
+    assert game.seating == ['Adam', 'Cynthia', 'Greg']
+
+    game.record_suggestion('Greg', ['Colonel Mustard', 'Rope', 'Ballroom'],
+                           shower='Cynthia')
+
+    assert len(game.events) == 1
+    assert game.events[0].kind == 'suggest'
+    assert game.events[0].shower == 'Cynthia'
+    passes = [(r.player.name, r.cards[0].name) for r in game.relations
+              if r.rel_type == ClueRelationType.PASS]
+    assert ('Adam', 'Rope') in passes
+    assert ('Cynthia', 'Rope') not in passes
+    assert [r.player.name for r in game.relations
+            if r.rel_type == ClueRelationType.SHOW] == ['Cynthia']
+
+    game.record_suggestion('Adam', ['Miss Scarlet', 'Lead Pipe', 'Ballroom'],
+                           shower='Greg', shown='Ballroom')
+
+    haves = [(r.player.name, r.cards[0].name) for r in game.relations
+             if r.rel_type == ClueRelationType.HAVE]
+    assert ('Greg', 'Ballroom') in haves
+    assert ('Cynthia', 'Miss Scarlet') in [
+        (r.player.name, r.cards[0].name) for r in game.relations
+        if r.rel_type == ClueRelationType.PASS]
+
+    with pytest.raises(ValueError):
+        game.record_suggestion('Adam', ['Miss Scarlet', 'Rope', 'Hall'])
+    with pytest.raises(ValueError):
+        game.record_suggestion('Adam', ['Miss Scarlet', 'Rope', 'Ballroom'],
+                               shower='Adam')
+    assert len(game.events) == 2
+
+
+def test_batch_defers_deductions(clue_game):
+    game = clue_game
+
+    with game.batch():
+        for c in ['Colonel Mustard', 'Miss Scarlet', 'Billiard Room',
+                  'Mr. Green']:
+            game.record_have('David', c)
+        assert not [r for r in game.relations
+                    if r.rel_type == ClueRelationType.PASS]
+
+    unbatched = Game(
+        [c.name for c in game.cards if c.card_type.value == "Person"],
+        [c.name for c in game.cards if c.card_type.value == "Weapon"],
+        [c.name for c in game.cards if c.card_type.value == "Room"],
+        [tuple(p) for p in game.players])
+    for e in game.events:
+        unbatched.record_event(e)
+
+    assert sorted(map(repr, game.relations)) == \
+        sorted(map(repr, unbatched.relations))
+
+
+def test_resolved_shows_are_retired(clue_game):
+    game = clue_game
+
+    game.record_show('Greg', ['Colonel Mustard', 'Rope', 'Ballroom'])
+    game.record_show('Greg', ['Miss Scarlet', 'Knife', 'Ballroom'])
+    game.record_show('Adam', ['Colonel Mustard', 'Rope', 'Ballroom'])
+
+    assert len(game.relations) == 3
+    assert game.resolved_shows == []
+
+    game.record_pass('Greg', 'Colonel Mustard')
+    game.record_pass('Greg', 'Rope')
+
+    shows = [r for r in game.relations
+             if r.rel_type == ClueRelationType.SHOW]
+    assert [s.player.name for s in shows] == ['Adam']
+    assert sorted(s.player.name for s in game.resolved_shows) == \
+        ['Greg', 'Greg']
+    assert {"Greg"} == {r.player.name for r in game.relations
+                        if r.rel_type == ClueRelationType.HAVE}
+
+    game.record_show('Greg', ['Professor Plum', 'Knife', 'Ballroom'])
+
+    assert len(game.resolved_shows) == 3
+    assert [s.player.name for s in game.relations
+            if s.rel_type == ClueRelationType.SHOW] == ['Adam']
+
+
+def test_show_watches_follow_passes(clue_game):
+    game = clue_game
+
+    game.record_show('Greg', ['Colonel Mustard', 'Rope', 'Ballroom'])
+    game.record_show('Greg', ['Miss Scarlet', 'Knife', 'Study'])
+
+    def greg_haves():
+        return {r.cards[0].name for r in game.relations
+                if r.rel_type == ClueRelationType.HAVE and
+                r.player.name == 'Greg'}
+
+    for c in ['Ballroom', 'Knife', 'Lounge', 'Colonel Mustard']:
+        game.record_pass('Greg', c)
+        if c != 'Colonel Mustard':
+            assert greg_haves() == set()
+
+    assert greg_haves() == {'Rope'}
+
+    game.record_pass('Greg', 'Study')
+
+    assert greg_haves() == {'Rope', 'Miss Scarlet'}
+    assert not [r for r in game.relations
+                if r.rel_type == ClueRelationType.SHOW]
+
+
+def test_contradiction_leaves_game_unchanged(clue_game):
+    game = clue_game
+
+    game.record_show('Greg', ['Colonel Mustard', 'Rope', 'Ballroom'])
+    game.record_pass('Greg', 'Colonel Mustard')
+    game.record_pass('Greg', 'Rope')
+    game.record_pass('Adam', 'Study')
+    relations = list(game.relations)
+    version = game.version
+
+    with pytest.raises(ClueContradiction) as excinfo:
+        game.record_pass('Greg', 'Ballroom')
+    assert excinfo.value.event == ClueEvent("pass", 'Greg', ['Ballroom'])
+    assert game.relations == relations
+    assert game.version == version
+    assert len(game.events) == 4
+
+    # The offending events can be found and taken back.
+    culprits = game.conflicting_events(excinfo.value.event)
+    assert culprits == game.events[:3]
+    game.retract_event(1)
+    game.record_event(excinfo.value.event)
+    assert ('Greg', 'Colonel Mustard') in {
+        (r.player.name, r.cards[0].name) for r in game.relations
+        if r.rel_type == ClueRelationType.HAVE}
+
+
+def test_hand_size_contradiction(clue_game):
+    game = clue_game
+
+    for c in ['Rope', 'Knife', 'Hall', 'Study']:
+        game.record_have('Greg', c)
+    with pytest.raises(ClueContradiction):
+        game.record_have('Greg', 'Wrench')
+
+    passes = [ClueEvent("pass", 'David', [c]) for c in
+              sorted(c.name for c in game.cards)
+              if c not in ['Rope', 'Knife', 'Hall', 'Study']]
+    with pytest.raises(ClueContradiction):
+        with game.batch():
+            for e in passes:
+                game.record_event(e)
+    assert len(game.events) == 4
+    assert game.conflicting_events(ClueEvent("have", 'Adam', ['Lounge'])) \
+        is None
+
+
+def test_batch_is_undone_by_a_conflicting_event(clue_game):
+    game = clue_game
+    game.record_have('Adam', 'Rope')
+    version = game.version
+
+    with pytest.raises(ClueContradiction):
+        with game.batch():
+            game.record_pass('Greg', 'Knife')
+            game.record_pass('Adam', 'Rope')
+
+    assert len(game.events) == 1
+    assert game.version > version
+    assert ('Greg', 'Knife') not in {
+        (r.player.name, r.cards[0].name) for r in game.relations}
+
+
+def test_player_hand_saturated_by_passes(clue_game):
+    game = clue_game
+    hand = ['Rope', 'Knife', 'Hall', 'Study']
+
+    with game.batch():
+        for c in game.cards:
+            if c.name not in hand:
+                game.record_pass('Greg', c)
+
+    assert {r.cards[0].name for r in game.relations
+            if r.rel_type == ClueRelationType.HAVE} == set(hand)
+    assert ('Adam', 'Rope') in {
+        (r.player.name, r.cards[0].name) for r in game.relations
+        if r.rel_type == ClueRelationType.PASS}
+
+
+def test_state_at(clue_game):
+    game = clue_game
+    cards = sorted(c.name for c in game.cards)
+    for i, c in enumerate(cards):
+        game.record_pass(['Adam', 'Greg', 'Cynthia'][i % 3], c)
+    game.record_show('David', cards[:3])
+
+    def known(g):
+        return sorted(map(repr, g.relations)), g.cards_in_the_file
+
+    assert len(game._checkpoints) == len(game.events) // \
+        Game.CHECKPOINT_INTERVAL > 0
+    for k in range(len(game.events) + 1):
+        past = game.state_at(k)
+        assert past.events == game.events[:k]
+        assert past.game_id != game.game_id
+        assert past.card_order == game.card_order
+        assert past.player_order == game.player_order
+
+        expected = game.state_at(0)
+        for e in game.events[:k]:
+            expected.record_event(e)
+        assert known(past) == known(expected)
+    with pytest.raises(ValueError):
+        game.state_at(len(game.events) + 1)
+
+
+def test_state_at_after_batches(clue_game):
+    game = clue_game
+    cards = sorted(c.name for c in game.cards)
+    with game.batch():
+        for i, c in enumerate(cards[:Game.CHECKPOINT_INTERVAL + 2]):
+            game.record_pass(['Adam', 'Greg', 'Cynthia'][i % 3], c)
+    with game.batch():
+        game.record_pass('David', cards[0])
+
+    assert list(game._checkpoints) == [Game.CHECKPOINT_INTERVAL + 2]
+    assert 'events' not in pickle.loads(
+        game._checkpoints[Game.CHECKPOINT_INTERVAL + 2])
+    for k in [Game.CHECKPOINT_INTERVAL + 2, len(game.events)]:
+        past = game.state_at(k)
+        assert past.events == game.events[:k]
+        expected = game.state_at(0)
+        for e in game.events[:k]:
+            expected.record_event(e)
+        assert sorted(map(repr, past.relations)) == \
+            sorted(map(repr, expected.relations))
+
+
+def test_fork_copies_on_write(clue_game):
+    game = clue_game
+    game.record_show('Greg', ['Colonel Mustard', 'Rope', 'Ballroom'])
+    game.record_pass('Greg', 'Colonel Mustard')
+
+    def known(g):
+        return sorted(map(repr, g.relations)), list(g.events), g.version
+
+    before = known(game)
+    fork = game.fork()
+    assert fork.game_id != game.game_id
+    assert fork._rel_types is game._rel_types
+
+    fork.record_pass('Greg', 'Rope')
+    assert known(game) == before
+    assert ('Greg', 'Ballroom') in {
+        (r.player.name, r.cards[0].name) for r in fork.relations
+        if r.rel_type == ClueRelationType.HAVE}
+    assert fork.events[0] is game.events[0]
+
+    # Changing the original leaves its other forks alone, too.
+    other = game.fork()
+    game.record_pass('Greg', 'Ballroom')
+    assert known(other) == before
+    other.record_pass('Greg', 'Ballroom')
+    assert ('Greg', 'Rope') in {
+        (r.player.name, r.cards[0].name) for r in other.relations
+        if r.rel_type == ClueRelationType.HAVE}
+
+
+def test_relations_are_stored_compactly(clue_game):
+    game = clue_game
+    game.record_show('Greg', ['Colonel Mustard', 'Rope', 'Ballroom'])
+    game.record_have('Greg', 'Rope')
+
+    assert len(game._rel_types) == len(game.relations) + 1
+    assert [r.cards[0].name for r in game.relations
+            if r.rel_type == ClueRelationType.HAVE] == ['Rope']
+    assert [[c.name for c in s.cards] for s in game.resolved_shows] == \
+        [['Colonel Mustard', 'Rope', 'Ballroom']]
+
+
+def test_games_pickled_with_relation_objects_still_load(clue_game):
+    game = clue_game
+    game.record_show('Greg', ['Colonel Mustard', 'Rope', 'Ballroom'])
+    game.record_show('Adam', ['Miss Scarlet', 'Knife', 'Hall'])
+    game.record_have('Adam', 'Knife')
+    game.record_pass('Greg', 'Colonel Mustard')
+
+    # The state as pickled before relations were stored compactly
+    state = {k: v for k, v in game.__dict__.items()
+             if k in ['cards', 'players', 'seating', 'events', 'game_id',
+                      'version']}
+    state['relations'] = game.relations
+    state['resolved_shows'] = game.resolved_shows
+    old = Game.__new__(Game)
+    old.__setstate__(state)
+
+    assert sorted(map(repr, old.relations)) == \
+        sorted(map(repr, game.relations))
+    assert old.resolved_shows == game.resolved_shows
+    for g in [game, old]:
+        g.record_pass('Greg', 'Rope')
+    assert sorted(map(repr, old.relations)) == \
+        sorted(map(repr, game.relations))
+    assert ('Greg', 'Ballroom') in {
+        (r.player.name, r.cards[0].name) for r in old.relations
+        if r.rel_type == ClueRelationType.HAVE}
+
+
+def test_deduction_rules_run_cheapest_first():
+    costs = [rule.cost for rule in deduction_rules()]
+
+    assert costs == sorted(costs)
+    assert {rule.scope for rule in deduction_rules()} == \
+        {"relation", "player", "card type"}
+    assert all(rule.triggers for rule in deduction_rules())
+
+
+def test_costly_rules_run_once_per_batch(clue_game):
+    game = clue_game
+    rule_stats(reset=True)
+    with game.batch():
+        for c in ['Colonel Mustard', 'Miss Scarlet', 'Rope', 'Hall']:
+            game.record_pass('Greg', c)
+    stats = rule_stats()
+
+    whole_hand = stats['deduce_player_haves_from_known_passes']
+    assert whole_hand.wakeups == 4
+    assert whole_hand.runs == 1
+    assert stats['move_watches_from_pass'].runs == 4
+    assert all(s.seconds >= 0 for s in stats.values())
+    rule_stats(reset=True)
+    assert all(s.runs == 0 for s in rule_stats().values())
+
+
+def test_too_many_disjoint_shows_for_hand_size():
+    game = Game(["Plum", "White", "Green"], ["Rope", "Knife"],
+                ["Hall", "Study"], [("Adam", 3), ("Greg", 1)])
+    game.record_show("Greg", ["Plum", "Rope"])
+    game.record_show("Greg", ["Plum", "Knife"])
+
+    with pytest.raises(ClueContradiction):
+        game.record_show("Greg", ["White", "Knife"])
+    assert len(game.events) == 2
+
+
+def test_games_pickled_without_events_keep_their_relations(clue_game):
+    game = clue_game
+    game.record_show('Greg', ['Colonel Mustard', 'Rope', 'Ballroom'])
+    game.record_have('Adam', 'Knife')
+    game.record_pass('Greg', 'Colonel Mustard')
+
+    # The state as pickled before events were logged
+    state = {'cards': game.cards, 'players': game.players,
+             'relations': game.relations + game.resolved_shows}
+    old = Game.__new__(Game)
+    old.__setstate__(pickle.loads(pickle.dumps(state)))
+    relations = sorted(map(repr, old.relations))
+
+    assert old.events
+    with pytest.raises(ClueContradiction):
+        old.record_pass('Adam', 'Knife')
+    assert sorted(map(repr, old.relations)) == relations
+    old.retract_event(len(old.events) - 1)
+    assert ('Adam', 'Knife') in {
+        (r.player.name, r.cards[0].name) for r in old.relations
+        if r.rel_type == ClueRelationType.HAVE}
@@ -0,0 +1,88 @@
+from cluesolver.cluegame import ClueEvent, Game
+from cluesolver import batch, gamelog
+import io
+import pytest
+
+
+@pytest.fixture
+def clue_game():
+    return Game(
+            [
+                "Colonel Mustard",
+                "Miss Scarlet",
+                "Professor Plum"
+            ],
+            [
+                "Rope",
+                "Lead Pipe",
+                "Revolver"
+            ],
+            [
+                "Billiard Room",
+                "Ballroom",
+                "Lounge"
+            ],
+            {
+                ('Adam', 3),
+                ('Cynthia', 3)
+            }
+        )
+
+
+@pytest.fixture
+def played_game(clue_game):
+    game = clue_game
+    for c in ['Colonel Mustard', 'Rope', 'Ballroom']:
+        game.record_have('Adam', c)
+    game.record_show('Cynthia', ['Miss Scarlet', 'Lead Pipe', 'Lounge'])
+    for c in ['Miss Scarlet', 'Lead Pipe']:
+        game.record_pass('Cynthia', c)
+    game.record_have('Cynthia', 'Revolver')
+    game.record_pass('Cynthia', 'Billiard Room')
+    return game
+
+
+def test_events_logged(played_game):
+    game = played_game
+
+    assert len(game.events) == 8
+    assert game.events[0] == ClueEvent('have', 'Adam', ['Colonel Mustard'])
+    assert game.events[3].kind == 'show'
+    assert len(game.relations) > len(game.events)
+
+
+def test_log_round_trip(played_game):
+    game = played_game
+
+    f = io.StringIO()
+    gamelog.write_log(game, f)
+    f.seek(0)
+    setup, events = gamelog.read_log(f)
+    events = list(events)
+
+    assert events == game.events
+    replayed = gamelog.replay(setup, events)
+    assert sorted(map(repr, replayed.relations)) == \
+        sorted(map(repr, game.relations))
+    assert replayed.cards_in_the_file == game.cards_in_the_file
+
+
+def test_batch_analysis(played_game, tmp_path):
+    game = played_game
+
+    with open(tmp_path / "one.jsonl", "w") as f:
+        gamelog.write_log(game, f)
+    game.save(str(tmp_path / "two.pickledb"))
+    (tmp_path / "three.jsonl").write_text("not json\n")
+
+    results = {r["game"]: r for r in batch.run_batch(
+        batch.iter_game_files(str(tmp_path)), jobs=2, max_pending=1)}
+
+    assert len(results) == 3
+    for name in ["one.jsonl", "two.pickledb"]:
+        r = results[str(tmp_path / name)]
+        assert r["error"] is None
+        assert r["events"] == 8
+        assert r["envelope_event"] == 6
+        assert r["haves"] == 6
+    assert results[str(tmp_path / "three.jsonl")]["error"]
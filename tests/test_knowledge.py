@@ -0,0 +1,77 @@
+from cluesolver import fuzz, gamelog, membench
+from cluesolver.cluegame import Game, ClueRelationType, HAS, PASSES, UNKNOWN
+from cluesolver.knowledge import knowledge_array, stack
+import numpy as np
+import pytest
+import random
+
+
+def random_games(n, seed=0):
+    rng = random.Random(seed)
+    setup = membench.STANDARD_SETUP
+    return [gamelog.replay(setup, fuzz.random_events(
+        setup, fuzz.random_deal(setup, rng), rng, 30)) for _ in range(n)]
+
+
+def test_knowledge_matches_relations():
+    game = random_games(1)[0]
+    players, cards = game.player_order, game.card_order
+    expected = np.full((len(players), len(cards)), UNKNOWN)
+    for r in game.relations:
+        if r.rel_type == ClueRelationType.HAVE:
+            expected[players.index(r.player), cards.index(r.cards[0])] = HAS
+        elif r.rel_type == ClueRelationType.PASS:
+            expected[players.index(r.player), cards.index(r.cards[0])] = \
+                PASSES
+
+    assert [p.name for p in players] == game.seating
+    assert (knowledge_array(game) == expected).all()
+    assert game.knowledge().tolist() == expected.tolist()
+
+
+def test_knowledge_is_not_copied():
+    game = Game(["Plum", "White"], ["Rope", "Knife"], ["Hall", "Study"],
+                [("Adam", 2), ("Greg", 1)])
+    a = knowledge_array(game)
+    game.record_have("Greg", "Knife")
+
+    assert not a.flags.writeable
+    assert a[1, 3] == HAS
+    with pytest.raises(TypeError):
+        game.knowledge()[0, 0] = HAS
+
+
+def test_stack():
+    games = random_games(5)
+    matrices = stack(games)
+
+    assert matrices.shape == (5, 4, 21)
+    for i, game in enumerate(games):
+        assert (matrices[i] == knowledge_array(game)).all()
+    out = np.zeros_like(matrices)
+    assert stack(games, out=out) is out
+    assert (out == matrices).all()
+
+    with pytest.raises(ValueError):
+        stack(games, out=out[1:])
+    with pytest.raises(ValueError):
+        stack([])
+    other = Game(["Plum", "White"], ["Rope", "Knife"], ["Hall", "Study"],
+                 [("Adam", 2), ("Greg", 1)])
+    with pytest.raises(ValueError):
+        stack(games + [other])
+
+
+def test_stack_rearranges_games_set_up_in_another_order():
+    game = Game(["Plum", "White"], ["Rope", "Knife"], ["Hall", "Study"],
+                [("Adam", 2), ("Greg", 1)])
+    other = Game(["White", "Plum"], ["Knife", "Rope"], ["Study", "Hall"],
+                 [("Greg", 1), ("Adam", 2)])
+    for g in [game, other]:
+        g.record_have("Greg", "Knife")
+        g.record_pass("Adam", "Plum")
+
+    assert other.card_order != game.card_order
+    matrices = stack([game, other])
+    assert (matrices[1] == matrices[0]).all()
+    assert (stack([other, game])[1] == knowledge_array(other)).all()
@@ -0,0 +1,23 @@
+from app import loadtest
+import io
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert loadtest.percentile(values, 50) == 50
+    assert loadtest.percentile(values, 99) == 99
+    assert loadtest.percentile([7], 95) == 7
+
+
+def test_load_test_run():
+    samples, elapsed = loadtest.run(tables=2, events=3)
+
+    routes = {s.route for s in samples}
+    assert {"POST /create_game", "POST /input_hand",
+            "POST /gameplay_view"} <= routes
+    assert any("inference" in s.server_timing for s in samples)
+
+    out = io.StringIO()
+    loadtest.report(samples, elapsed, out)
+    assert "p99 ms" in out.getvalue()
+    assert "storage" in out.getvalue()
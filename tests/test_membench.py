@@ -0,0 +1,10 @@
+from cluesolver import membench
+
+
+def test_measure():
+    m = membench.measure(n_games=5, n_events=10)
+
+    assert m.games == 5
+    assert m.bytes_per_game > 0
+    assert m.relations_per_game > 0
+    assert m.pickled_bytes_per_game > 0
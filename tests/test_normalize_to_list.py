@@ -1,6 +1,6 @@
 import pytest
 import collections
-from app.cluegame import normalize_to_list
+from cluesolver.cluegame import normalize_to_list
 
 
 @pytest.fixture
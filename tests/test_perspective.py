@@ -0,0 +1,104 @@
+from cluesolver.cluegame import ClueEvent, ClueRelationType, Game
+from cluesolver.perspective import PerspectiveTracker
+import pytest
+
+
+SETUP = (
+    ["Colonel Mustard", "Miss Scarlet", "Professor Plum"],
+    ["Rope", "Lead Pipe", "Revolver"],
+    ["Billiard Room", "Ballroom", "Lounge"],
+    [('Adam', 2), ('Cynthia', 2), ('Greg', 2)]
+)
+
+
+def facts(game):
+    return {(r.rel_type, r.player.name, r.cards[0].name)
+            for r in game.relations if r.rel_type != ClueRelationType.SHOW}
+
+
+@pytest.fixture
+def tracker():
+    return PerspectiveTracker(*SETUP)
+
+
+def test_perspectives_share_public_game(tracker):
+    tracker.record_public(ClueEvent("pass", "Greg", ["Rope"]))
+
+    assert tracker.perspective("Greg") is tracker.public
+    assert tracker.perspective("Cynthia") is tracker.public
+
+    with pytest.raises(ValueError):
+        tracker.perspective("Nobody")
+
+
+def test_private_events_stay_private(tracker):
+    tracker.record_private("Adam", ClueEvent("have", "Adam", ["Rope"]))
+    tracker.record_private("Adam", ClueEvent("have", "Adam", ["Lounge"]))
+    tracker.record_public(ClueEvent("show", "Cynthia",
+                                    ["Rope", "Lead Pipe", "Lounge"]))
+
+    adam = tracker.perspective("Adam")
+    assert (ClueRelationType.HAVE, "Cynthia", "Lead Pipe") in facts(adam)
+    assert (ClueRelationType.PASS, "Adam", "Miss Scarlet") in facts(adam)
+    assert facts(tracker.perspective("Greg")) == set()
+
+
+def test_perspective_matches_ordered_replay(tracker):
+    events = [
+        ("Adam", ClueEvent("have", "Adam", ["Rope"])),
+        (None, ClueEvent("pass", "Greg", ["Miss Scarlet"])),
+        (None, ClueEvent("show", "Greg", ["Colonel Mustard", "Rope",
+                                          "Ballroom"])),
+        ("Cynthia", ClueEvent("have", "Cynthia", ["Lounge"])),
+        ("Adam", ClueEvent("have", "Greg", ["Ballroom"])),
+        (None, ClueEvent("pass", "Cynthia", ["Miss Scarlet"])),
+    ]
+
+    for i, (viewer, event) in enumerate(events):
+        if viewer is None:
+            tracker.record_public(event)
+        else:
+            tracker.record_private(viewer, event)
+        if i == 2:
+            tracker.perspective("Adam")  # materialize part way through
+
+    for viewer in ["Adam", "Cynthia", "Greg"]:
+        expected = Game(*SETUP)
+        for v, event in events:
+            if v in (None, viewer):
+                expected.record_event(event)
+        assert facts(tracker.perspective(viewer)) == facts(expected)
+
+
+def test_perspective_is_forked_from_public(tracker):
+    tracker.record_public(ClueEvent("pass", "Greg", ["Rope"]))
+    tracker.record_private("Adam", ClueEvent("have", "Adam", ["Rope"]))
+
+    adam = tracker.perspective("Adam")
+    assert adam is not tracker.public
+    assert adam.events == tracker.public.events + [
+        ClueEvent("have", "Adam", ["Rope"])]
+    assert tracker.perspective("Adam") is adam
+
+    tracker.record_private("Adam", ClueEvent("have", "Adam", ["Lounge"]))
+    assert tracker.perspective("Adam") is adam
+    with pytest.raises(ValueError):
+        tracker.record_private("Adam", ClueEvent("pass", "Adam", ["Rope"]))
+    assert len(adam.events) == 3
+
+    tracker.record_public(ClueEvent("pass", "Greg", ["Lounge"]))
+    adam = tracker.perspective("Adam")
+    assert len(adam.events) == 4
+    assert len(tracker.public.events) == 2
+
+
+def test_contradictory_private_event_is_rejected_at_once(tracker):
+    tracker.record_private("Adam", ClueEvent("have", "Adam", ["Rope"]))
+    with pytest.raises(ValueError):
+        tracker.record_private("Adam", ClueEvent("pass", "Adam", ["Rope"]))
+    tracker.record_private("Greg", ClueEvent("pass", "Greg", ["Rope"]))
+
+    tracker.record_public(ClueEvent("pass", "Cynthia", ["Lounge"]))
+    assert len(tracker.perspective("Adam").events) == 2
+    assert (ClueRelationType.PASS, "Greg", "Rope") in \
+        facts(tracker.perspective("Greg"))
@@ -0,0 +1,87 @@
+from cluesolver.cluegame import Game
+from cluesolver.probability import marginal_probabilities
+import pytest
+
+
+@pytest.fixture
+def clue_game():
+    return Game(
+            [
+                "Colonel Mustard",
+                "Miss Scarlet",
+                "Professor Plum",
+                "Mrs. White",
+                "Mr. Green",
+                "Mrs. Peacock"
+            ],
+            [
+                "Rope",
+                "Lead Pipe",
+                "Revolver",
+                "Candlestick",
+                "Knife",
+                "Wrench"
+            ],
+            [
+                "Billiard Room",
+                "Ballroom",
+                "Lounge",
+                "Kitchen",
+                "Conservatory",
+                "Library",
+                "Dining Room",
+                "Hall",
+                "Study"
+            ],
+            {
+                ('Adam', 5),
+                ('Cynthia', 5),
+                ('Greg', 4),
+                ('David', 4)
+            }
+        )
+
+
+def test_constraints_satisfied(clue_game):
+    game = clue_game
+
+    for c in ['Colonel Mustard', 'Miss Scarlet', 'Billiard Room', 'Mr. Green']:
+        game.record_have('David', c)
+    game.record_show('Greg', ['Professor Plum', 'Rope', 'Ballroom'])
+    game.record_pass('Greg', 'Rope')
+
+    probs = marginal_probabilities(game)
+    values = probs.values
+
+    assert values.shape == (len(game.players) + 1, len(game.cards))
+    assert values.sum(axis=0) == pytest.approx(1.0, abs=1e-4)
+    for i, p in enumerate(probs.players):
+        assert values[i].sum() == pytest.approx(p.hand_size, abs=1e-3)
+    assert values[-1].sum() == pytest.approx(3.0, abs=1e-3)
+
+    for p in probs.players:
+        for c in probs.cards:
+            if p.name == 'David':
+                expected = 1.0 if c.name in ['Colonel Mustard',
+                                             'Miss Scarlet',
+                                             'Billiard Room',
+                                             'Mr. Green'] else 0.0
+                assert probs.probability(p, c) == expected
+    greg = next(p for p in probs.players if p.name == 'Greg')
+    rope = next(c for c in probs.cards if c.name == 'Rope')
+    assert probs.probability(greg, rope) == 0.0
+
+
+def test_cards_in_the_file_are_certain(clue_game):
+    game = clue_game
+
+    for p in game.players:
+        game.record_pass(p, 'Knife')
+
+    probs = marginal_probabilities(game)
+    knife = next(c for c in game.cards if c.name == 'Knife')
+    rope = next(c for c in game.cards if c.name == 'Rope')
+
+    assert probs.in_the_file(knife) == pytest.approx(1.0)
+    assert probs.in_the_file(rope) == pytest.approx(0.0, abs=1e-4)
+    assert probs.heat_map()[-1][0] == "File"
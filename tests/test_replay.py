@@ -0,0 +1,64 @@
+from app import app, replay, routes
+from app.tracing import TraceRecorder, read_trace
+from cluesolver.store import GameStore
+import io
+import os
+import pytest
+
+
+@pytest.fixture
+def trace(tmp_path, monkeypatch):
+    app.config['WTF_CSRF_ENABLED'] = False
+    path = str(tmp_path / "trace.jsonl")
+    recorder = TraceRecorder(path, 1024, 10)
+    monkeypatch.setattr(routes, 'game_store',
+                        GameStore(str(tmp_path / "games")))
+    monkeypatch.setattr(routes, 'trace_recorder', recorder)
+
+    client = app.test_client()
+    client.get('/create_game')
+    client.post('/create_game', data={
+        'player-0-name': 'Adam', 'player-0-hand_size': '9',
+        'player-1-name': 'Greg', 'player-1-hand_size': '9'})
+    client.post('/input_hand', data={
+        'myself': 'Adam', 'cards': ['Rope', 'Hall'], 'submit': 'y'})
+    for card in ['Knife', 'Study', 'Lounge']:
+        client.post('/gameplay_view', data={
+            'player': 'Greg', 'card': card, 'submit_reveal': 'y'})
+    client.post('/gameplay_view', data={
+        'player': 'Greg', 'card': 'Rope', 'submit_reveal': 'y'})
+    recorder.close()
+    return path
+
+
+def test_trace_recorded(trace):
+    records = read_trace(trace)
+
+    assert [r["route"] for r in records] == \
+        ['/create_game', '/input_hand'] + ['/gameplay_view'] * 4
+    assert len({r["game_id"] for r in records}) == 1
+    assert records[1]["fields"]["cards"] == ['Rope', 'Hall']
+    assert all('csrf_token' not in r["fields"] for r in records)
+    assert records == sorted(records, key=lambda r: r["time"])
+    assert [r["status"] for r in records] == [302, 302, 200, 200, 200, 200]
+
+
+def test_trace_rotated(trace):
+    assert os.path.exists(trace + ".1")
+
+
+@pytest.mark.parametrize("speed", [None, 100.0])
+def test_replay(trace, speed):
+    store = routes.game_store
+    records = read_trace(trace)
+
+    results, elapsed = replay.replay(records, speed)
+
+    assert routes.game_store is store
+    assert len(results) == len(records)
+    assert all(r.status == r.recorded_status for r in results)
+
+    out = io.StringIO()
+    replay.report(results, elapsed, out)
+    assert "/gameplay_view" in out.getvalue()
+    assert "0 status mismatches" in out.getvalue()
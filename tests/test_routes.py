@@ -0,0 +1,162 @@
+from app import app, routes
+from app.routes import view_cache
+from cluesolver.cluegame import Game
+from cluesolver.store import GameStore
+import pytest
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    app.config['WTF_CSRF_ENABLED'] = False
+    monkeypatch.setattr(routes, 'game_store', GameStore(str(tmp_path)))
+    game = Game(app.config['CLUE_CARDS_PERSONS'],
+                app.config['CLUE_CARDS_WEAPONS'],
+                app.config['CLUE_CARDS_ROOMS'],
+                [('Adam', 6), ('Cynthia', 6), ('Greg', 6)])
+    routes.game_store.add(game)
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['game_id'] = game.game_id
+    return client
+
+
+def stored_game(client):
+    with client.session_transaction() as session:
+        game_id = session['game_id']
+    with routes.game_store.checkout(game_id) as game:
+        return game
+
+
+def test_gameplay_view_etag(client):
+    response = client.get('/gameplay_view')
+    assert response.status_code == 200
+    etag, _ = response.get_etag()
+    assert etag
+
+    response = client.get('/gameplay_view',
+                          headers={'If-None-Match': '"{}"'.format(etag)})
+    assert response.status_code == 304
+
+    response = client.post('/gameplay_view', data={
+        'player': 'Adam', 'card': 'Rope', 'submit_reveal': 'y'})
+    assert response.status_code == 200
+    new_etag, _ = response.get_etag()
+    assert new_etag != etag
+    assert (stored_game(client).version ==
+            int(new_etag.split('-')[1]))
+
+    response = client.get('/gameplay_view',
+                          headers={'If-None-Match': '"{}"'.format(etag)})
+    assert response.status_code == 200
+
+
+def test_gameplay_view_uses_cached_view(client):
+    client.get('/gameplay_view')
+    game = stored_game(client)
+    assert (game.game_id, game.version) in view_cache
+
+
+def test_record_suggestion(client):
+    response = client.post('/gameplay_view', data={
+        'suggester': 'Adam',
+        'cards-0': 'Colonel Mustard', 'cards-1': 'Rope', 'cards-2': 'Hall',
+        'shower': 'Greg', 'shown': '',
+        'submit_suggestion': 'y'})
+    assert response.status_code == 200
+
+    game = stored_game(client)
+    assert len(game.events) == 1
+    assert game.events[0].kind == 'suggest'
+    assert game.events[0].shower == 'Greg'
+    assert game.events[0].shown is None
+
+
+def test_contradiction_is_flashed_and_retractable(client):
+    client.post('/gameplay_view', data={
+        'player': 'Adam', 'card': 'Rope', 'submit_reveal': 'y'})
+    response = client.post('/gameplay_view', data={
+        'player': 'Greg', 'card': 'Rope', 'submit_reveal': 'y'})
+    assert response.status_code == 200
+    assert b'Not recorded' in response.data
+    assert b'Adam has Rope' in response.data
+    assert len(stored_game(client).events) == 1
+
+    client.post('/gameplay_view', data={
+        'event': '0', 'submit_retract': 'y'})
+    assert stored_game(client).events == []
+
+
+def test_pass_form_is_all_or_nothing(client):
+    client.post('/gameplay_view', data={
+        'player': 'Adam', 'card': 'Rope', 'submit_reveal': 'y'})
+    response = client.post('/gameplay_view', data={
+        'player': 'Adam',
+        'cards-0': 'Colonel Mustard', 'cards-1': 'Rope', 'cards-2': 'Hall',
+        'submit_pass': 'y'})
+
+    assert b'Not recorded' in response.data
+    assert len(stored_game(client).events) == 1
+
+
+def test_games_are_scoped_to_sessions(client):
+    client.post('/gameplay_view', data={
+        'player': 'Adam', 'card': 'Rope', 'submit_reveal': 'y'})
+    game_id = stored_game(client).game_id
+
+    other = app.test_client()
+    assert other.get('/gameplay_view').status_code == 302
+    other.post('/create_game', data={
+        'player-0-name': 'Adam', 'player-0-hand_size': '9',
+        'player-1-name': 'Greg', 'player-1-hand_size': '9'})
+    assert stored_game(other).game_id != game_id
+    assert stored_game(other).events == []
+
+    response = other.get('/gameplay_view?game=' + game_id)
+    assert response.status_code == 200
+    assert stored_game(other).game_id == game_id
+    assert len(stored_game(client).events) == 1
+
+
+def test_timeline(client):
+    client.post('/gameplay_view', data={
+        'player': 'Adam', 'card': 'Rope', 'submit_reveal': 'y'})
+
+    response = client.get('/timeline?k=0')
+    assert response.status_code == 200
+    assert b'Known after 0 events' in response.data
+    assert b'<td class="have">' not in response.data
+
+    response = client.get('/timeline')
+    assert b'Known after 1 events' in response.data
+    assert b'<td class="have">' in response.data
+
+
+@pytest.mark.parametrize("shower, shown, message", [
+    ('Adam', '', b'A player cannot show to themself!'),
+    ('', 'Rope', b'A card cannot be shown by nobody!'),
+    ('Greg', 'Knife', b'The card shown must be one of the cards suggested'),
+])
+def test_invalid_suggestion_is_flashed(client, shower, shown, message):
+    response = client.post('/gameplay_view', data={
+        'suggester': 'Adam',
+        'cards-0': 'Colonel Mustard', 'cards-1': 'Rope', 'cards-2': 'Hall',
+        'shower': shower, 'shown': shown,
+        'submit_suggestion': 'y'})
+
+    assert response.status_code == 200
+    assert b'Not recorded' in response.data
+    assert message in response.data
+    assert stored_game(client).events == []
+
+
+def test_new_states_are_precomputed_under_the_game_id(client, monkeypatch):
+    precomputed = []
+    monkeypatch.setattr(routes.analysis_runner, 'precompute',
+                        precomputed.append)
+    client.post('/gameplay_view', data={
+        'player': 'Adam', 'card': 'Rope', 'submit_reveal': 'y'})
+
+    game = stored_game(client)
+    assert [(g.game_id, g.version) for g in precomputed] == \
+        [(game.game_id, game.version)]
+    assert precomputed[0] is not game
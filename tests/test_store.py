@@ -0,0 +1,100 @@
+from cluesolver import gamelog
+from cluesolver.cluegame import Game
+from cluesolver.store import GameStore, deep_sizeof
+import os
+import pytest
+import time
+
+
+SETUP = {"persons": ["Plum", "White"], "weapons": ["Rope", "Knife"],
+         "rooms": ["Hall", "Study"],
+         "players": [["Adam", 2], ["Greg", 1]]}
+
+
+def test_sharded_layout(tmp_path):
+    store = GameStore(str(tmp_path))
+    game = gamelog.new_game(SETUP)
+
+    path = store.path_for(game.game_id)
+    assert path == os.path.join(str(tmp_path), game.game_id[:2],
+                                game.game_id[2:4], game.game_id + ".pickledb")
+    with pytest.raises(ValueError):
+        store.path_for("../../etc/passwd")
+    with store.checkout("../../etc/passwd") as missing:
+        assert missing is None
+
+
+def test_write_back_on_eviction(tmp_path):
+    store = GameStore(str(tmp_path), max_games=1)
+    first, second = gamelog.new_game(SETUP), gamelog.new_game(SETUP)
+
+    store.add(first)
+    with store.checkout(first.game_id) as game:
+        game.record_have("Adam", "Plum")
+    assert not os.path.isfile(store.path_for(first.game_id))
+
+    store.add(second)
+    saved = Game.load(store.path_for(first.game_id))
+    assert saved.events == first.events
+
+    with store.checkout(first.game_id) as game:
+        assert game is not first
+        assert game.events == first.events
+    assert first.game_id in store
+    store.delete(first.game_id)
+    assert first.game_id not in store
+
+
+def test_idle_and_memory_limits(tmp_path):
+    store = GameStore(str(tmp_path), idle_seconds=60)
+    game = gamelog.new_game(SETUP)
+    store.add(game)
+
+    assert store.sweep() == deep_sizeof(game)
+    assert store.sweep(time.monotonic() + 120) == 0
+    assert os.path.isfile(store.path_for(game.game_id))
+
+    store.max_bytes = deep_sizeof(game) - 1
+    with store.checkout(game.game_id) as loaded:
+        assert loaded.game_id == game.game_id
+    assert store.sweep() == 0
+
+
+def test_import_file(tmp_path):
+    store = GameStore(str(tmp_path / "games"))
+    game = gamelog.new_game(SETUP)
+    game.record_have("Greg", "Hall")
+    legacy = str(tmp_path / "game.pickledb")
+    game.save(legacy)
+
+    assert store.import_file(legacy) == game.game_id
+    assert not os.path.exists(legacy)
+    assert os.path.exists(legacy + ".imported")
+    assert os.path.exists(store.path_for(game.game_id))
+    with store.checkout(game.game_id) as imported:
+        assert imported.events == game.events
+    assert store.import_file(legacy) is None
+
+
+def test_import_file_saved_without_events(tmp_path):
+    store = GameStore(str(tmp_path / "games"))
+    game = gamelog.new_game(SETUP)
+    game.record_have("Greg", "Hall")
+    game.record_pass("Adam", "Plum")
+    # A Game as pickled before events were logged
+    legacy = Game.__new__(Game)
+    legacy.__dict__.update(cards=game.cards, players=game.players,
+                           relations=game.relations)
+    path = str(tmp_path / "game.pickledb")
+    legacy.save(path)
+
+    game_id = store.import_file(path)
+    with store.checkout(game_id) as imported:
+        relations = sorted(map(repr, imported.relations))
+        assert imported.events
+        with pytest.raises(ValueError):
+            imported.record_have("Adam", "Hall")
+        assert sorted(map(repr, imported.relations)) == relations
+    setup, events = gamelog.open_log(path + ".imported")
+    assert sorted(map(repr, gamelog.replay(setup, events).relations)) == \
+        relations
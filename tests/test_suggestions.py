@@ -0,0 +1,19 @@
+from cluesolver import gamelog
+from cluesolver.exact import exact_probabilities
+from cluesolver.suggestions import rank_suggestions
+
+
+def test_rank_suggestions():
+    game = gamelog.new_game({
+        "persons": ["Plum", "White", "Green"], "weapons": ["Rope", "Knife"],
+        "rooms": ["Hall", "Study", "Lounge"],
+        "players": [["Adam", 3], ["Greg", 2]]})
+    game.record_have("Adam", "Plum")
+
+    ranking = rank_suggestions(exact_probabilities(game), top=3)
+
+    assert len(ranking) == 3
+    assert [score for score, _ in ranking] == \
+        sorted((score for score, _ in ranking), reverse=True)
+    # Plum is accounted for, so suggesting it can't tell us anything.
+    assert all(cards[0] != "Plum" for _, cards in ranking)
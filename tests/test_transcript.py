@@ -0,0 +1,135 @@
+from cluesolver.cli import main
+from cluesolver.cluegame import ClueEvent, ClueRelationType
+from cluesolver import gamelog, transcript
+import io
+import pytest
+
+TRANSCRIPT = """\
+# A game typed up from paper.
+players: Adam 5, Cynthia 5, Greg 4, David 4
+persons: Colonel Mustard, Miss Scarlet, Professor Plum, Mrs. White,
+    Mr. Green, Mrs. Peacock
+weapons: Rope, Lead Pipe, Revolver, Candlestick, Knife, Wrench
+rooms: Billiard Room, Ballroom, Lounge, Kitchen, Conservatory, Library,
+    Dining Room, Hall, Study
+"""
+
+
+def setup_lines():
+    # Continuation lines are not supported; join them up.
+    return TRANSCRIPT.replace(",\n    ", ", ")
+
+
+def test_import_transcript():
+    game, errors = transcript.import_transcript(io.StringIO(
+        setup_lines() +
+        "Adam has Rope, hall  # any case will do\n"
+        "Adam suggests Plum Rope Hall; Cynthia passes; Greg shows\n"
+        "Greg suggests Scarlet Knife Study; David shows Knife\n"
+        "David suggests Scarlet Wrench Lounge; nobody shows\n"
+        "Cynthia does not have Wrench; Cynthia passes Lead Pipe\n"
+        "David shows one of Plum, Wrench, Lounge\n"))
+
+    assert errors == []
+    assert game.seating == ['Adam', 'Cynthia', 'Greg', 'David']
+    assert game.events[:4] == [
+        ClueEvent('have', 'Adam', ['Rope']),
+        ClueEvent('have', 'Adam', ['Hall']),
+        ClueEvent('suggest', 'Adam', ['Professor Plum', 'Rope', 'Hall'],
+                  'Greg', None),
+        ClueEvent('suggest', 'Greg', ['Miss Scarlet', 'Knife', 'Study'],
+                  'David', 'Knife')]
+    assert game.events[4].shower is None
+    assert game.events[-1] == ClueEvent(
+        'show', 'David', ['Professor Plum', 'Wrench', 'Lounge'])
+    assert len(game.events) == 8
+
+
+def test_module_docstring_example():
+    example = transcript.__doc__.split("one turn per line:\n\n")[1]
+    example = example.split("\n\n")[0].replace("\n    ", "\n")
+
+    game, errors = transcript.import_transcript(
+        io.StringIO(example.lstrip()))
+    assert errors == []
+    assert len(game.events) == 7
+    assert {c.name for c in game.cards_in_the_file} == \
+        {"Colonel Mustard", "Wrench", "Study"}
+
+
+def test_errors_are_reported_by_line():
+    lines = (setup_lines() +
+             "Adam has Rope\n"
+             "Adam has Spoon\n"
+             "Zed has Rope\n"
+             "Greg has Rope\n"
+             "Adam suggests Plum Rope\n"
+             "Adam suggests Plum Rope Hall; David passes; Cynthia shows\n"
+             "Cynthia has Knife\n").splitlines()
+
+    game, errors = transcript.import_transcript(lines, batch_size=2)
+
+    first = len(setup_lines().splitlines()) + 1
+    assert [e.line - first for e in errors] == [1, 2, 3, 4, 5]
+    assert "spoon" in errors[0].message
+    assert "seating" in errors[4].message
+    assert [e.player for e in game.events] == ['Adam', 'Cynthia']
+
+
+def test_batch_contradiction_is_pinned_down():
+    # Each line is fine alone, as far as the batch can tell before the
+    # deductions are made at its end.
+    lines = setup_lines().splitlines() + [
+        "Greg shows Rope, Knife, Hall",
+        "Greg does not have Rope",
+        "Greg does not have Knife",
+        "Greg does not have Hall",
+        "Adam has Study"]
+
+    game, errors = transcript.import_transcript(lines, batch_size=100)
+
+    assert [e.line for e in errors] == [len(lines) - 1]
+    assert len(game.events) == 4
+    assert ('Adam', 'Study') in {
+        (r.player.name, r.cards[0].name) for r in game.relations
+        if r.rel_type == ClueRelationType.HAVE}
+
+
+def test_import_into_game():
+    game = gamelog.new_game({
+        "persons": ["Colonel Mustard", "Miss Scarlet", "Professor Plum"],
+        "weapons": ["Rope", "Lead Pipe", "Revolver"],
+        "rooms": ["Billiard Room", "Ballroom", "Lounge"],
+        "players": [["Adam", 3], ["Cynthia", 3]]})
+
+    same, errors = transcript.import_transcript(
+        ["Adam has mustard; Adam has ROPE", "cynthia has billiard"], game)
+
+    assert same is game
+    assert errors == []
+    assert len(game.events) == 3
+
+
+def test_missing_setup():
+    with pytest.raises(ValueError):
+        transcript.import_transcript(["players: Adam 9, Greg 9",
+                                      "Adam has Rope"])
+
+
+def test_cli_import_csv(tmp_path):
+    path = tmp_path / "game.csv"
+    path.write_text(
+        '"players: Adam 3, Cynthia 3"\n'
+        '"persons: Colonel Mustard, Miss Scarlet, Professor Plum"\n'
+        '"weapons: Rope, Lead Pipe, Revolver"\n'
+        '"rooms: Billiard Room, Ballroom, Lounge"\n'
+        'Adam suggests Mustard Rope Lounge,Cynthia shows Rope\n'
+        'Cynthia has Nothing\n')
+    out = io.StringIO()
+
+    assert main(["import", str(path), "-o", str(tmp_path)], out) == 1
+    lines = out.getvalue().splitlines()
+    assert lines[0].startswith("{}:6: ".format(path))
+    assert lines[1].startswith("Imported 1 games, 1 events, with 1 errors")
+    setup, events = gamelog.open_log(str(tmp_path / "game.jsonl"))
+    assert list(events)[0].shown == 'Rope'
@@ -0,0 +1,72 @@
+from cluesolver.cluegame import Game
+from cluesolver.viewmodel import GameGrid, HAVE, PASS, SHOW, UNKNOWN
+import pytest
+
+
+@pytest.fixture
+def clue_game():
+    return Game(
+            [
+                "Colonel Mustard",
+                "Miss Scarlet",
+                "Professor Plum"
+            ],
+            [
+                "Rope",
+                "Lead Pipe",
+                "Revolver"
+            ],
+            [
+                "Billiard Room",
+                "Ballroom",
+                "Lounge"
+            ],
+            [
+                ('Adam', 3),
+                ('Cynthia', 3)
+            ]
+        )
+
+
+def test_grid(clue_game):
+    game = clue_game
+
+    game.record_have('Adam', 'Rope')
+    game.record_show('Cynthia', ['Miss Scarlet', 'Lead Pipe', 'Lounge'])
+    game.record_show('Cynthia', ['Colonel Mustard', 'Rope', 'Ballroom'])
+    for p in game.players:
+        game.record_pass(p, 'Professor Plum')
+
+    grid = GameGrid(game)
+
+    assert grid.players == ['Adam', 'Cynthia']
+    assert [c.name for c in grid.cards[:3]] == ['Colonel Mustard',
+                                                'Miss Scarlet',
+                                                'Professor Plum']
+    assert grid.status('Adam', 'Rope') == HAVE
+    assert grid.status('Cynthia', 'Rope') == PASS
+    assert grid.status('Cynthia', 'Lounge') == SHOW
+    assert grid.status('Adam', 'Lounge') == UNKNOWN
+    assert grid.open_shows == [
+        ('Cynthia', ['Miss Scarlet', 'Lead Pipe', 'Lounge']),
+        ('Cynthia', ['Colonel Mustard', 'Rope', 'Ballroom'])]
+    assert [c.name for c in grid.cards_in_the_file] == ['Professor Plum']
+
+    rows = grid.rows()
+    assert len(rows) == len(game.cards)
+    assert rows[2] == (grid.cards[2], [PASS, PASS], True)
+
+
+def test_resolved_show_is_not_open(clue_game):
+    game = clue_game
+
+    game.record_show('Cynthia', ['Miss Scarlet', 'Lead Pipe', 'Lounge'])
+    game.record_have('Cynthia', 'Lounge')
+
+    grid = GameGrid(game)
+
+    assert grid.open_shows == []
+    assert grid.resolved_shows == [
+        ('Cynthia', ['Miss Scarlet', 'Lead Pipe', 'Lounge'])]
+    assert grid.status('Cynthia', 'Miss Scarlet') == UNKNOWN
+    assert (grid.game_id, grid.version) == (game.game_id, game.version)
@@ -0,0 +1,58 @@
+from cluesolver.cluegame import ClueEvent, Game
+from cluesolver.whatif import what_if
+import concurrent.futures
+import pytest
+
+
+@pytest.fixture
+def clue_game():
+    game = Game(
+            [
+                "Colonel Mustard",
+                "Miss Scarlet",
+                "Professor Plum"
+            ],
+            [
+                "Rope",
+                "Lead Pipe",
+                "Revolver"
+            ],
+            [
+                "Billiard Room",
+                "Ballroom",
+                "Lounge"
+            ],
+            [
+                ('Adam', 3),
+                ('Cynthia', 3)
+            ]
+        )
+    for c in ['Colonel Mustard', 'Rope', 'Ballroom']:
+        game.record_have('Adam', c)
+    return game
+
+
+@pytest.mark.parametrize("executor", [
+    None, concurrent.futures.ThreadPoolExecutor(2)])
+def test_what_if(clue_game, executor):
+    game = clue_game
+    relations = list(game.relations)
+    hypotheses = [
+        [ClueEvent('have', 'Cynthia', ['Lounge'])],
+        [ClueEvent('pass', 'Cynthia', ['Miss Scarlet']),
+         ClueEvent('pass', 'Cynthia', ['Lead Pipe'])],
+        [ClueEvent('have', 'Cynthia', ['Rope'])],
+        [],
+    ]
+
+    outcomes = what_if(game, hypotheses, executor)
+
+    assert game.relations == relations
+    assert [o.events for o in outcomes] == hypotheses
+    assert outcomes[0].haves == [('Cynthia', 'Lounge')]
+    assert outcomes[0].passes == [('Cynthia', 'Billiard Room')]
+    assert outcomes[0].cards_in_the_file == ['Billiard Room']
+    assert outcomes[0].contradiction is None
+    assert outcomes[1].cards_in_the_file == ['Lead Pipe', 'Miss Scarlet']
+    assert outcomes[2].contradiction
+    assert outcomes[3] == ([], [], [], [], None)